@@ -39,7 +39,7 @@ def main() -> int:
 
     # Only today's circular for the scheduled run.
     print("\nFetching today's Discontinuation Circular…")
-    df, status = fetch_and_save_discontinued(today_only=True)
+    df, status = fetch_and_save_discontinued(today_only=True, skip_unchanged=True)
     print(status)
 
     # Circulars are infrequent — most days there is no new email, which is
@@ -50,7 +50,7 @@ def main() -> int:
         print("\nNo circular today — waiting 15 minutes for a possible late delivery…")
         time.sleep(15 * 60)
         print("\nRetrying…")
-        df, status = fetch_and_save_discontinued(today_only=True)
+        df, status = fetch_and_save_discontinued(today_only=True, skip_unchanged=True)
         print(status)
 
     got_rows = df is not None and not df.empty
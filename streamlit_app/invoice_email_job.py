@@ -4,7 +4,8 @@ invoice_email_job.py
 Daily 8 PM IST job — reads emails with subject "invoice information",
 extracts the Excel attachment, parses Sales Invoice No / Date / Customer Code
 Name / Sales Order No / Taxable Value, looks up the Sales Executive from
-Franchise sheets, and saves to "SALE INVOICE- <Month>" Google Sheet.
+Franchise sheets, and saves to "SALE INVOICE- <Month>" Google Sheet. A fresh
+import also refreshes the Sales Reports metrics snapshot.
 
 Usage:
     python streamlit_app/invoice_email_job.py
@@ -26,7 +27,7 @@ def main() -> int:
     from services.invoice_email_import import fetch_and_save_today_invoices
     from services.sheets import append_email_log
 
-    df, status = fetch_and_save_today_invoices()
+    df, status = fetch_and_save_today_invoices(skip_unchanged=True)
     print(status)
 
     try:
@@ -40,6 +41,15 @@ def main() -> int:
     except Exception as log_err:
         print(f"[AUDIT_LOG] Warning: {log_err}")
 
+    # New invoices change the invoice / pending-target figures on the Sales
+    # Reports page.
+    if df is not None and not df.empty:
+        try:
+            from services.metrics_snapshot import refresh_snapshot
+            refresh_snapshot()
+        except Exception as snap_err:
+            print(f"[METRICS] Warning: {snap_err}")
+
     print("=" * 60)
     print(f"  Done — {'OK' if '✅' in status else 'CHECK LOGS'}")
     print("=" * 60)
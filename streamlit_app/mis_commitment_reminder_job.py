@@ -14,8 +14,8 @@ Runs daily at 11 AM IST, right after the scheduled MIS Daily Import
 job checks whether today's MIS_Daily cache is actually fresh:
   • If the scheduled import already ran today  → uses the cached data.
   • If it hasn't (import job skipped/failed/still pending) → this job
-    triggers the MIS fetch itself (fetch_and_cache_mis) and then proceeds
-    with the freshly fetched data.
+    triggers the MIS fetch itself (fetch_and_cache_mis, without recording
+    an MIS history snapshot) and then proceeds with the freshly fetched data.
   • If a fresh fetch isn't possible either (e.g. no MIS email has been
     sent yet today) → falls back to whatever is already cached so the
     reminder still goes out using the latest known commitment state.
@@ -82,7 +82,9 @@ def _mis_cache_is_fresh(as_of_date) -> bool:
 
 def _trigger_mis_fetch() -> pd.DataFrame:
     """Fetch + cache today's MIS. Returns the fetched df (empty if unavailable)."""
-    fetched_df, fetch_status = fetch_and_cache_mis()
+    # This workflow keeps no .crm_state between runs — leave the MIS history
+    # (services/mis_snapshots.py) to mis_daily_import_job.py.
+    fetched_df, fetch_status = fetch_and_cache_mis(record_history=False)
     print(f"  → {fetch_status}")
     return fetched_df if fetched_df is not None else pd.DataFrame()
 
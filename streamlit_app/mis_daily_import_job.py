@@ -9,7 +9,9 @@ Step 1 — MIS:   Fetches the BR_MIS Excel from Gmail, reads the 'PO' sheet,
 Step 2 — Stock: Reads the 'STOCK' sheet tab from the same Excel attachment,
                 writes cleaned data to the 'Stock' Google Sheet tab.
 
-Both steps are idempotent — safe to re-run any time during the day.
+Both steps are idempotent — safe to re-run any time during the day. A fresh
+MIS import also refreshes the Sales Reports metrics snapshot
+(services/metrics_snapshot.py).
 
 Usage:
     python streamlit_app/mis_daily_import_job.py
@@ -40,7 +42,7 @@ def main() -> int:
 
     # ── Step 1: MIS (PO sheet) ────────────────────────────────────────────────
     print("\n[1/2] Fetching MIS data (PO sheet)…")
-    mis_df, mis_status = fetch_and_cache_mis()
+    mis_df, mis_status = fetch_and_cache_mis(skip_unchanged=True)
     print(mis_status)
 
     # If today's email hasn't arrived yet, wait 15 min and retry once.
@@ -50,7 +52,7 @@ def main() -> int:
         print("\n[1/2] MIS email not found — waiting 15 minutes before retry…")
         time.sleep(15 * 60)
         print("\n[1/2] Retrying MIS fetch…")
-        mis_df, mis_status = fetch_and_cache_mis()
+        mis_df, mis_status = fetch_and_cache_mis(skip_unchanged=True)
         print(mis_status)
         if (mis_df is None or mis_df.empty) and _MIS_NOT_RECEIVED in mis_status:
             print("\n[1/2] MIS email still not found. Use ⚡ Force Fetch in the app to pull manually.")
@@ -69,6 +71,14 @@ def main() -> int:
     if "✅" not in mis_status:
         overall_ok = False
 
+    # Fresh MIS changes the pending / forecast figures on the Sales Reports page.
+    if mis_df is not None and not mis_df.empty:
+        try:
+            from services.metrics_snapshot import refresh_snapshot
+            refresh_snapshot()
+        except Exception as snap_err:
+            print(f"[METRICS] Warning: {snap_err}")
+
     # ── Step 2: Stock (STOCK sheet) ───────────────────────────────────────────
     print("\n[2/2] Fetching Stock data (STOCK sheet)…")
     stock_df, stock_status = fetch_and_cache_stock()
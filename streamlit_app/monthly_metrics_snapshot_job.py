@@ -0,0 +1,54 @@
+"""
+monthly_metrics_snapshot_job.py
+
+Recomputes the current-month sales metrics shown on the Sales Reports and
+Strategy page — Monthly Sales Target, Current Sales Invoice Value, Pending
+Order Value (MIS + CRM), Month-end Forecast and Pending Target — with a
+per-salesperson breakdown, and saves them as the page's snapshot
+(services/metrics_snapshot.py): a local file plus the "MONTHLY METRICS
+SNAPSHOT" OPS tab.
+
+Runs every 30 minutes during business hours (GitHub Actions; scheduler.py uses
+METRICS_SNAPSHOT_MINUTES) and after each MIS / invoice import. Safe to re-run
+any time — every run overwrites the snapshot and appends its figures to the
+forecast history (services/forecast_history.py).
+
+Usage:
+    python streamlit_app/monthly_metrics_snapshot_job.py
+"""
+
+import sys
+import os
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+
+def main() -> int:
+    print("=" * 60)
+    print(f"  Monthly Metrics Snapshot — {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    from services.metrics_snapshot import SNAPSHOT_SHEET, refresh_snapshot
+
+    snap, status = refresh_snapshot()
+    print(status)
+
+    if snap is not None:
+        t = snap["totals"]
+        print(f"  Target            : ₹{t['target']:,.0f}")
+        print(f"  Invoice value     : ₹{t['invoice_value']:,.0f}")
+        print(f"  Pending order     : ₹{t['pending_order_value']:,.0f}")
+        print(f"  Month-end forecast: ₹{t['forecast']:,.0f}")
+        print(f"  Pending target    : ₹{t['pending_target']:,.0f}")
+
+    print("=" * 60)
+    print(f"  Done — {'OK' if '✅' in status else 'CHECK LOGS'} ({SNAPSHOT_SHEET})")
+    print("=" * 60)
+
+    return 0 if "✅" in status else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
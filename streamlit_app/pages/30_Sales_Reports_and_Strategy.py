@@ -44,6 +44,8 @@ sys.path.insert(0, BASE_DIR)
 from services.sheets import get_df  # noqa: E402
 from utils.helpers import to_indian_number_string  # noqa: E402
 from services import monthly_metrics as mm  # noqa: E402
+from services import metrics_snapshot as msnap  # noqa: E402
+from services import forecast_history as fh  # noqa: E402
 
 # Streamlit Community Cloud re-executes the page script on every rerun but keeps
 # already-imported service modules cached in sys.modules — it does not reload a
@@ -360,20 +362,47 @@ def _fmt_num(v) -> str:
 # Achievement" page and the "MIS Update" page.
 # =========================================================
 _month_full = now.strftime("%B %Y")   # e.g. "June 2026"
-_month_name = now.strftime("%B")      # e.g. "June"
 
 st.subheader(f"📋 Sales Reports — {_month_full}")
 st.caption(
-    f"Live monthly figures for **{_month_full}**. These reports cover the "
+    f"Monthly figures for **{_month_full}**. These reports cover the "
     "current month only and refresh automatically at the start of every month."
 )
 
-with st.spinner("Loading current-month sales figures…"):
-    _monthly_target    = mm.get_monthly_target(_month_name)
-    _invoice_value     = mm.get_current_sales_invoice_value(_month_name)
-    _pending_order     = mm.get_pending_order_value()
-    _pending_order_crm = mm.get_pending_order_value_crm()
-    _pending_target    = _monthly_target - _invoice_value
+# Rendered from the precomputed snapshot (services/metrics_snapshot.py) kept
+# current by monthly_metrics_snapshot_job.py and the import jobs; computed
+# inline only when no snapshot exists for this month yet.
+_snap = msnap.load_snapshot()
+if _snap is None:
+    with st.spinner("Computing current-month sales figures…"):
+        _snap, _snap_status = msnap.refresh_snapshot()
+    if _snap is None:
+        st.error(_snap_status)
+        st.stop()
+
+_snap_col, _recompute_col = st.columns([4, 1])
+_snap_age = msnap.age_minutes(_snap)
+_snap_col.caption(
+    f"🕒 Snapshot computed at **{str(_snap['computed_at'])[:16].replace('T', ' ')} IST**"
+    + (f" ({_snap_age:.0f} min ago)" if _snap_age is not None else "")
+    + " — refreshed every 30 minutes and after each MIS / invoice import."
+)
+if _recompute_col.button("🔄 Recompute now", key="sr_recompute_snapshot",
+                         use_container_width=True):
+    with st.spinner("Recomputing current-month sales figures…"):
+        _, _snap_status = msnap.refresh_snapshot()
+    if "❌" in _snap_status:
+        st.error(_snap_status)
+    else:
+        st.rerun()
+
+_totals            = _snap["totals"]
+_monthly_target    = _totals["target"]
+_invoice_value     = _totals["invoice_value"]
+_pending_order     = _totals["pending_order_value"]
+_pending_order_crm = _totals["pending_order_value_crm"]
+_monthend_forecast = _totals["forecast"]
+_pending_target    = _totals["pending_target"]
 
 rA, rB, rC = st.columns(3)
 rA.metric(
@@ -398,7 +427,7 @@ rC.metric(
 
 st.caption("🧮 **Pending Target Value** = Monthly Sales Target − Current Sales Invoice Value")
 
-rD, rE, _ = st.columns(3)
+rD, rE, rF = st.columns(3)
 rD.metric(
     "📦 Pending Order Value (MIS)",
     f"₹{to_indian_number_string(_pending_order, 0)}",
@@ -414,6 +443,50 @@ rE.metric(
          "ORDER DETAILS 26-27); 4S orders are excluded. Uses the "
          "'CROSS CHECK GROSS AMT (ORDER VALUE WITHOUT TAX)' column.",
 )
+rF.metric(
+    "📈 Month-end Forecast",
+    f"₹{to_indian_number_string(_monthend_forecast, 0)}",
+    help="Agree + Godown + Partial + Manually Committed value of the pending "
+         "MIS orders. Same figure as the Month-end Sales Forecast page.",
+)
+
+if _snap["by_salesperson"]:
+    with st.expander("👤 Per-salesperson breakdown", expanded=False):
+        _rep_df = pd.DataFrame(_snap["by_salesperson"]).rename(
+            columns={"sales_person": "SALES PERSON", **msnap.METRIC_COLUMNS}
+        )
+        _rep_df = _rep_df[["SALES PERSON", *msnap.METRIC_COLUMNS.values()]]
+        for _c in msnap.METRIC_COLUMNS.values():
+            _rep_df[_c] = _rep_df[_c].map(lambda v: f"₹{to_indian_number_string(v, 0)}")
+        st.dataframe(_rep_df, use_container_width=True, hide_index=True)
+
+# Intra-month trend — one point per snapshot refresh (services/forecast_history.py)
+with st.expander("📈 Forecast trend this month", expanded=False):
+    _hist_scope = st.selectbox(
+        "Sales person", [fh.ALL, *fh.sales_people(_snap["month_label"])],
+        key="sr_hist_scope",
+    )
+    _hist = fh.daily_series(_snap["month_label"], _hist_scope)
+    if _hist.empty:
+        st.info("No history recorded yet — every snapshot refresh adds a point.")
+    else:
+        _hist_long = _hist.melt(
+            id_vars="DATE",
+            value_vars=["FORECAST", "INVOICE VALUE", "PENDING ORDER VALUE"],
+            var_name="METRIC", value_name="VALUE",
+        )
+        chart_hist = alt.Chart(_hist_long).mark_line(point=True).encode(
+            x=alt.X("DATE:T", title="Date"),
+            y=alt.Y("VALUE:Q", title="Value (₹)"),
+            color=alt.Color("METRIC:N", title=""),
+            tooltip=["METRIC", alt.Tooltip("DATE:T", format="%d %b"),
+                     alt.Tooltip("VALUE:Q", format=",.0f")],
+        ).properties(height=300)
+        st.altair_chart(chart_hist, use_container_width=True)
+        st.caption(
+            f"Last value of each day. Committed lines now: "
+            f"**{int(_hist['COMMITTED LINES'].iloc[-1])}**."
+        )
 
 st.divider()
 
@@ -16,6 +16,11 @@ from services.discontinued_email_import import (
     DISCONTINUED_SUBJECT,
 )
 from services.catalog_pdf_service import fetch_and_sync_catalog_from_drive
+from services.search_index import (
+    CATALOG_FIELDS, PRICE_LIST_FIELDS, build_name_index, filter_df, index_for,
+    match_name, search_many,
+)
+from services.price_list_service import load_price_list_from_sheet, PRICE_LIST_SHEET
 CATALOG_SHEET_NAME = "Product Catalog"
 DISCONTINUED_SHEET_NAME = "Discontinued Products"
 ITEMS_PER_PAGE = 10
@@ -72,29 +77,22 @@ def load_all_data():
                 date = str(row.get(date_col, "Unknown Date")) if date_col else "Unknown Date"
                 disc_entries.append((key, date))
 
-    return df_catalog, disc_entries
+    # Indexes are built here so they are cached with the data they describe.
+    index_for(df_catalog, CATALOG_FIELDS, CATALOG_SHEET_NAME)
+    return df_catalog, build_name_index(disc_entries)
 
 
-def match_discontinued(product_name, disc_entries):
+def match_discontinued(product_name, disc_index):
     """Return the discontinuation date if `product_name` is discontinued, else None.
 
     Catalogue product names are marketing names (e.g. "Nebula V3") while the
     Discontinued Products sheet lists Godrej item descriptions, so an exact
     match is rare. We fall back to a word-safe substring match in either
     direction so a product whose name appears inside a discontinued item's
-    description is still flagged.
+    description is still flagged. Both steps are lookups in the name index
+    built by `load_all_data`.
     """
-    key = " ".join(str(product_name or "").strip().lower().split())
-    if not key:
-        return None
-    for name, date in disc_entries:            # exact match first
-        if name == key:
-            return date
-    if len(key) >= 4:                          # substring match (guard tiny names)
-        for name, date in disc_entries:
-            if name and (key in name or name in key):
-                return date
-    return None
+    return match_name(disc_index, product_name)
 
 # ==============================
 # MAIN APP
@@ -199,7 +197,7 @@ if check_disc:
     else:
         st.warning(_status)
 
-df_catalog, disc_entries = load_all_data()
+df_catalog, disc_index = load_all_data()
 
 if df_catalog.empty:
     st.warning("Catalog is empty or could not be loaded.")
@@ -213,16 +211,22 @@ if "last_search" not in st.session_state or st.session_state.last_search != sear
     st.session_state.page_num = 0
     st.session_state.last_search = search_query
 
-# Filter Data
+# Filter Data (ranked lookup in the index built with load_all_data)
+catalog_idx = index_for(df_catalog, CATALOG_FIELDS, CATALOG_SHEET_NAME)
+filtered_df = filter_df(df_catalog, catalog_idx, search_query, CATALOG_FIELDS)
+
+# Matching price-list rows, ranked together with the catalogue hits
 if search_query:
-    mask = (
-        df_catalog['Product Name'].str.lower().str.contains(search_query, na=False) |
-        df_catalog['Main Category'].str.lower().str.contains(search_query, na=False) |
-        df_catalog['Sub Category'].str.lower().str.contains(search_query, na=False)
-    )
-    filtered_df = df_catalog[mask]
-else:
-    filtered_df = df_catalog
+    _price_df, _ = load_price_list_from_sheet()
+    if not _price_df.empty:
+        _price_idx = index_for(_price_df, PRICE_LIST_FIELDS, PRICE_LIST_SHEET)
+        _hits = [
+            (src, label) for src, label, _ in search_many([catalog_idx, _price_idx], search_query)
+        ][:200]
+        _price_hits = [label for src, label in _hits if src == PRICE_LIST_SHEET]
+        if _price_hits:
+            with st.expander(f"💰 Price list matches ({len(_price_hits)})", expanded=filtered_df.empty):
+                st.dataframe(_price_df.loc[_price_hits], hide_index=True, use_container_width=True)
 
 # --- NO RESULTS FALLBACK (Instant Text) ---
 if filtered_df.empty:
@@ -260,7 +264,7 @@ page_df = filtered_df.iloc[start_idx:end_idx]
 # --- RENDER PRODUCTS ---
 for _, product in page_df.iterrows():
     p_name = product.get('Product Name', 'Unknown Product')
-    disc_date = match_discontinued(p_name, disc_entries)
+    disc_date = match_discontinued(p_name, disc_index)
     is_discontinued = disc_date is not None
 
     with st.container():
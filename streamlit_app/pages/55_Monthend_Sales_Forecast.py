@@ -14,19 +14,23 @@ Data flow:
        MIS-committed   : Sales Order Qty == Sales Order Committed Qty
        Manual-committed: "Can be committed manually" checked + Approved By filled
   6. Persistence: state saved in "MONTHEND SALES FORECAST- <Month>" Google Sheet
-  7. 34s Stock check: for uncommitted items, scan latest Op Stock
+  7. 34s Stock check: for uncommitted items, latest Cl Stock from the 34S
+     closing-stock snapshot
   8. Forecast value breakdown:
        Agree for Delivery : entire order value for orders marked "Agree for Delivery"
        Godown Delivery    : entire order value for orders marked "Delivery to Godown"
        Partial Delivery   : only ticked items in "Partial Delivery" orders
        Manually Committed : items committed manually (not already in above buckets)
+
+Steps 1–6 and 8 run in services/forecast_engine.py, memoised on the MIS / CRM /
+saved-state versions and shared with the Sales Reports metrics
+(services/monthly_metrics.py).
 """
 from __future__ import annotations
 
 import os
 import sys
-from calendar import monthrange
-from datetime import date, datetime, timedelta, timezone
+from datetime import datetime, timedelta, timezone
 
 import pandas as pd
 import streamlit as st
@@ -34,12 +38,33 @@ import streamlit as st
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, BASE_DIR)
 
-from services.sheets import get_df, write_df
+from services.sheets import get_df
 from utils.helpers import to_indian_number_string
-from services.mis_email_import import load_cached_mis
+from services import monthly_metrics as mm
+from services.forecast_engine import (
+    CANCEL_SCOPE_ENTIRE,
+    CANCEL_SCOPE_ITEMS,
+    DELIVER_SCOPE_COMMITTED,
+    DELIVER_SCOPE_FULL,
+    STATE_DEFAULTS,
+    _cancel_scope_value,
+    _cancel_selected,
+    _deliver_scope,
+    _delivery_status,
+    _is_committed,
+    _is_manual_committed,
+    _is_mis_committed,
+    _partial_selected,
+    _to_num,
+    committed_mask,
+    compute_forecast_breakdown,
+    forecast_month,
+    forecast_result,
+    forecast_sheet_name,
+    save_state,
+)
 from services.invoice_email_import import (
     fetch_and_save_invoices_range,
-    load_invoice_sheet,
     invoice_sheet_name,
     save_invoices_to_sheet,
     configured_invoice_inboxes,
@@ -51,8 +76,6 @@ st.set_page_config(layout="wide", page_title="Monthly Sales Target vs Achievemen
 IST = timezone(timedelta(hours=5, minutes=30))
 
 # ─── Constants ────────────────────────────────────────────────────────────────
-FORECAST_SHEET_PREFIX = "MONTHEND SALES FORECAST- "
-
 DELIVERY_OPTIONS = [
     "",
     "Agree for Delivery",
@@ -68,251 +91,41 @@ COMMITTED_VIA_OPTIONS = ["", "RPL", "34S Stock"]
 # Delivery categories whose forecast value is full-order by default and can be
 # narrowed to committed items only when the order has uncommitted items.
 FULL_ORDER_STATUSES = ("Agree for Delivery", "Delivery to Godown")
-DELIVER_SCOPE_FULL = "FULL"
-DELIVER_SCOPE_COMMITTED = "COMMITTED_ONLY"
-
-# "Order Cancelled" scope: cancel the whole order, or only specific ticked items.
-CANCEL_SCOPE_ENTIRE = "ENTIRE"
-CANCEL_SCOPE_ITEMS = "ITEMS"
-
-# Columns fetched from MIS_Daily
-MIS_FETCH_COLS = [
-    "Sales Order No.",
-    "Sales Order Position",
-    "Item Code",
-    "Item Description",
-    "Sales Order Qty",
-    "Sales Order Warehouse",
-    "Total Net Basic",
-    "Sales Order Committed Qty",
-    "Address Line 4(Ship To)",
-    "City",
-    "Customer Name",
-    "Inventory Commitment Date",
-]
-
-# Canonical column names used internally
-INTERNAL_COLS = [
-    "SO_NO", "SO_POSITION", "ITEM_CODE", "ITEM_DESCRIPTION",
-    "SO_QTY", "WAREHOUSE", "TOTAL_NET_BASIC", "SO_COMMITTED_QTY",
-    "ADDRESS_LINE_4", "CITY",
-    "CUSTOMER_NAME", "INV_COMMITMENT_DATE",
-    "DELIVERY_DATE", "SALES_EXECUTIVE",
-    "DELIVERY_STATUS",      # per order (same value for every item in same SO)
-    "PARTIAL_SELECTED",     # per item: True when DELIVERY_STATUS == "Partial Delivery"
-    "CAN_COMMIT_MANUALLY",  # per item
-    "APPROVED_BY",          # per item
-    "COMMITTED_VIA",        # per item: how a manually-committed item is sourced (RPL / 34S Stock)
-    "DELIVER_SCOPE",        # per order: FULL or COMMITTED_ONLY (for Agree / Godown with uncommitted items)
-    "CANCEL_SCOPE",         # per order: ENTIRE or ITEMS (for "Order Cancelled")
-    "CANCEL_SELECTED",      # per item: True when this item is cancelled in an item-scope cancellation
-    "STOCK_34S_MESSAGE",    # per item
-]
-
-MIS_TO_INTERNAL = {
-    "Sales Order No.":           "SO_NO",
-    "Sales Order Position":      "SO_POSITION",
-    "Item Code":                 "ITEM_CODE",
-    "Item Description":          "ITEM_DESCRIPTION",
-    "Sales Order Qty":           "SO_QTY",
-    "Sales Order Warehouse":     "WAREHOUSE",
-    "Total Net Basic":           "TOTAL_NET_BASIC",
-    "Sales Order Committed Qty": "SO_COMMITTED_QTY",
-    "Address Line 4(Ship To)":   "ADDRESS_LINE_4",
-    "City":                      "CITY",
-    "Customer Name":             "CUSTOMER_NAME",
-    "Inventory Commitment Date": "INV_COMMITMENT_DATE",
-}
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# DATE RANGE
-# ═══════════════════════════════════════════════════════════════════════════════
-
-def get_forecast_window(ref: date | None = None) -> tuple[date, str]:
-    """Returns (start_date, month_name). Start = last 5 days of ref month."""
-    if ref is None:
-        ref = datetime.now(IST).date()
-    _, last_day = monthrange(ref.year, ref.month)
-    start = date(ref.year, ref.month, last_day) - timedelta(days=4)
-    return start, ref.strftime("%B")
-
-
-def forecast_sheet_name(month: str) -> str:
-    return f"{FORECAST_SHEET_PREFIX}{month}"
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATA LOADERS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=120)
-def _load_mis() -> pd.DataFrame:
-    df, _ = load_cached_mis()
-    return df if df is not None else pd.DataFrame()
-
-
-@st.cache_data(ttl=120)
-def _load_pending_delivery_lookup() -> tuple[pd.DataFrame, set[str]]:
-    try:
-        cfg = get_df("SHEET_DETAILS")
-        if cfg is None or cfg.empty:
-            return pd.DataFrame(), set()
-        sheets = []
-        for col in ("Franchise_sheets", "four_s_sheets"):
-            if col in cfg.columns:
-                sheets += cfg[col].dropna().astype(str).str.strip().tolist()
-        sheets = list({s for s in sheets if s})
-
-        frames = []
-        # Track per-SO item counts to determine fully-delivered orders.
-        # so_item_counts[so_val] = [total_items, delivered_items]
-        so_item_counts: dict[str, list[int]] = {}
-
-        for sname in sheets:
-            raw = get_df(sname)
-            if raw is None or raw.empty:
-                continue
-            raw.columns = [str(c).strip().upper() for c in raw.columns]
-
-            del_col = next(
-                (c for c in raw.columns if c in (
-                    "CUSTOMER DELIVERY DATE (TO BE)",
-                    "CUSTOMER DELIVERY DATE",
-                    "DELIVERY DATE",
-                )), None
-            )
-            sp_col = next(
-                (c for c in raw.columns if c in ("SALES PERSON", "SALES REP")), None
-            )
-            so_col = next(
-                (c for c in raw.columns if c == "GODREJ SO NO"), None
-            )
-            status_col = next(
-                (c for c in raw.columns if c in ("STATUS", "DELIVERY STATUS", "ORDER STATUS")), None
-            )
-
-            if so_col is None:
-                continue
-
-            if status_col:
-                so_series = raw[so_col].astype(str).str.strip()
-                status_series = raw[status_col].astype(str).str.strip().str.upper()
-                for so_val, status_val in zip(so_series, status_series):
-                    if not so_val or so_val.lower() in ("", "nan", "none"):
-                        continue
-                    if so_val not in so_item_counts:
-                        so_item_counts[so_val] = [0, 0]
-                    so_item_counts[so_val][0] += 1
-                    if status_val == "DELIVERED":
-                        so_item_counts[so_val][1] += 1
-
-            sub = raw[[so_col]].copy()
-            sub.rename(columns={so_col: "GODREJ_SO"}, inplace=True)
-            if del_col:
-                sub["DELIVERY_DATE"] = pd.to_datetime(
-                    raw[del_col], errors="coerce", dayfirst=True
-                )
-            else:
-                sub["DELIVERY_DATE"] = pd.NaT
-            if sp_col:
-                sub["SALES_EXECUTIVE"] = raw[sp_col].astype(str).str.strip()
-            else:
-                sub["SALES_EXECUTIVE"] = ""
-
-            sub = sub.dropna(subset=["GODREJ_SO"])
-            sub["GODREJ_SO"] = sub["GODREJ_SO"].astype(str).str.strip()
-            sub = sub[~sub["GODREJ_SO"].str.lower().isin(["", "nan", "none"])]
-            frames.append(sub)
-
-        # An SO is fully delivered only when every item in it is marked DELIVERED
-        delivered_sos: set[str] = {
-            so_val
-            for so_val, (total, delivered) in so_item_counts.items()
-            if total > 0 and total == delivered
-        }
-
-        if not frames:
-            return pd.DataFrame(), delivered_sos
-
-        combined = pd.concat(frames, ignore_index=True)
-        combined = combined.sort_values("DELIVERY_DATE", na_position="last")
-        combined = combined.drop_duplicates(subset=["GODREJ_SO"], keep="first")
-        return combined.reset_index(drop=True), delivered_sos
-    except Exception:
-        return pd.DataFrame(), set()
-
-
-@st.cache_data(ttl=120)
-def _get_invoiced_so_numbers(month: str) -> set[str]:
-    try:
-        inv_df = load_invoice_sheet(month)
-        if inv_df is None or inv_df.empty:
-            return set()
-        so_col = next(
-            (c for c in inv_df.columns if c.strip().lower() in ("sales order no", "so no", "sales order no.")),
-            None,
-        )
-        if not so_col:
-            return set()
-        sos = (
-            inv_df[so_col]
-            .dropna()
-            .astype(str)
-            .str.strip()
-            .pipe(lambda s: s[~s.str.lower().isin(["", "nan", "none"])])
-            .unique()
-            .tolist()
-        )
-        return set(sos)
-    except Exception:
-        return set()
+@st.cache_data(max_entries=16)
+def _34s_stock_messages(item_codes: tuple[str, ...], year: int, month: int, version: str) -> dict[str, str]:
+    """Messages for item codes in stock; `version` (the snapshot's write time) keys the cache."""
+    from services.stock_34s_service import latest_closing
+    day, closing = latest_closing(year, month)
+    if not closing or not item_codes:
+        return {}
+    codes = pd.Series(item_codes, dtype=object)
+    qty = (
+        pd.Series(closing, dtype=float)
+        .reindex(codes.str.strip().str.upper().to_numpy())
+        .fillna(0.0)
+        .to_numpy()
+    )
+    in_stock = qty > 0
+    label = day.strftime("%d/%m")
+    return {
+        code: f"✅ Can be committed from 34S Stock (Cl Stock {label}: {val:.0f})"
+        for code, val in zip(codes[in_stock], qty[in_stock])
+    }
 
 
-@st.cache_data(ttl=300)
 def _34s_stock_check(item_codes: tuple[str, ...], ref_month: str) -> dict[str, str]:
-    from services.stock_34s_service import SHEET_PREFIX, _parse_col
-    sheet_name = f"{SHEET_PREFIX}{ref_month} {datetime.now(IST).year}"
-    result: dict[str, str] = {}
+    from services.stock_34s_service import snapshot_version
     try:
-        df = get_df(sheet_name)
-        if df is None or df.empty:
-            return result
-        df.columns = [str(c).strip() for c in df.columns]
-
-        item_col = next((c for c in df.columns if c.strip().upper() == "ITEM CODE"), None)
-        if not item_col:
-            return result
-
-        op_cols: list[tuple[date, str]] = []
-        today = datetime.now(IST).date()
-        for col in df.columns:
-            parsed = _parse_col(col)
-            if parsed and parsed[2] == "Op Stock":
-                day, mon, _ = parsed
-                try:
-                    op_cols.append((date(today.year, mon, day), col))
-                except ValueError:
-                    pass
-        if not op_cols:
-            return result
-        latest_col = max(op_cols, key=lambda x: x[0])[1]
-
-        df[item_col] = df[item_col].astype(str).str.strip().str.upper()
-        for code in item_codes:
-            mask = df[item_col] == str(code).strip().upper()
-            if not mask.any():
-                continue
-            val_str = str(df.loc[mask, latest_col].iloc[0]).replace(",", "").strip()
-            try:
-                val = float(val_str) if val_str else 0.0
-            except ValueError:
-                val = 0.0
-            if val > 0:
-                result[code] = f"✅ Can be committed from 34S Stock (Op Stock: {val:.0f})"
+        year, month = datetime.now(IST).year, datetime.strptime(ref_month.strip(), "%B").month
+        return _34s_stock_messages(item_codes, year, month, snapshot_version(year, month))
     except Exception:
-        pass
-    return result
+        return {}
 
 
 @st.cache_data(ttl=300)
@@ -345,109 +158,6 @@ def _get_sales_persons() -> list[str]:
         return []
 
 
-def _get_monthly_target(month: str) -> float:
-    try:
-        from services.incentive_store import get_targets_df
-        df = get_targets_df()
-        if df is None or df.empty:
-            return 0.0
-        mask = df["MONTH"] == month.upper()
-        return float(df.loc[mask, "TARGET"].sum()) * 1_00_000
-    except Exception:
-        return 0.0
-
-
-def _get_month_sales_achievement(month: str) -> float:
-    try:
-        inv_df = load_invoice_sheet(month)
-        if inv_df is None or inv_df.empty:
-            return 0.0
-        if "Customer Code Name" in inv_df.columns:
-            wfx_mask = (
-                inv_df["Customer Code Name"]
-                .fillna("").astype(str).str.strip().str.upper()
-                .str.startswith("WFX")
-            )
-            inv_df = inv_df[wfx_mask].copy()
-        if "Taxable Value" not in inv_df.columns:
-            return 0.0
-        def _parse(v):
-            try:
-                return float(str(v).replace(",", "").strip())
-            except (ValueError, TypeError):
-                return 0.0
-        return float(inv_df["Taxable Value"].apply(_parse).sum())
-    except Exception:
-        return 0.0
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# COMMITMENT / STATUS HELPERS
-# ═══════════════════════════════════════════════════════════════════════════════
-
-def _to_num(v) -> float:
-    try:
-        return float(str(v).replace(",", "").strip())
-    except (ValueError, TypeError):
-        return 0.0
-
-
-def _is_mis_committed(row: pd.Series) -> bool:
-    qty = _to_num(row.get("SO_QTY", 0))
-    com = _to_num(row.get("SO_COMMITTED_QTY", 0))
-    return qty > 0 and qty == com
-
-
-def _is_manual_committed(row: pd.Series) -> bool:
-    can = str(row.get("CAN_COMMIT_MANUALLY", "")).upper() in ("TRUE", "1", "YES")
-    approved = str(row.get("APPROVED_BY", "")).strip()
-    return can and bool(approved) and approved.lower() not in ("nan", "none", "")
-
-
-def _is_committed(row: pd.Series) -> bool:
-    return _is_mis_committed(row) or _is_manual_committed(row)
-
-
-def _delivery_status(row: pd.Series) -> str:
-    return str(row.get("DELIVERY_STATUS", "")).strip()
-
-
-def _deliver_scope(grp: pd.DataFrame) -> str:
-    """
-    Order-level delivery scope: FULL (whole order) or COMMITTED_ONLY (only the
-    committed items). Defaults to FULL when unset or column absent.
-    """
-    if "DELIVER_SCOPE" not in grp.columns:
-        return DELIVER_SCOPE_FULL
-    val = str(grp["DELIVER_SCOPE"].iloc[0]).strip().upper()
-    return DELIVER_SCOPE_COMMITTED if val == DELIVER_SCOPE_COMMITTED else DELIVER_SCOPE_FULL
-
-
-def _partial_selected(row: pd.Series) -> bool:
-    return str(row.get("PARTIAL_SELECTED", "")).upper() in ("TRUE", "1", "YES")
-
-
-def _cancel_scope(grp: pd.DataFrame) -> str:
-    """
-    Order-level cancellation scope for "Order Cancelled" orders:
-    ENTIRE (whole order) or ITEMS (only the ticked items). Defaults to ENTIRE.
-    """
-    if "CANCEL_SCOPE" not in grp.columns:
-        return CANCEL_SCOPE_ENTIRE
-    val = str(grp["CANCEL_SCOPE"].iloc[0]).strip().upper()
-    return CANCEL_SCOPE_ITEMS if val == CANCEL_SCOPE_ITEMS else CANCEL_SCOPE_ENTIRE
-
-
-def _cancel_scope_value(row: pd.Series) -> str:
-    """Row-level read of the order's cancellation scope (constant per order)."""
-    val = str(row.get("CANCEL_SCOPE", "")).strip().upper()
-    return CANCEL_SCOPE_ITEMS if val == CANCEL_SCOPE_ITEMS else CANCEL_SCOPE_ENTIRE
-
-
-def _cancel_selected(row: pd.Series) -> bool:
-    return str(row.get("CANCEL_SELECTED", "")).upper() in ("TRUE", "1", "YES")
-
-
 # ── Category labels (single source of truth for the categorised table) ─────────
 CAT_AGREED        = "✅ Agreed for Delivery"
 CAT_PARTIAL       = "📦 Partial Delivery"
@@ -535,154 +245,6 @@ def categorise_item(
 # FORECAST VALUE CALCULATORS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def compute_mis_committed_value(mis_df: pd.DataFrame) -> float:
-    """
-    Sum of Total Net Basic for ALL MIS items where SO Qty == SO Committed Qty.
-    Uses the raw MIS sheet with no exclusions — this reflects exactly what the
-    MIS file shows as committed, matching the value a user would compute manually.
-    """
-    if mis_df is None or mis_df.empty:
-        return 0.0
-    df = mis_df.copy()
-
-    qty_col = next((c for c in df.columns if c.strip() == "Sales Order Qty"), None)
-    com_col = next((c for c in df.columns if c.strip() == "Sales Order Committed Qty"), None)
-    val_col = next((c for c in df.columns if c.strip() == "Total Net Basic"), None)
-
-    if not all([qty_col, com_col, val_col]):
-        return 0.0
-
-    df = df[[qty_col, com_col, val_col]].copy()
-    df.columns = ["SO_QTY", "SO_COMMITTED_QTY", "TOTAL_NET_BASIC"]
-
-    committed_mask = df.apply(_is_mis_committed, axis=1)
-    return float(df.loc[committed_mask, "TOTAL_NET_BASIC"].apply(_to_num).sum())
-
-
-def compute_forecast_breakdown(df: pd.DataFrame) -> dict[str, float]:
-    """
-    Returns a dict with keys:
-      agree, godown, partial, manual, committed_ns, denied, not_committed, total
-    (committed_mis is computed separately from full MIS via compute_mis_committed_value)
-
-    The buckets mirror the "Orders by Category" classification one-to-one so the
-    sub-field values match the per-category chips:
-      • agree / godown          — full order value of those order-level statuses
-      • partial                 — only the ticked items of Partial Delivery orders
-      • manual                  — manually-committed items in undecided orders
-      • committed_ns            — MIS-committed (non-manual) items in undecided orders
-      • not_committed           — remaining items in undecided orders
-      • denied                  — full order value of Denied Delivery orders
-    ``total`` (the Monthend Forecast Value) is agree + godown + partial + manual
-    only; committed_ns, denied and not_committed are reported but excluded.
-    """
-    if df.empty:
-        return dict(agree=0, godown=0, partial=0, manual=0, committed_ns=0,
-                    denied=0, not_committed=0, cancelled=0, total=0)
-
-    # Track which items are already counted in agree/godown/partial buckets
-    counted_idx: set = set()
-
-    agree_val = 0.0
-    godown_val = 0.0
-    partial_val = 0.0
-    manual_val = 0.0
-    committed_ns_val = 0.0
-    denied_val = 0.0
-    not_committed_val = 0.0
-    cancelled_val = 0.0
-
-    for so_no, grp in df.groupby("SO_NO"):
-        status = _delivery_status(grp.iloc[0])
-
-        if status == "Order Cancelled":
-            # Whole order → cancel the full order value. Item scope → cancel only
-            # the ticked items; the remaining items are classified individually
-            # (committed-no-status / not-committed) and manual items counted in
-            # the manual loop below. Cancelled value is excluded from the total.
-            if _cancel_scope(grp) == CANCEL_SCOPE_ITEMS:
-                for idx, row in grp.iterrows():
-                    if _cancel_selected(row):
-                        cancelled_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-                        counted_idx.add(idx)
-                    elif _is_manual_committed(row):
-                        continue  # counted under Manually Committed below
-                    elif _is_mis_committed(row):
-                        committed_ns_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-                    else:
-                        not_committed_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-            else:
-                cancelled_val += grp["TOTAL_NET_BASIC"].apply(_to_num).sum()
-                counted_idx.update(grp.index.tolist())
-
-        elif status == "Agree for Delivery":
-            # Full order by default; only committed items when the order is set
-            # to "Deliver committed items only" — the uncommitted items are not
-            # delivered, so they drop to Not Committed.
-            if _deliver_scope(grp) == DELIVER_SCOPE_COMMITTED:
-                committed_mask = grp.apply(_is_committed, axis=1)
-                agree_val += grp.loc[committed_mask, "TOTAL_NET_BASIC"].apply(_to_num).sum()
-                not_committed_val += grp.loc[~committed_mask, "TOTAL_NET_BASIC"].apply(_to_num).sum()
-            else:
-                agree_val += grp["TOTAL_NET_BASIC"].apply(_to_num).sum()
-            counted_idx.update(grp.index.tolist())
-
-        elif status == "Delivery to Godown":
-            if _deliver_scope(grp) == DELIVER_SCOPE_COMMITTED:
-                committed_mask = grp.apply(_is_committed, axis=1)
-                godown_val += grp.loc[committed_mask, "TOTAL_NET_BASIC"].apply(_to_num).sum()
-                not_committed_val += grp.loc[~committed_mask, "TOTAL_NET_BASIC"].apply(_to_num).sum()
-            else:
-                godown_val += grp["TOTAL_NET_BASIC"].apply(_to_num).sum()
-            counted_idx.update(grp.index.tolist())
-
-        elif status == "Partial Delivery":
-            for idx, row in grp.iterrows():
-                if _partial_selected(row):
-                    partial_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-                    counted_idx.add(idx)
-
-        elif status == "Denied Delivery":
-            denied_val += grp["TOTAL_NET_BASIC"].apply(_to_num).sum()
-            # Not added to counted_idx — denied items stay out of every bucket.
-
-        # No order-level status set: classify each item individually so a
-        # part-committed order is split — MIS-committed (non-manual) items go to
-        # "Committed (No Status)", the rest to "Not Committed". (Manual items are
-        # counted in the Manually Committed loop below.)
-        else:
-            for _, row in grp.iterrows():
-                if _is_manual_committed(row):
-                    continue  # counted under Manually Committed below
-                if _is_mis_committed(row):
-                    committed_ns_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-                else:
-                    not_committed_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-
-    # Manually committed: items not already in agree/godown/partial buckets
-    # and not in "Denied Delivery" orders
-    for idx, row in df.iterrows():
-        if idx in counted_idx:
-            continue
-        if _delivery_status(row) == "Denied Delivery":
-            continue
-        if _is_manual_committed(row):
-            manual_val += _to_num(row.get("TOTAL_NET_BASIC", 0))
-
-    total = agree_val + godown_val + partial_val + manual_val
-    return dict(
-        agree=agree_val,
-        godown=godown_val,
-        partial=partial_val,
-        manual=manual_val,
-        committed_ns=committed_ns_val,
-        denied=denied_val,
-        not_committed=not_committed_val,
-        cancelled=cancelled_val,
-        total=total,
-    )
-
-
 def compute_committed_by_category(df: pd.DataFrame) -> tuple[dict[str, float], float]:
     """
     Per delivery category, the value of its MIS-committed line items only
@@ -750,189 +312,6 @@ def compute_manual_committed_by_via(df: pd.DataFrame) -> dict[str, float]:
     return out
 
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# FORECAST SHEET PERSISTENCE
-# ═══════════════════════════════════════════════════════════════════════════════
-
-def load_saved_state(sheet_name: str) -> pd.DataFrame:
-    try:
-        df = get_df(sheet_name)
-        if df is None or df.empty:
-            return pd.DataFrame(columns=INTERNAL_COLS)
-        df.columns = [str(c).strip().upper() for c in df.columns]
-
-        bool_cols = ["CAN_COMMIT_MANUALLY", "PARTIAL_SELECTED", "CANCEL_SELECTED"]
-        for bc in bool_cols:
-            if bc in df.columns:
-                df[bc] = df[bc].astype(str).str.upper().map(
-                    {"TRUE": True, "FALSE": False,
-                     "1": True, "0": False,
-                     "YES": True, "NO": False}
-                ).fillna(False)
-
-        # Ensure DELIVERY_STATUS column exists (backward compat with old sheets)
-        if "DELIVERY_STATUS" not in df.columns:
-            # Migrate old CUSTOMER_DENIED_DELIVERY → Denied Delivery
-            if "CUSTOMER_DENIED_DELIVERY" in df.columns:
-                denied_map = df["CUSTOMER_DENIED_DELIVERY"].astype(str).str.upper().map(
-                    {"TRUE": "Denied Delivery", "1": "Denied Delivery"}
-                ).fillna("")
-                df["DELIVERY_STATUS"] = denied_map
-            else:
-                df["DELIVERY_STATUS"] = ""
-
-        if "PARTIAL_SELECTED" not in df.columns:
-            df["PARTIAL_SELECTED"] = False
-
-        # Backward compat: columns added in later versions.
-        if "COMMITTED_VIA" not in df.columns:
-            df["COMMITTED_VIA"] = ""
-        if "DELIVER_SCOPE" not in df.columns:
-            df["DELIVER_SCOPE"] = DELIVER_SCOPE_FULL
-        if "CANCEL_SCOPE" not in df.columns:
-            df["CANCEL_SCOPE"] = CANCEL_SCOPE_ENTIRE
-        if "CANCEL_SELECTED" not in df.columns:
-            df["CANCEL_SELECTED"] = False
-
-        return df
-    except Exception:
-        return pd.DataFrame(columns=INTERNAL_COLS)
-
-
-def save_state(df: pd.DataFrame, sheet_name: str) -> str:
-    try:
-        out = df.copy()
-        bool_cols = ["CAN_COMMIT_MANUALLY", "PARTIAL_SELECTED", "CANCEL_SELECTED"]
-        for bc in bool_cols:
-            if bc in out.columns:
-                out[bc] = out[bc].map(
-                    lambda v: "TRUE" if v is True or str(v).upper() in ("TRUE", "1", "YES") else "FALSE"
-                )
-        write_df(sheet_name, out)
-        return f"✅ Saved to sheet **{sheet_name}**."
-    except Exception as e:
-        return f"❌ Save failed: {e}"
-
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# CORE BUILDER
-# ═══════════════════════════════════════════════════════════════════════════════
-
-def build_forecast(
-    mis_df: pd.DataFrame,
-    pending_df: pd.DataFrame,
-) -> pd.DataFrame:
-    """
-    Transform the raw MIS into the internal forecast frame. Every MIS line item
-    is kept — there is no delivery-date window — so the page mirrors the MIS
-    exactly. CRM delivery dates / sales executives are still mapped on where a
-    matching SO exists, purely for display and sorting.
-    """
-    if mis_df is None or mis_df.empty:
-        return pd.DataFrame(columns=INTERNAL_COLS)
-
-    mis_df = mis_df.copy()
-
-    col_renames: dict[str, str] = {}
-    for wanted in MIS_FETCH_COLS:
-        if wanted in mis_df.columns:
-            col_renames[wanted] = MIS_TO_INTERNAL[wanted]
-        else:
-            found = next(
-                (c for c in mis_df.columns if c.strip().lower() == wanted.lower()), None
-            )
-            if found:
-                col_renames[found] = MIS_TO_INTERNAL[wanted]
-
-    keep = list(col_renames.keys())
-    df = mis_df[keep].copy().rename(columns=col_renames)
-
-    for ic in MIS_TO_INTERNAL.values():
-        if ic not in df.columns:
-            df[ic] = ""
-
-    df["SO_NO"] = df["SO_NO"].astype(str).str.strip()
-
-    if not pending_df.empty and "GODREJ_SO" in pending_df.columns:
-        so_to_date: dict[str, pd.Timestamp] = {}
-        so_to_exec: dict[str, str] = {}
-        for _, r in pending_df.iterrows():
-            so = str(r["GODREJ_SO"]).strip()
-            if so and pd.notna(r.get("DELIVERY_DATE")):
-                so_to_date[so] = r["DELIVERY_DATE"]
-            if so and str(r.get("SALES_EXECUTIVE", "")).strip():
-                so_to_exec[so] = str(r["SALES_EXECUTIVE"]).strip()
-
-        df["DELIVERY_DATE"] = df["SO_NO"].map(so_to_date)
-        df["SALES_EXECUTIVE"] = df["SO_NO"].map(so_to_exec).fillna("")
-    else:
-        df["DELIVERY_DATE"] = pd.NaT
-        df["SALES_EXECUTIVE"] = ""
-
-    df["DELIVERY_DATE"] = pd.to_datetime(df["DELIVERY_DATE"], errors="coerce")
-
-    if df.empty:
-        return pd.DataFrame(columns=INTERNAL_COLS)
-
-    # Sort: dated orders first (ascending), then undated orders at the bottom
-    df = df.sort_values(
-        ["DELIVERY_DATE", "SO_NO", "SO_POSITION"],
-        na_position="last",
-    ).reset_index(drop=True)
-
-    for col, default in [
-        ("DELIVERY_STATUS",     ""),
-        ("PARTIAL_SELECTED",    False),
-        ("CAN_COMMIT_MANUALLY", False),
-        ("APPROVED_BY",         ""),
-        ("COMMITTED_VIA",       ""),
-        ("DELIVER_SCOPE",       DELIVER_SCOPE_FULL),
-        ("CANCEL_SCOPE",        CANCEL_SCOPE_ENTIRE),
-        ("CANCEL_SELECTED",     False),
-        ("STOCK_34S_MESSAGE",   ""),
-    ]:
-        if col not in df.columns:
-            df[col] = default
-
-    return df[INTERNAL_COLS]
-
-
-def merge_state(fresh: pd.DataFrame, saved: pd.DataFrame) -> pd.DataFrame:
-    if fresh.empty:
-        return fresh
-    if saved is None or saved.empty or "SO_NO" not in saved.columns:
-        return fresh
-
-    saved = saved.copy()
-    saved["SO_NO"] = saved["SO_NO"].astype(str).str.strip()
-    saved["SO_POSITION"] = saved["SO_POSITION"].astype(str).str.strip()
-
-    state_flag_cols = [
-        "DELIVERY_STATUS", "PARTIAL_SELECTED",
-        "CAN_COMMIT_MANUALLY", "APPROVED_BY",
-        "COMMITTED_VIA", "DELIVER_SCOPE",
-        "CANCEL_SCOPE", "CANCEL_SELECTED", "STOCK_34S_MESSAGE",
-    ]
-
-    saved_map = {}
-    for _, r in saved.iterrows():
-        key = (str(r.get("SO_NO", "")).strip(), str(r.get("SO_POSITION", "")).strip())
-        saved_map[key] = r
-
-    fresh = fresh.copy()
-    fresh["SO_NO"] = fresh["SO_NO"].astype(str).str.strip()
-    fresh["SO_POSITION"] = fresh["SO_POSITION"].astype(str).str.strip()
-
-    for idx, row in fresh.iterrows():
-        key = (row["SO_NO"], row["SO_POSITION"])
-        if key in saved_map:
-            for sc in state_flag_cols:
-                if sc in saved_map[key].index:
-                    fresh.at[idx, sc] = saved_map[key][sc]
-
-    return fresh
-
-
 # ═══════════════════════════════════════════════════════════════════════════════
 # FORMATTING HELPERS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -963,7 +342,7 @@ st.title("📅 Monthly Sales Target vs Achievement")
 today = datetime.now(IST).date()
 # Only the month label is needed now (for the sheet name, targets and
 # achievement lookups) — the page no longer applies a delivery-date window.
-_win_start, month_name = get_forecast_window(today)
+month_name = forecast_month(today)
 sheet_name = forecast_sheet_name(month_name)
 
 st.caption(
@@ -992,43 +371,29 @@ with c2:
 # ─── Load / refresh ───────────────────────────────────────────────────────────
 if not st.session_state.mef_loaded or refresh:
     with st.spinner("Loading MIS data and pending deliveries…"):
-        mis_raw = _load_mis()
-        # CRM lookup is still used to attach delivery dates / sales executives,
-        # but invoiced / delivered SOs are no longer excluded — the page mirrors
-        # the full MIS so its counts and committed total reconcile with it.
-        pending_raw, _delivered_sos = _load_pending_delivery_lookup()
-
-        # Committed Value (MIS): raw MIS total, no exclusions — matches manual MIS calculation
-        mis_committed_val = compute_mis_committed_value(mis_raw)
-        st.session_state.mef_mis_committed = mis_committed_val
-
         # Forecast orders: the entire MIS (no delivery-date window, no invoice /
-        # delivery exclusions), with CRM delivery dates mapped on where matched.
-        fresh = build_forecast(mis_raw, pending_raw)
+        # delivery exclusions), with CRM delivery dates mapped on where matched
+        # and the saved state overlaid. Shared with the Sales Reports metrics
+        # and rebuilt only when MIS / CRM / saved state change.
+        result = forecast_result(today)
+        df = result["df"].copy()
 
-        saved = load_saved_state(sheet_name)
-        df = merge_state(fresh, saved)
+        # Committed Value (MIS): raw MIS total, no exclusions — matches manual MIS calculation
+        st.session_state.mef_mis_committed = result["mis_committed"]
 
         # 34s stock check for non-committed items
-        uncommitted_codes = tuple(
-            str(r["ITEM_CODE"]).strip()
-            for _, r in df.iterrows()
-            if not _is_committed(r) and str(r.get("ITEM_CODE", "")).strip()
-        )
+        codes = df["ITEM_CODE"].astype(str).str.strip()
+        uncommitted = ~committed_mask(df) & codes.ne("")
+        uncommitted_codes = tuple(codes[uncommitted])
         if uncommitted_codes:
             stock_msgs = _34s_stock_check(uncommitted_codes, month_name)
-            for idx, row in df.iterrows():
-                code = str(row.get("ITEM_CODE", "")).strip()
-                if code and not _is_committed(row):
-                    df.at[idx, "STOCK_34S_MESSAGE"] = stock_msgs.get(code, "")
+            df.loc[uncommitted, "STOCK_34S_MESSAGE"] = codes[uncommitted].map(stock_msgs).fillna("")
 
         st.session_state.mef_df = df
         st.session_state.mef_loaded = True
         if refresh:
             try:
-                _load_mis.clear()
-                _load_pending_delivery_lookup.clear()
-                _34s_stock_check.clear()
+                _34s_stock_messages.clear()
             except Exception:
                 pass
 
@@ -1038,20 +403,9 @@ df: pd.DataFrame = st.session_state.mef_df
 # Backward compat: a dataframe cached in session state from an earlier version
 # (e.g. before a redeploy) may be missing columns added later. Ensure every
 # state column exists so downstream access never raises KeyError.
-_COL_DEFAULTS = {
-    "DELIVERY_STATUS":     "",
-    "PARTIAL_SELECTED":    False,
-    "CAN_COMMIT_MANUALLY": False,
-    "APPROVED_BY":         "",
-    "COMMITTED_VIA":       "",
-    "DELIVER_SCOPE":       DELIVER_SCOPE_FULL,
-    "CANCEL_SCOPE":        CANCEL_SCOPE_ENTIRE,
-    "CANCEL_SELECTED":     False,
-    "STOCK_34S_MESSAGE":   "",
-}
 if not df.empty:
     _added = False
-    for _col, _default in _COL_DEFAULTS.items():
+    for _col, _default in STATE_DEFAULTS.items():
         if _col not in df.columns:
             df[_col] = _default
             _added = True
@@ -1069,8 +423,8 @@ if df.empty:
 breakdown = compute_forecast_breakdown(df)
 _mis_committed_val = st.session_state.mef_mis_committed
 
-_monthly_target  = _get_monthly_target(month_name)
-_current_achieve = _get_month_sales_achievement(month_name)
+_monthly_target  = mm.get_monthly_target(month_name)
+_current_achieve = mm.get_current_sales_invoice_value(month_name)
 _pending_target  = _monthly_target - _current_achieve
 
 # ─── KPI Row 1 ────────────────────────────────────────────────────────────────
@@ -1230,6 +584,29 @@ with st.expander(
             "have changed since the last load — click 🔁 Refresh Data."
         )
 
+# ─── Commitment-date drift (MIS COMMITMENT DRIFT tab, services/mis_snapshots) ─
+try:
+    from services.mis_snapshots import commitment_drift
+    _drift_df = commitment_drift(
+        start=datetime.now(IST).date() - timedelta(days=45),
+        so_numbers=set(df["SO_NO"].astype(str).str.strip()),
+    )
+except Exception as _e:
+    _drift_df = pd.DataFrame()
+    print(f"[MEF] commitment drift unavailable: {_e}")
+if not _drift_df.empty:
+    with st.expander(
+        f"📆 Commitment-date drift — {len(_drift_df)} line(s) re-committed in the last 45 days",
+        expanded=False,
+    ):
+        st.caption(
+            "Lines of the orders above whose MIS **Inventory Commitment Date** changed "
+            "between daily MIS imports. Drift = latest minus first commitment date "
+            "(positive = pushed later)."
+        )
+        _drift_df.index = range(1, len(_drift_df) + 1)
+        st.dataframe(_drift_df, use_container_width=True)
+
 st.markdown("---")
 
 # ─── Summary metrics ──────────────────────────────────────────────────────────
@@ -18,6 +18,7 @@ Features:
   • Setup Sheet button   → create current month tab + last 7 days headers
   • Update Sheet button  → fill every day from last-updated+1 through today
   • Force Re-run Today   → overwrite today's columns only
+  • Recalculate Cl      → recompute Op/Cl for the month from its own In/Out values
   • Send Monthly Report  → email full-month Excel + last-day table (no archive)
   • Send Today's Report  → email today's stock table (body only, no attachment)
 """
@@ -45,10 +46,13 @@ from services.stock_34s_service import (
     sheet_name_for,
     send_monthly_stock_email,
     send_daily_stock_email,
+    build_ytd_excel,
     is_flat_sheet,
     load_flat_snapshot,
     run_flat_update,
     recalc_flat_cl,
+    recalc_month_register,
+    sync_closing_snapshot,
     FIXED_COLS,
     DATE_SUB_COLS,
 )
@@ -316,6 +320,9 @@ need_reload = not st.session_state.s34_loaded or reload_btn
 if need_reload:
     with st.spinner(f"Loading {sel_month_label}…"):
         df_month, load_msg = load_month_df(sel_year, sel_month)
+        # Re-sync the closing-stock snapshot with the tab (picks up hand edits)
+        sync_closing_snapshot(df_month, sel_year, sel_month)
+        st.session_state.s34_ytd_xlsx = None
         st.session_state.s34_month_df = df_month
         st.session_state.s34_status   = load_msg
         st.session_state.s34_loaded   = True
@@ -433,9 +440,9 @@ with col_rerun:
             st.error(upd_msg)
         st.rerun()
 
-# ─── Action buttons row 2: Email ──────────────────────────────────────────────
+# ─── Action buttons row 2: Email / Recalculate ────────────────────────────────
 st.markdown("")
-col_email_monthly, col_email_daily, _ = st.columns([1, 1, 1])
+col_email_monthly, col_email_daily, col_recalc = st.columns([1, 1, 1])
 
 with col_email_monthly:
     if st.button(
@@ -480,6 +487,26 @@ with col_email_daily:
         else:
             st.error(f"❌ Failed to send today's report: {result.get('error', 'Unknown error')}")
 
+with col_recalc:
+    if st.button(
+        "🧮 Recalculate Cl",
+        use_container_width=True,
+        disabled=S34_AUTOMATION_PAUSED,
+        help=(
+            f"Recompute Op / Cl Stock for every recorded day of **{sel_month_label}** "
+            "from the sheet's own In Ward / Out Ward values (after a manual correction). "
+            "No inward/outward fetch."
+        ),
+    ):
+        with st.spinner(f"Recalculating {sel_month_label}…"):
+            _, recalc_msg = recalc_month_register(sel_year, sel_month)
+        df_month, _ = load_month_df(sel_year, sel_month)
+        st.session_state.s34_month_df          = df_month
+        st.session_state.s34_status            = recalc_msg
+        st.session_state.s34_loaded            = True
+        st.session_state["_s34_prev_date_key"] = None
+        st.rerun()
+
 # ─── No data guard ────────────────────────────────────────────────────────────
 if df_month.empty:
     st.markdown("---")
@@ -617,7 +644,7 @@ if not df_display.empty:
 
     # ─── Download ─────────────────────────────────────────────────────────────
     st.markdown("---")
-    dl_col, _ = st.columns([1, 3])
+    dl_col, ytd_col, _ = st.columns([1, 1, 2])
     with dl_col:
         st.download_button(
             label="⬇️ Download as CSV",
@@ -626,6 +653,24 @@ if not df_display.empty:
             mime="text/csv",
             use_container_width=True,
         )
+    with ytd_col:
+        if st.session_state.get("s34_ytd_xlsx") is None:
+            if st.button(
+                "📊 Prepare Year-to-date Excel",
+                use_container_width=True,
+                help="One worksheet per month of the financial year so far (April onwards).",
+            ):
+                with st.spinner("Building year-to-date workbook…"):
+                    st.session_state.s34_ytd_xlsx = build_ytd_excel(sel_year, sel_month)
+                st.rerun()
+        else:
+            st.download_button(
+                label="⬇️ Download Year-to-date Excel",
+                data=st.session_state.s34_ytd_xlsx,
+                file_name=f"34S_Stock_YTD_{sel_month_label.replace(' ', '_')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+            )
 
 # ─── Movement expanders ───────────────────────────────────────────────────────
 st.markdown("---")
@@ -32,6 +32,7 @@ sys.path.insert(0, BASE_DIR)
 import streamlit as st
 import pandas as pd
 from utils.helpers import to_indian_number_string
+from services.search_index import PRICE_LIST_FIELDS, filter_df, index_for
 from services.price_list_service import (
     load_price_list_from_sheet,
     load_mattress_list_from_sheet,
@@ -192,17 +193,15 @@ def _render_price_tab(df, columns, status_msg, download_stem, show_thickness=Fal
             key=f"search_{download_stem}",
         )
 
-    # Apply filters
+    # Apply filters (search: ranked lookup in the index built with the load)
     filtered = df.copy()
     if selected_cat != "All":
         filtered = filtered[filtered["CATEGORY"] == selected_cat]
     if selected_item != "All":
         filtered = filtered[filtered["ITEM"] == selected_item]
     if search_text:
-        mask = filtered.apply(
-            lambda col: col.astype(str).str.contains(search_text, case=False, na=False)
-        ).any(axis=1)
-        filtered = filtered[mask]
+        search_idx = index_for(df, PRICE_LIST_FIELDS, download_stem)
+        filtered = filter_df(filtered, search_idx, search_text, PRICE_LIST_FIELDS)
 
     # Table
     st.markdown(f"### 📋 {download_stem.replace('_', ' ')} - {to_indian_number_string(len(filtered), 0)} rows")
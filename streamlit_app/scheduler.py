@@ -171,8 +171,10 @@ def job_invoice_email_import():
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M')}] 🧾 Running Invoice Email Import")
     try:
         from services.invoice_email_import import fetch_and_save_today_invoices
-        df, status = fetch_and_save_today_invoices()
+        df, status = fetch_and_save_today_invoices(skip_unchanged=True)
         print(f"  → {status}")
+        if df is not None and not df.empty:
+            job_metrics_snapshot()
     except Exception as e:
         print(f"  ❌ Invoice Email Import failed: {e}")
 
@@ -195,12 +197,30 @@ def job_mis_daily_import():
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M')}] 📦 Running MIS Daily Import")
     try:
         from services.mis_email_import import fetch_and_cache_mis
-        df, status = fetch_and_cache_mis()
+        df, status = fetch_and_cache_mis(skip_unchanged=True)
         print(f"  → {status}")
+        if df is not None and not df.empty:
+            job_metrics_snapshot()
     except Exception as e:
         print(f"  ❌ MIS Daily Import failed: {e}")
 
 
+# ─── Monthly metrics snapshot (every N minutes + after imports) ──────────────
+
+METRICS_SNAPSHOT_MINUTES = int(os.getenv("METRICS_SNAPSHOT_MINUTES", "30") or 30)
+
+
+def job_metrics_snapshot():
+    """Recompute the Sales Reports metrics snapshot (services/metrics_snapshot.py)."""
+    print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M')}] 📊 Running Monthly Metrics Snapshot")
+    try:
+        from services.metrics_snapshot import refresh_snapshot
+        _, status = refresh_snapshot()
+        print(f"  → {status}")
+    except Exception as e:
+        print(f"  ❌ Monthly Metrics Snapshot failed: {e}")
+
+
 # ─── Discontinued Products import (11 AM) ────────────────────────────────────
 
 def job_discontinued_products_import():
@@ -208,7 +228,7 @@ def job_discontinued_products_import():
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M')}] 🚫 Running Discontinued Products Import")
     try:
         from services.discontinued_email_import import fetch_and_save_discontinued
-        df, status = fetch_and_save_discontinued(today_only=True)
+        df, status = fetch_and_save_discontinued(today_only=True, skip_unchanged=True)
         print(f"  → {status}")
     except Exception as e:
         print(f"  ❌ Discontinued Products Import failed: {e}")
@@ -219,8 +239,9 @@ def job_discontinued_products_import():
 schedule.every().day.at("10:00").do(job_email1)             # Email 1 — Morning
 schedule.every().day.at("11:00").do(job_email2)             # Email 2 — once daily
 # MIS daily import: fire at 11:00 AND 11:15 as a drift cushion.
-# fetch_and_cache_mis() simply overwrites the MIS_Daily sheet, so duplicate
-# triggers within the same day are idempotent.
+# The three doubled imports below run with skip_unchanged=True: once a source
+# email is in the JOB_RUN_LEDGER (services/run_ledger.py) the repeat trigger
+# stops after the IMAP search — nothing is downloaded, parsed or written.
 schedule.every().day.at("11:00").do(job_mis_daily_import)
 schedule.every().day.at("11:15").do(job_mis_daily_import)
 # Discontinued Products import: 11:00 AM primary + 11:15 drift backup (idempotent)
@@ -230,6 +251,7 @@ schedule.every().day.at("17:00").do(job_email1)             # Email 1 — Evenin
 schedule.every().day.at("20:00").do(job_invoice_email_import)  # Invoice Import — 8 PM
 schedule.every().day.at("20:15").do(job_invoice_email_import)  # Invoice Import — drift backup
 schedule.every().day.at("21:00").do(job_crm_backup)            # CRM Backup — 9 PM
+schedule.every(METRICS_SNAPSHOT_MINUTES).minutes.do(job_metrics_snapshot)  # Sales Reports snapshot
 
 _print_tz_banner()
 print("=" * 60)
@@ -248,6 +270,7 @@ print("   5:00 PM (local) → Email 1: Pending Delivery Report (Evening)")
 print("   8:00 PM (local) → Invoice Email Import (primary)")
 print("   8:15 PM (local) → Invoice Email Import (drift backup)")
 print("   9:00 PM (local) → CRM Daily Backup to Google Drive")
+print(f"  every {METRICS_SNAPSHOT_MINUTES} min     → Monthly Metrics Snapshot (+ after MIS / invoice imports)")
 print("=" * 60)
 print("  Press Ctrl+C to stop.\n")
 
@@ -26,6 +26,10 @@ Idempotency contract (as requested):
     scan (it does not require the "update existing" switch). The hand-curated
     image URLs already in the sheet are always preserved, and images are never
     re-uploaded on a re-run (uploads are idempotent by deterministic filename).
+  * An interrupted scan resumes where it stopped: finished catalogues,
+    uploaded image ids and not-yet-written rows are kept in a local sync
+    journal (parsed pages come back from the page cache), and rows are
+    committed to the sheet after each catalogue.
 
 WHY Claude vision: the catalogue PDFs are two-column marketing layouts whose
 plain-text extraction is badly interleaved between the two columns. A rendered
@@ -71,6 +75,9 @@ Optional configuration
                            rows. ([drive] CATALOG_IMAGE_FOLDER_ID or env)
   CATALOG_LLM_MODEL        Claude model id (default "claude-opus-5"). Set to
                            "claude-sonnet-5" for a cheaper/faster scan.
+  CATALOG_PARSE_WORKERS    Concurrent vision requests per catalogue (default 4;
+                           [anthropic] parse_workers or env). Rate-limited
+                           pages are retried with backoff.
 """
 from __future__ import annotations
 
@@ -114,8 +121,8 @@ _SCOPES = [
 # Feature bullets are prefixed with this sparkle to match the existing rows.
 _BULLET = "✨ "  # "✨ "
 
-# Render pages at ~130 DPI — enough for the model to read the text cleanly while
-# staying under the model's long-edge image limit.
+# Pages go to the model at ~130 DPI — enough for it to read the text cleanly
+# while staying under the model's long-edge image limit.
 _RENDER_DPI = 130
 
 # A raster placement smaller than this fraction of the page (per side) is treated
@@ -428,14 +435,49 @@ def _find_image_by_name(service, folder_id: str, name: str):
     return files[0]["id"] if files else None
 
 
-def _upload_image(service, folder_id: str, name: str, data: bytes, mime: str) -> str:
+def _list_image_folder(service, folder_id: str) -> dict:
+    """name -> file id for every file in the image folder (one paginated listing).
+
+    Replaces a `_find_image_by_name` query per image during a sync. When a name
+    occurs more than once the first listed file wins, like the single-name query.
+    """
+    out: dict = {}
+    token = None
+    while True:
+        resp = service.files().list(
+            q=f"'{folder_id}' in parents and trashed = false",
+            fields="nextPageToken, files(id, name)",
+            pageSize=1000,
+            pageToken=token,
+            supportsAllDrives=True,
+            includeItemsFromAllDrives=True,
+        ).execute()
+        for f in resp.get("files", []):
+            out.setdefault(f["name"], f["id"])
+        token = resp.get("nextPageToken")
+        if not token:
+            return out
+
+
+def _upload_image(service, folder_id: str, name: str, data: bytes, mime: str,
+                  uploaded: dict | None = None, name_ids: dict | None = None) -> str:
     """Upload one image, make it link-viewable, and return its thumbnail URL.
 
-    Reuses an existing file of the same name (idempotent re-runs).
+    Reuses an existing file of the same name (idempotent re-runs). ``uploaded``
+    (name -> URL, e.g. the sync journal's) short-circuits names already done
+    and records new ones. ``name_ids`` (name -> file id, from
+    `_list_image_folder`) replaces the per-name Drive lookup and is kept
+    current with the files created here.
     """
     from googleapiclient.http import MediaIoBaseUpload
 
-    existing = _find_image_by_name(service, folder_id, name)
+    if uploaded is not None and uploaded.get(name):
+        return uploaded[name]
+
+    if name_ids is not None:
+        existing = name_ids.get(name)
+    else:
+        existing = _find_image_by_name(service, folder_id, name)
     if existing:
         file_id = existing
     else:
@@ -447,6 +489,8 @@ def _upload_image(service, folder_id: str, name: str, data: bytes, mime: str) ->
             supportsAllDrives=True,
         ).execute()
         file_id = created["id"]
+        if name_ids is not None:
+            name_ids[name] = file_id
 
     # Ensure "anyone with the link can view" so the thumbnail URL renders.
     try:
@@ -458,22 +502,19 @@ def _upload_image(service, folder_id: str, name: str, data: bytes, mime: str) ->
     except Exception:
         pass  # already shared, or shared-drive policy — thumbnail still works
 
-    return _THUMB_URL.format(id=file_id)
+    url = _THUMB_URL.format(id=file_id)
+    if uploaded is not None:
+        uploaded[name] = url
+    return url
 
 
 # ═════════════════════════════════════════════════════════════════════════════
 # PDF — RENDER PAGES + EXTRACT RASTER IMAGES (PyMuPDF / fitz)
 # ═════════════════════════════════════════════════════════════════════════════
 
-def _render_page_png(page) -> bytes:
-    import fitz
-    zoom = _RENDER_DPI / 72.0
-    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
-    return pix.tobytes("png")
-
-
-# DPI used when cropping a product photo out of the page. Higher than the
-# vision-parse DPI so the saved product image is crisp in the catalogue UI.
+# DPI of the one render made per page. Product photos and swatches are cut
+# straight out of it, so it is higher than the vision-parse DPI to keep the
+# saved images crisp in the catalogue UI.
 _CROP_DPI = 220
 # Padding (page fractions) added around the model's photo box before cropping,
 # so a slightly-tight box doesn't clip the edges of the furniture.
@@ -482,6 +523,45 @@ _CROP_PAD = 0.012
 _CROP_MIN_SIDE = 0.03
 
 
+def _render_page_pixmap(page):
+    """Render the page ONCE at _CROP_DPI (RGB, no alpha).
+
+    Everything else for the page is served from this pixmap: the downscaled
+    PNG sent to the model (`_model_png`), the product photo crops
+    (`_crop_region_png`) and the swatch/raster crops (`_extract_page_images`).
+    An A4 page is ~14 MB at this DPI; pages are streamed, so only the pages
+    currently in the parse window are held.
+    """
+    import fitz
+    zoom = _CROP_DPI / 72.0
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+
+
+def _model_png(pix) -> bytes:
+    """The page at ~_RENDER_DPI as PNG, downscaled from the page pixmap."""
+    import fitz
+    scale = _RENDER_DPI / float(_CROP_DPI)
+    w = max(1, int(round(pix.width * scale)))
+    h = max(1, int(round(pix.height * scale)))
+    return fitz.Pixmap(pix, w, h).tobytes("png")
+
+
+def _crop_pixmap_png(pix, x0, y0, x1, y1):
+    """PNG of the normalised box (0..1 page fractions) cut from `pix`, or None."""
+    import math
+    import fitz
+    ox, oy, pw, ph = pix.x, pix.y, pix.width, pix.height
+    irect = fitz.IRect(
+        ox + int(x0 * pw), oy + int(y0 * ph),
+        ox + math.ceil(x1 * pw), oy + math.ceil(y1 * ph),
+    ) & pix.irect
+    if irect.is_empty or irect.width < 8 or irect.height < 8:
+        return None
+    out = fitz.Pixmap(pix.colorspace, irect, False)
+    out.copy(pix, irect)
+    return out.tobytes("png")
+
+
 def _norm_box(region):
     """Return (x0, y0, x1, y1) as ordered floats in 0..1, or None if unusable."""
     try:
@@ -505,44 +585,37 @@ def _norm_box(region):
     return x0, y0, x1, y1
 
 
-def _crop_region_png(page, region, dpi: int = _CROP_DPI, pad: float = _CROP_PAD):
-    """Render just ``region`` (normalised box) of the page to PNG bytes.
+def _crop_region_png(pix, region, pad: float = _CROP_PAD):
+    """Cut just ``region`` (normalised box) out of the page pixmap as PNG bytes.
 
     This crops the product photo straight out of the rendered page, so it works
     no matter how the PDF embeds its art (flattened full-page raster, placed
     vector, or individual images) — unlike raster extraction, which misses
     flattened/vector layouts entirely. Returns None on any unusable box.
     """
-    import fitz
     box = _norm_box(region)
     if not box:
         return None
     x0, y0, x1, y1 = box
-    pw = float(page.rect.width) or 1.0
-    ph = float(page.rect.height) or 1.0
-    cx0 = max(0.0, x0 - pad) * pw
-    cy0 = max(0.0, y0 - pad) * ph
-    cx1 = min(1.0, x1 + pad) * pw
-    cy1 = min(1.0, y1 + pad) * ph
-    clip = fitz.Rect(cx0, cy0, cx1, cy1)
-    if clip.is_empty or clip.is_infinite:
-        return None
-    zoom = dpi / 72.0
     try:
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
-        if pix.width < 8 or pix.height < 8:
-            return None
-        return pix.tobytes("png")
+        return _crop_pixmap_png(
+            pix, max(0.0, x0 - pad), max(0.0, y0 - pad),
+            min(1.0, x1 + pad), min(1.0, y1 + pad),
+        )
     except Exception:
         return None
 
 
-def _extract_page_images(doc, page) -> list:
+def _extract_page_images(page, pix) -> list:
     """Return a list of placed raster images on the page.
 
     Each item: {bytes, ext, cx, cy, area_frac, side_frac} where cx/cy are the
     placement centre normalised to the page (0..1), area_frac is the placement
     area / page area, and side_frac is max(width,height)/page-side.
+
+    Only the placement geometry is read from the PDF; the pixels are cut from
+    the page pixmap ``pix`` (as placed on the page), so embedded originals —
+    often far larger than their placement — are never decoded.
     """
     pw = float(page.rect.width) or 1.0
     ph = float(page.rect.height) or 1.0
@@ -559,7 +632,6 @@ def _extract_page_images(doc, page) -> list:
         if not rects:
             continue
 
-        raw = None  # extracted lazily once we know a placement is worth keeping
         for rect in rects:
             w = float(rect.width)
             h = float(rect.height)
@@ -577,18 +649,20 @@ def _extract_page_images(doc, page) -> list:
                 continue
             seen.add(key)
 
-            if raw is None:
-                try:
-                    raw = doc.extract_image(xref)
-                except Exception:
-                    raw = {}
-            data = raw.get("image")
+            try:
+                data = _crop_pixmap_png(
+                    pix,
+                    max(0.0, float(rect.x0) / pw), max(0.0, float(rect.y0) / ph),
+                    min(1.0, float(rect.x1) / pw), min(1.0, float(rect.y1) / ph),
+                )
+            except Exception:
+                data = None
             if not data:
                 continue
 
             out.append({
                 "bytes": data,
-                "ext": (raw.get("ext") or "png").lower(),
+                "ext": "png",
                 "cx": cx,
                 "cy": cy,
                 "area_frac": area_frac,
@@ -883,8 +957,78 @@ def _load_existing():
     return df[CATALOG_COLUMNS].fillna("")
 
 
+# ── Image folder index + swatch dedup ────────────────────────────────────────
+# One sync lists the image folder once (name -> id) and keeps a content hash
+# of every swatch it has uploaded, persisted per image folder under the local
+# state folder. Identical swatches shared by many products (the same fabric or
+# laminate chip on every sofa in a range) are uploaded once and their URL is
+# reused for every product that shows them.
+#
+# The hash is exact (sha256 of the decoded pixels): plain-colour chips differ
+# only in colour, so any perceptual tolerance would merge different finishes.
+
+_IMAGE_INDEX_VERSION = 2
+
+
+def _image_hash(data: bytes):
+    """sha256 hex of an image's decoded RGB pixels, or None if undecodable.
+
+    Hashing pixels rather than file bytes lets two lossless encodings of the
+    same chip (e.g. PNG re-saved with other settings) match.
+    """
+    import hashlib
+
+    import fitz
+    try:
+        pix = fitz.Pixmap(data)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.colorspace is None or pix.colorspace.n != 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+    except Exception:
+        return None
+    digest = hashlib.sha256(f"{pix.width}x{pix.height}:".encode())
+    digest.update(pix.samples)
+    return digest.hexdigest()
+
+
+def _load_image_index(service, folder_id: str) -> dict:
+    """{"ids": name -> file id, "swatches": pixel sha256 -> URL} for one sync."""
+    from services.local_state import read_json, state_path
+
+    stored = read_json(state_path("catalog_image_index", f"{folder_id}.json"), default={}) or {}
+    if stored.get("version") != _IMAGE_INDEX_VERSION:
+        stored = {}   # older perceptual-hash keys are not comparable
+    ids = _list_image_folder(service, folder_id)
+    # Forget swatches whose file has since been deleted from the folder.
+    live = {_THUMB_URL.format(id=i) for i in ids.values()}
+    return {
+        "folder_id": folder_id,
+        "ids": ids,
+        "swatches": {h: u for h, u in (stored.get("swatches") or {}).items() if u in live},
+    }
+
+
+def _save_image_index(index: dict) -> None:
+    from services.local_state import state_path, write_json
+
+    try:
+        write_json(
+            state_path("catalog_image_index", f"{index['folder_id']}.json"),
+            {"version": _IMAGE_INDEX_VERSION, "swatches": index["swatches"]},
+        )
+    except Exception as exc:
+        print(f"[CATALOG] image index write failed ({exc})")
+
+
+def _known_swatch(index: dict, h: str):
+    """URL of an already-uploaded swatch with exactly the same pixels."""
+    return index["swatches"].get(h)
+
+
 def _upload_product_images(service, image_folder_id, product, *,
-                           want_main=True, want_swatch=True, say=None) -> tuple[str, str]:
+                           want_main=True, want_swatch=True, say=None,
+                           uploaded=None, image_index=None) -> tuple[str, str]:
     """Upload a product's main + swatch images; return (main_urls, swatch_urls).
 
     ``want_main`` / ``want_swatch`` let a caller upload only one kind — used by
@@ -895,7 +1039,12 @@ def _upload_product_images(service, image_folder_id, product, *,
     (``product["main_crop"]``); if that isn't present we fall back to any raster
     images extracted from the PDF (``product["main_images"]``). Upload failures
     are logged via ``say`` rather than swallowed, so a broken run is diagnosable.
+    ``uploaded`` is passed through to `_upload_image`. With ``image_index``
+    (`_load_image_index`) names are resolved from the folder listing and a
+    swatch matching one already uploaded reuses that file instead of uploading
+    a copy.
     """
+    name_ids = image_index["ids"] if image_index else None
     if service is None:          # upload identity unavailable — skip cleanly
         return "", ""
 
@@ -912,7 +1061,7 @@ def _upload_product_images(service, image_folder_id, product, *,
             try:
                 main_urls.append(_upload_image(
                     service, image_folder_id, f"{slug}_main_1.png",
-                    crop["bytes"], "image/png",
+                    crop["bytes"], "image/png", uploaded, name_ids,
                 ))
             except Exception as exc:
                 _warn(f"{slug} main crop failed: {exc}")
@@ -922,7 +1071,9 @@ def _upload_product_images(service, image_folder_id, product, *,
                 name = f"{slug}_main_{i}.png"
                 mime = f"image/{'jpeg' if img['ext'] in ('jpg', 'jpeg') else 'png'}"
                 try:
-                    main_urls.append(_upload_image(service, image_folder_id, name, img["bytes"], mime))
+                    main_urls.append(_upload_image(
+                        service, image_folder_id, name, img["bytes"], mime, uploaded, name_ids,
+                    ))
                 except Exception as exc:
                     _warn(f"{name} failed: {exc}")
 
@@ -930,10 +1081,22 @@ def _upload_product_images(service, image_folder_id, product, *,
         for i, img in enumerate(product.get("swatch_images", []), start=1):
             name = f"{slug}_swatch_{i}.png"
             mime = f"image/{'jpeg' if img['ext'] in ('jpg', 'jpeg') else 'png'}"
+            h = _image_hash(img["bytes"]) if image_index else None
+            if h is not None and not (uploaded and uploaded.get(name)):
+                known = _known_swatch(image_index, h)
+                if known:
+                    swatch_urls.append(known)
+                    continue
             try:
-                swatch_urls.append(_upload_image(service, image_folder_id, name, img["bytes"], mime))
+                url = _upload_image(
+                    service, image_folder_id, name, img["bytes"], mime, uploaded, name_ids,
+                )
             except Exception as exc:
                 _warn(f"{name} failed: {exc}")
+                continue
+            swatch_urls.append(url)
+            if h is not None:
+                image_index["swatches"].setdefault(h, url)
 
     return ", ".join(main_urls), ", ".join(swatch_urls)
 
@@ -978,13 +1141,19 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
                (e.g. a Streamlit ``st.write`` / status callback).
     page_start : 1-based first page to read per catalogue (default 1).
     page_end   : 1-based last page to read (inclusive); None = to the end.
-                 Pass a window (e.g. 11..20) so re-runs don't re-read/re-bill
-                 the pages you already processed.
+                 Pass a window (e.g. 11..20) to limit a run to some pages.
+                 Pages already parsed on an earlier run are served from the
+                 page cache, so a full re-scan only bills pages that changed.
     update_existing : when False (default) products already in the sheet are
                  left untouched — only genuinely new products are appended.
                  Set True to also rewrite an existing product when its text
                  content actually changed.
 
+    Progress is checkpointed in the sync journal and rows are written to the
+    sheet after every catalogue, so a run that crashes or times out resumes
+    with the next unfinished catalogue when called again with the same
+    arguments (see "SYNC JOURNAL" below).
+
     Returns (added_count, updated_count, status_message).
     """
     log = []
@@ -1052,18 +1221,50 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
         drive_service = None
         _say(f"⚠️ upload identity unavailable ({exc}); images will be skipped, text still syncs.")
 
-    to_append = []          # list[list[str]]  new rows
-    to_update = {}          # sheet_row_number(int) -> list[str] full row
-    seen_this_run = set()   # products already handled this run (dedupe across pages)
-    added = updated = skipped = backfilled = 0
-    total_parsed = 0        # product blocks the model returned across all PDFs
-
+    # -- journal: resume an interrupted run ----------------------------------
+    run_sig = {
+        "folder_id": folder_id, "page_start": int(page_start or 1),
+        "page_end": int(page_end) if page_end else None,
+        "update_existing": bool(update_existing),
+    }
+    journal = _load_journal()
+    if journal and (journal["pending_append"] or journal["pending_update"]):
+        # Rows computed by the interrupted run are valid either way — commit
+        # them before deciding whether to resume.
+        err = _commit_journal(journal, existing.empty)
+        if err:
+            return 0, 0, f"⚠️ Could not commit the rows left by the interrupted run: {err}"
+        existing = _load_existing()
+        existing_keys = {_norm_key(n): idx for idx, n in enumerate(existing["Product Name"])}
+    if journal and journal.get("run") == run_sig:
+        _say(
+            f"↩️ Resuming interrupted sync — {len(journal['files_done'])} of "
+            f"{len(pdf_files)} catalogue(s) already done."
+        )
+    else:
+        journal = _new_journal(run_sig)
+    _save_journal(journal)
+
+    counts = journal["counts"]
+    seen_this_run = set(journal["seen"])   # products already handled (dedupe across pages)
+    uploaded = journal["uploads"]          # image name -> thumbnail URL
+    image_index = None                     # folder listing + swatch hashes
+    if drive_service is not None:
+        try:
+            image_index = _load_image_index(drive_service, image_folder_id)
+            _say(f"🗂️ Image folder: {len(image_index['ids'])} existing file(s) indexed.")
+        except Exception as exc:
+            _say(f"   ⚠️ could not list the image folder ({exc}); looking images up one by one.")
     for file_info in pdf_files:
+        fid = file_info["id"]
         fname = file_info["name"]
+        if fid in journal["files_done"]:
+            _say(f"📄 {fname} — done in the interrupted run, skipped.")
+            continue
         hint = _filename_to_room_hint(fname)
         _say(f"📄 {fname} …")
         try:
-            pdf_bytes = _download_pdf_bytes(file_info["id"])
+            pdf_bytes = _download_pdf_bytes(fid)
         except Exception as exc:
             _say(f"   ⚠️ download failed: {exc}")
             continue
@@ -1072,13 +1273,15 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
             products = _extract_products_from_pdf(
                 client, model, pdf_bytes, hint, _say,
                 page_start=page_start, page_end=page_end,
+                file_id=fid,
             )
         except Exception as exc:
             _say(f"   ⚠️ parse failed: {exc}")
             continue
 
         _say(f"   → {len(products)} product(s) parsed")
-        total_parsed += len(products)
+        to_append = journal["pending_append"]   # list[list[str]]  new rows
+        to_update = journal["pending_update"]   # "sheet_row_number" -> full row
 
         for product in products:
             name = _clean_line(product.get("product_name"))
@@ -1088,6 +1291,7 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
             if key in seen_this_run:
                 continue
             seen_this_run.add(key)
+            journal["seen"].append(key)
 
             main_cat = _clean_line(product.get("main_category") or hint)
             sub_cat = _clean_line(product.get("sub_category"))
@@ -1117,6 +1321,7 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
                     new_main, _ = _upload_product_images(
                         drive_service, image_folder_id, product,
                         want_main=True, want_swatch=False, say=_say,
+                        uploaded=uploaded, image_index=image_index,
                     )
                     if new_main:
                         main_urls = new_main
@@ -1143,17 +1348,18 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
                         _, swatch_urls = _upload_product_images(
                             drive_service, image_folder_id, product,
                             want_main=False, want_swatch=True, say=_say,
+                            uploaded=uploaded, image_index=image_index,
                         )
-                    to_update[row_idx + 2] = [
+                    to_update[str(row_idx + 2)] = [
                         main_cat, sub_cat, name, features, measurements,
                         colour_material, main_urls, swatch_urls,
                     ]
-                    updated += 1
+                    counts["updated"] += 1
                     _say(f"   ✏️  updated: {name}")
                 elif did_backfill:
                     # Text unchanged (or refresh disabled) — write back only the
                     # newly filled image cell, preserving every other column.
-                    to_update[row_idx + 2] = [
+                    to_update[str(row_idx + 2)] = [
                         str(ex["Main Category"]),
                         str(ex["Sub Category"]),
                         str(ex["Product Name"]),
@@ -1163,25 +1369,50 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
                         main_urls,
                         swatch_urls,
                     ]
-                    backfilled += 1
+                    counts["backfilled"] += 1
                     _say(f"   🖼️  backfilled product image: {name}")
                 else:
-                    skipped += 1
+                    counts["skipped"] += 1
             else:
                 main_urls, swatch_urls = _upload_product_images(
-                    drive_service, image_folder_id, product, say=_say
+                    drive_service, image_folder_id, product, say=_say,
+                    uploaded=uploaded, image_index=image_index,
                 )
                 to_append.append([
                     main_cat, sub_cat, name, features, measurements,
                     colour_material, main_urls, swatch_urls,
                 ])
-                added += 1
+                counts["added"] += 1
                 _img_note = "" if main_urls else "  (no product image found)"
                 _say(f"   ➕ new: {name}{_img_note}")
-
-    # -- write back ----------------------------------------------------------
-    if not to_append and not to_update:
-        if total_parsed == 0:
+            # Checkpoint per product: a crash here resumes this catalogue with
+            # the handled products (and their uploads) already in the journal.
+            _save_journal(journal)
+
+        # -- commit this catalogue's rows, then mark it done -------------------
+        if image_index:
+            _save_image_index(image_index)
+        journal["files_done"][fid] = len(products)
+        counts["parsed"] += len(products)
+        _save_journal(journal)
+        if to_append or to_update:
+            n_rows = len(to_append) + len(to_update)
+            err = _commit_journal(journal, existing.empty)
+            if err:
+                return counts["added"], counts["updated"], (
+                    f"⚠️ Parsed products but writing to the sheet failed: {err}\n"
+                    "Re-run the sync to resume — parsed pages, uploads and the "
+                    "unwritten rows are kept in the sync journal.\n"
+                    + "\n".join(log)
+                )
+            _say(f"   💾 {n_rows} row(s) written to the sheet")
+            existing = _load_existing()
+            existing_keys = {_norm_key(n): idx for idx, n in enumerate(existing["Product Name"])}
+
+    _clear_journal()
+    added, updated = counts["added"], counts["updated"]
+    if not (added or updated or counts["backfilled"]):
+        if counts["parsed"] == 0:
             headline = (
                 "⚠️ Catalogue scan finished but the AI returned 0 products from "
                 "any page — nothing to write. Check the log below for the reason "
@@ -1189,17 +1420,93 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
             )
         else:
             headline = (
-                f"✅ Catalogue scan complete — {total_parsed} product(s) read, all "
-                f"already present and unchanged ({skipped} matched). Nothing to write."
+                f"✅ Catalogue scan complete — {counts['parsed']} product(s) read, all "
+                f"already present and unchanged ({counts['skipped']} matched). Nothing to write."
             )
         return 0, 0, headline + "\n" + "\n".join(log)
 
+    summary = (
+        f"✅ Catalogue sync complete — {added} added, {updated} updated, "
+        f"{counts['backfilled']} product image(s) backfilled, {counts['skipped']} unchanged."
+    )
+    return added, updated, summary + "\n" + "\n".join(log)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SYNC JOURNAL — resume an interrupted multi-PDF scan
+# ═════════════════════════════════════════════════════════════════════════════
+# .crm_state/catalog_sync_journal.json (services/local_state.py) records, while
+# a sync runs:
+#   files_done      fileId -> products parsed     (catalogue fully handled)
+#   uploads         image name -> thumbnail URL   (never re-uploaded / re-looked-up)
+#   pending_append  new rows not yet written to the sheet
+#   pending_update  "sheet row" -> full row, not yet written
+#   seen / counts   dedupe keys and the running totals for the final summary
+# Rows are committed to the sheet after every catalogue; the journal is deleted
+# once the whole folder has been processed.
+
+_JOURNAL_VERSION = 1
+
+
+def _journal_path() -> str:
+    from services.local_state import state_path
+
+    return state_path("catalog_sync_journal.json")
+
+
+def _new_journal(run_sig: dict) -> dict:
+    return {
+        "version": _JOURNAL_VERSION,
+        "run": run_sig,
+        "files_done": {},
+        "uploads": {},
+        "pending_append": [],
+        "pending_update": {},
+        "seen": [],
+        "counts": {"parsed": 0, "added": 0, "updated": 0, "backfilled": 0, "skipped": 0},
+    }
+
+
+def _load_journal():
+    from services.local_state import read_json
+
+    j = read_json(_journal_path())
+    if not isinstance(j, dict) or j.get("version") != _JOURNAL_VERSION:
+        return None
+    return j
+
+
+def _save_journal(journal: dict) -> None:
+    from services.local_state import write_json
+
+    try:
+        write_json(_journal_path(), journal)
+    except Exception as exc:
+        print(f"[CATALOG] sync journal write failed ({exc})")
+
+
+def _clear_journal() -> None:
+    try:
+        os.remove(_journal_path())
+    except OSError:
+        pass
+
+
+def _commit_journal(journal: dict, sheet_was_empty: bool):
+    """Write the journal's pending rows to the sheet (one batch_update + one
+    append_rows), then empty them and save the journal.
+
+    Returns None on success or the error text; on failure the rows stay in the
+    journal for the next run.
+    """
+    to_append = journal["pending_append"]
+    to_update = journal["pending_update"]
     try:
         from services.sheets import get_sheet, get_df
         ws = get_sheet(CATALOG_SHEET_NAME)
 
         # Ensure the header row exists (fresh/empty sheet) — one call.
-        if existing.empty:
+        if sheet_was_empty:
             header = ws.row_values(1)
             if [h.strip() for h in header][: len(CATALOG_COLUMNS)] != CATALOG_COLUMNS:
                 _sheets_retry(ws.update, "A1", [CATALOG_COLUMNS])
@@ -1210,29 +1517,25 @@ def fetch_and_sync_catalog_from_drive(progress=None, page_start=1, page_end=None
         if to_update:
             batch = [
                 {"range": f"A{row_number}:H{row_number}", "values": [values]}
-                for row_number, values in sorted(to_update.items())
+                for row_number, values in sorted(to_update.items(), key=lambda kv: int(kv[0]))
             ]
             _sheets_retry(ws.batch_update, batch, value_input_option="USER_ENTERED")
+            journal["pending_update"] = {}
+            _save_journal(journal)
 
         # All new rows in a single append call.
         if to_append:
             _sheets_retry(ws.append_rows, to_append, value_input_option="USER_ENTERED")
+            journal["pending_append"] = []
+            _save_journal(journal)
 
         try:
             get_df.clear()  # bust the sheets cache so the page shows updates
         except Exception:
             pass
     except Exception as exc:
-        return added, updated, (
-            f"⚠️ Parsed products but writing to the sheet failed: {exc}\n"
-            + "\n".join(log)
-        )
-
-    summary = (
-        f"✅ Catalogue sync complete — {added} added, {updated} updated, "
-        f"{backfilled} product image(s) backfilled, {skipped} unchanged."
-    )
-    return added, updated, summary + "\n" + "\n".join(log)
+        return str(exc)
+    return None
 
 
 def _clean_line_multiline(s: str) -> str:
@@ -1248,8 +1551,152 @@ def _filename_to_room_hint(filename: str) -> str:
     return re.sub(r"\s+", " ", name).strip() or "Furniture"
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+# PAGE CACHE — parsed products + crop boxes per rendered page
+# ═════════════════════════════════════════════════════════════════════════════
+# One JSON file per (PDF, page) under the local state folder
+# (services/local_state.py): .crm_state/catalog_page_cache/<fileId>/0007.json
+# holding {"key": …, "parsed": {main_category, products[… region, photo_region]}}.
+# The key hashes everything the model's answer depends on, so a stale entry is
+# simply a miss and gets overwritten.
+
+# Bump whenever _PAGE_PROMPT / _PAGE_SCHEMA change meaningfully.
+_PROMPT_VERSION = 1
+
+
+def _page_cache_key(file_id, pno, png_bytes, model, hint) -> str:
+    import hashlib
+
+    h = hashlib.sha256()
+    for part in (file_id, str(pno), model, str(_PROMPT_VERSION), hint or ""):
+        h.update(part.encode("utf-8") + b"\0")
+    h.update(hashlib.sha256(png_bytes).digest())
+    return h.hexdigest()
+
+
+def _page_cache_path(file_id, pno) -> str:
+    from services.local_state import state_path
+
+    return state_path("catalog_page_cache", file_id, f"{pno + 1:04d}.json")
+
+
+def _page_cache_get(file_id, pno, key):
+    """Cached parse for this page if its key still matches, else None."""
+    from services.local_state import read_json
+
+    entry = read_json(_page_cache_path(file_id, pno))
+    if isinstance(entry, dict) and entry.get("key") == key and isinstance(entry.get("parsed"), dict):
+        return entry["parsed"]
+    return None
+
+
+def _page_cache_put(file_id, pno, key, parsed) -> None:
+    """Store a parse. Never raises — the cache only saves API calls."""
+    from services.local_state import write_json
+
+    try:
+        write_json(_page_cache_path(file_id, pno), {"key": key, "parsed": parsed})
+    except Exception as exc:
+        print(f"[CATALOG] page cache write failed ({exc})")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# PAGE PIPELINE — render in order, parse concurrently, reassemble in order
+# ═════════════════════════════════════════════════════════════════════════════
+
+# Concurrent vision requests per catalogue (CATALOG_PARSE_WORKERS overrides).
+_PARSE_WORKERS = 4
+# Retries for a page whose request hit a rate limit / overload / 5xx.
+_PARSE_RETRIES = 5
+_RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def _get_parse_workers() -> int:
+    raw = _secret("anthropic", "parse_workers") or os.getenv("CATALOG_PARSE_WORKERS", "").strip()
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return _PARSE_WORKERS
+
+
+def _retry_after(exc) -> float | None:
+    """Seconds to wait for a retryable API error, or None if not retryable."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    name = type(exc).__name__
+    if status not in _RETRY_STATUS and name not in (
+        "RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError",
+    ):
+        return None
+    try:
+        hdr = exc.response.headers.get("retry-after")
+        return float(hdr) if hdr else 0.0
+    except Exception:
+        return 0.0
+
+
+def _parse_page_with_backoff(client, model, png_bytes, hint, label):
+    """Run `_parse_page` from a worker thread with rate-limit-aware retries.
+
+    Diagnostics are collected (not printed) because the `say` callback may be
+    a Streamlit call that only works on the script thread; the caller replays
+    them when the page is reassembled. Returns (parsed_or_None, messages).
+    """
+    import random
+    import time as _time
+
+    msgs: list[str] = []
+    delay = 2.0
+    for attempt in range(_PARSE_RETRIES + 1):
+        try:
+            return _parse_page(client, model, png_bytes, hint, say=msgs.append, label=label), msgs
+        except Exception as exc:
+            wait_s = _retry_after(exc)
+            if wait_s is None or attempt == _PARSE_RETRIES:
+                msgs.append(f"   ⚠️ {label}: vision error: {exc}")
+                return None, msgs
+            wait_s = max(wait_s, delay) + random.uniform(0, 1.0)
+            msgs.append(f"   ⏳ {label}: {type(exc).__name__} — retrying in {wait_s:.0f}s")
+            _time.sleep(wait_s)
+            delay = min(delay * 2, 60.0)
+    return None, msgs
+
+
+def _finish_page(page, pix, pno, parsed, hint, say) -> list:
+    """Attach category, raster images and photo crops to one parsed page."""
+    label = f"page {pno + 1}"
+    products = (parsed or {}).get("products") or []
+    if not products:
+        return []
+
+    page_main = _clean_line(parsed.get("main_category") or hint)
+    # Raster extraction (best-effort) still feeds swatch detection.
+    images = _extract_page_images(page, pix)
+    _assign_images(products, images)
+    crops_ok = 0
+    for p in products:
+        p["main_category"] = page_main
+        # PRIMARY product photo: crop the model's photo box straight out
+        # of the rendered page. Robust to flattened/vector PDFs where
+        # raster extraction finds nothing. Falls back to the raster
+        # region box if photo_region is missing/degenerate.
+        crop = _crop_region_png(pix, p.get("photo_region") or {})
+        if not crop:
+            crop = _crop_region_png(pix, p.get("region") or {})
+        if crop:
+            p["main_crop"] = {"bytes": crop, "ext": "png"}
+            crops_ok += 1
+    say(
+        f"   {label}: {len(products)} product(s), "
+        f"{crops_ok} photo crop(s), {len(images)} raster image(s)"
+    )
+    return products
+
+
 def _extract_products_from_pdf(client, model, pdf_bytes, hint, say,
-                               page_start=1, page_end=None) -> list:
+                               page_start=1, page_end=None, workers=None,
+                               file_id=None) -> list:
     """Render each page, ask Claude for the products, and attach the page's
     raster images to the right product. Returns a flat list of product dicts,
     each carrying main_images / swatch_images (raw bytes) + main_category.
@@ -1257,59 +1704,89 @@ def _extract_products_from_pdf(client, model, pdf_bytes, hint, say,
     Only pages in the inclusive 1-based window ``page_start``..``page_end`` are
     sent to the model. Pass a moving window across runs so you never re-read
     (or re-bill) pages you already processed. ``page_end=None`` reads to the end.
+
+    Pipeline: pages are rendered on this thread (PyMuPDF documents are not
+    thread-safe) and their vision requests run on a bounded thread pool of
+    ``workers`` (default `_get_parse_workers()`), with backoff on rate limits.
+    Results are reassembled strictly in page order, so products, crops and
+    ``say`` progress lines come out exactly as with a sequential scan.
+
+    Each page is rasterised once (`_render_page_pixmap`); the model image and
+    all crops come from that pixmap. At most 2×workers page pixmaps are held
+    at once, and each is dropped as soon as its page has been post-processed.
+
+    With ``file_id`` (the Drive id of the PDF) every page is first looked up in
+    the page cache (see `_page_cache_key`); only pages whose rendered pixels,
+    model, prompt or room hint changed are sent to the model.
+
+    ``client`` only needs ``client.messages.create(**kwargs)`` — a local stub
+    works (see tools/benchmark_catalog_parse.py).
     """
     import fitz
+    from concurrent.futures import ThreadPoolExecutor
 
+    workers = workers or _get_parse_workers()
     all_products = []
     pages_with_products = 0
-    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+    cache_hits = 0
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
         n_pages = doc.page_count
         start0 = max(0, int(page_start) - 1)                 # 0-based, inclusive
         end0 = n_pages if not page_end else min(n_pages, int(page_end))  # exclusive
-        for pno in range(start0, end0):
-            page = doc[pno]
-            label = f"page {pno + 1}"
-            try:
-                png = _render_page_png(page)
-            except Exception as exc:
-                say(f"   ⚠️ {label}: render failed: {exc}")
-                continue
-            try:
-                parsed = _parse_page(client, model, png, hint, say=say, label=label)
-            except Exception as exc:
-                say(f"   ⚠️ {label}: vision error: {exc}")
-                continue
 
-            products = parsed.get("products") or []
-            if not products:
-                continue
+        in_flight: dict = {}          # pno -> (pixmap, cache_key, Future | cached parse)
+        next_render = start0
 
-            pages_with_products += 1
-            page_main = _clean_line(parsed.get("main_category") or hint)
-            # Raster extraction (best-effort) still feeds swatch detection.
-            images = _extract_page_images(doc, page)
-            _assign_images(products, images)
-            crops_ok = 0
-            for p in products:
-                p["main_category"] = page_main
-                # PRIMARY product photo: crop the model's photo box straight out
-                # of the rendered page. Robust to flattened/vector PDFs where
-                # raster extraction finds nothing. Falls back to the raster
-                # region box if photo_region is missing/degenerate.
-                crop = _crop_region_png(page, p.get("photo_region") or {})
-                if not crop:
-                    crop = _crop_region_png(page, p.get("region") or {})
-                if crop:
-                    p["main_crop"] = {"bytes": crop, "ext": "png"}
-                    crops_ok += 1
-                all_products.append(p)
-            say(
-                f"   {label}: {len(products)} product(s), "
-                f"{crops_ok} photo crop(s), {len(images)} raster image(s)"
-            )
+        def _fill():
+            nonlocal next_render, cache_hits
+            while next_render < end0 and len(in_flight) < 2 * workers:
+                pno = next_render
+                next_render += 1
+                label = f"page {pno + 1}"
+                try:
+                    pix = _render_page_pixmap(doc[pno])
+                    png = _model_png(pix)
+                except Exception as exc:
+                    say(f"   ⚠️ {label}: render failed: {exc}")
+                    in_flight[pno] = None
+                    continue
+                key = _page_cache_key(file_id, pno, png, model, hint) if file_id else ""
+                cached = _page_cache_get(file_id, pno, key) if key else None
+                if cached is not None:
+                    cache_hits += 1
+                    in_flight[pno] = (pix, key, cached)
+                    continue
+                in_flight[pno] = (pix, key, pool.submit(
+                    _parse_page_with_backoff, client, model, png, hint, label,
+                ))
 
+        for pno in range(start0, end0):
+            _fill()
+            entry = in_flight.pop(pno, None)
+            if entry is None:
+                continue
+            pix, key, job = entry
+            if isinstance(job, dict):
+                parsed = job
+            else:
+                parsed, msgs = job.result()
+                for m in msgs:
+                    say(m)
+                # Only clean parses are cached; a page that errored, was refused
+                # or came back unreadable is asked again next time.
+                if key and parsed is not None and not any("⚠️" in m for m in msgs):
+                    _page_cache_put(file_id, pno, key, parsed)
+            products = _finish_page(doc[pno], pix, pno, parsed, hint, say)
+            del pix, entry                # release the page buffer before the next render
+            if products:
+                pages_with_products += 1
+                all_products.extend(products)
+
+        cached_note = f", {cache_hits} page(s) from cache" if file_id else ""
         say(
             f"   scanned pages {start0 + 1}-{end0} of {n_pages} → "
             f"{len(all_products)} product block(s) on {pages_with_products} page(s)"
+            f"{cached_note}"
         )
     return all_products
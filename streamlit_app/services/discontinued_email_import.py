@@ -49,6 +49,9 @@ CONSOLIDATED_SHEET_TAB = "Consolidated"
 # Destination Google Sheet tab (registered as an OPS sheet in sheet_config.py).
 DISCONTINUED_CACHE_SHEET = "Discontinued Products"
 
+# Run-ledger job name (services/run_ledger.py) for the scheduled import
+DISCONTINUED_LEDGER_JOB = "Discontinued Products Import"
+
 # ─── Column mapping: raw Excel header → destination header ────────────────────
 # BAAN CODE is intentionally omitted (dropped when writing to the sheet).
 # Order here is the exact column order written to the Google Sheet.
@@ -137,6 +140,7 @@ def _build_clean_df(df_raw: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
 def fetch_discontinued_data(
     days_back: int = 30,
     today_only: bool = False,
+    ledger_job: str | None = None,
 ) -> tuple[pd.DataFrame, str]:
     """
     Connect to Gmail IMAP, find the latest 'Product Discontinuation Circular'
@@ -148,6 +152,10 @@ def fetch_discontinued_data(
     days_back  : how many calendar days back to search (used when today_only=False).
                  Circulars are infrequent, so the default window is generous (30d).
     today_only : if True, restrict search to today's emails only (11 AM cron).
+    ledger_job : when set, stop right after the UID SEARCH (or the download)
+                 if the message (or attachment) is already in the run ledger
+                 for this job — see services/run_ledger.py. Ledger keys of a
+                 real import are left in df.attrs["source_keys"].
     """
     import imaplib
     import email as _email
@@ -176,14 +184,16 @@ def fetch_discontinued_data(
         since_date = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
         search_query = f'(SUBJECT "{DISCONTINUED_SUBJECT}" SINCE {since_date})'
 
+    from services.run_ledger import (
+        ALREADY_IMPORTED, all_seen, content_key, imap_uid_search, message_key,
+    )
+
     try:
-        status, data = mail.search(None, search_query)
+        uidvalidity, email_ids = imap_uid_search(mail, search_query)
     except Exception as e:
         mail.logout()
         return pd.DataFrame(), f"❌ IMAP search error: {e}"
 
-    email_ids = data[0].split() if data and data[0] else []
-
     if not email_ids:
         mail.logout()
         if today_only:
@@ -198,9 +208,14 @@ def fetch_discontinued_data(
 
     # Most recent match
     latest_id = email_ids[-1]
+    msg_key = message_key(IMAP_EMAIL, uidvalidity, latest_id)
+
+    if ledger_job and all_seen(ledger_job, [msg_key]):
+        mail.logout()
+        return pd.DataFrame(), f"✅ Latest Discontinuation Circular {ALREADY_IMPORTED} — nothing to do."
 
     try:
-        _, msg_data = mail.fetch(latest_id, "(RFC822)")
+        _, msg_data = mail.uid("FETCH", latest_id, "(RFC822)")
         mail.logout()
     except Exception as e:
         try:
@@ -219,6 +234,12 @@ def fetch_discontinued_data(
             "⚠️ Discontinuation Circular email found but no Excel attachment detected."
         )
 
+    att_key = content_key(attachment_bytes)
+    if ledger_job and all_seen(ledger_job, [att_key]):
+        return pd.DataFrame(), (
+            f"✅ Discontinuation Circular attachment {ALREADY_IMPORTED} (re-sent) — nothing to do."
+        )
+
     # Parse Excel
     try:
         excel_file = io.BytesIO(attachment_bytes)
@@ -271,6 +292,7 @@ def fetch_discontinued_data(
     if missing:
         status_msg += f"\n⚠️ Expected columns not found (left blank): {', '.join(missing)}"
 
+    clean.attrs["source_keys"] = [msg_key, att_key]
     return clean, status_msg
 
 
@@ -419,7 +441,10 @@ def load_cached_discontinued() -> tuple[pd.DataFrame, str]:
     return df, f"✅ Loaded {len(df)} discontinued item(s) from the sheet."
 
 
-def fetch_and_save_discontinued(today_only: bool = False) -> tuple[pd.DataFrame, str]:
+def fetch_and_save_discontinued(
+    today_only: bool = False,
+    skip_unchanged: bool = False,
+) -> tuple[pd.DataFrame, str]:
     """
     Scheduler entry-point and manual-trigger helper.
 
@@ -428,6 +453,8 @@ def fetch_and_save_discontinued(today_only: bool = False) -> tuple[pd.DataFrame,
     today_only : if True (11 AM cron), only look at today's email. If False
                  (manual button / dashboard toggle), look back over the last
                  30 days for the most recent circular.
+    skip_unchanged : scheduled runs only — end after the IMAP search when the
+                 circular is already in the run ledger (df empty, ✅ status).
 
     Returns (df, combined_status). The returned df is the full circular
     (whether or not any rows were newly appended); the status describes how
@@ -436,8 +463,13 @@ def fetch_and_save_discontinued(today_only: bool = False) -> tuple[pd.DataFrame,
     df, status = fetch_discontinued_data(
         days_back=30,
         today_only=today_only,
+        ledger_job=DISCONTINUED_LEDGER_JOB if skip_unchanged else None,
     )
     if df is None or df.empty:
         return df, status
+    source_keys = df.attrs.get("source_keys", [])
     save_msg = save_discontinued_to_sheet(df)
+    if "❌" not in save_msg:
+        from services.run_ledger import record_keys
+        record_keys(DISCONTINUED_LEDGER_JOB, source_keys, records_count=len(df))
     return df, f"{status}\n{save_msg}"
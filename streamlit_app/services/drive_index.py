@@ -0,0 +1,304 @@
+"""
+services/drive_index.py
+
+Persisted index of the Google Drive invoices tree, kept current with the
+Drive Changes API instead of re-walking the tree on every call.
+
+Tree covered (GOOGLE_DRIVE_INVOICES_FOLDER_ID as root):
+
+    <root>
+      └── "<N> <Month>-<YYYY>"            ← month folders        (depth 1)
+            ├── *.pdf                      ← stray PDFs in the month folder
+            └── "for DD.MM.YYYY"           ← day folders          (depth 2)
+                  └── *.pdf
+
+For every folder and PDF the index keeps id, name, parent, md5Checksum and
+modifiedTime, in one JSON file per root under the local state folder
+(services/local_state.py).
+
+Lifecycle:
+  * first use     — startPageToken is taken, then the tree is listed once
+                    (one paginated files.list per folder).
+  * later uses    — changes.list from the saved page token (usually one call
+                    returning nothing), applied to the index, new token saved.
+                    Skipped entirely when the last refresh is < REFRESH_SECONDS old.
+  * token expired / index unreadable — rebuilt from scratch.
+
+Callers get folder/PDF listers with the same shape as the live helpers in
+email_sender_delivery_schedule (`_list_drive_folders` / `_list_drive_pdfs`):
+
+    list_folders, list_pdfs = tree_listers(drive_service, root_id)
+    for mf in list_folders(root_id): ...
+
+If the index cannot be loaded the live listers are returned instead, so the
+walkers behave exactly as before — just slower.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from services.local_state import read_json, state_path, write_json
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+PDF_MIME = "application/pdf"
+
+# Month folders (1) and day folders (2) are indexed; PDFs live at depth 2 or 3.
+_MAX_FOLDER_DEPTH = 2
+REFRESH_SECONDS = 60
+_INDEX_VERSION = 1
+
+_FILE_FIELDS = "id, name, mimeType, md5Checksum, modifiedTime, parents, trashed"
+
+_lock = threading.Lock()
+_memo: dict[str, dict] = {}   # root_id -> index (process-level; replaced, never edited, once published)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# DRIVE CALLS
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _list_children(drive_service, parent_id: str) -> list[dict]:
+    """All non-trashed sub-folders and PDFs directly inside `parent_id` (paginated)."""
+    q = (
+        f"'{parent_id}' in parents and trashed = false "
+        f"and (mimeType = '{FOLDER_MIME}' or mimeType = '{PDF_MIME}')"
+    )
+    out: list[dict] = []
+    token = None
+    while True:
+        resp = (
+            drive_service.files()
+            .list(q=q, fields=f"nextPageToken, files({_FILE_FIELDS})",
+                  pageSize=1000, pageToken=token)
+            .execute()
+        )
+        out.extend(resp.get("files", []))
+        token = resp.get("nextPageToken")
+        if not token:
+            return out
+
+
+def _node(f: dict, parent_id: str, depth: int) -> dict:
+    return {
+        "name":     f.get("name", ""),
+        "parent":   parent_id,
+        "folder":   f.get("mimeType") == FOLDER_MIME,
+        "depth":    depth,
+        "md5":      f.get("md5Checksum", ""),
+        "modified": f.get("modifiedTime", ""),
+    }
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# BUILD / REFRESH
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _walk_into(drive_service, nodes: dict, folder_id: str, depth: int) -> int:
+    """List `folder_id` (at `depth`) and everything indexable below it. Returns list calls made."""
+    calls = 1
+    for f in _list_children(drive_service, folder_id):
+        is_folder = f.get("mimeType") == FOLDER_MIME
+        child_depth = depth + 1
+        if is_folder and child_depth > _MAX_FOLDER_DEPTH:
+            continue
+        if not is_folder and depth == 0:
+            continue  # PDFs directly under the root are not part of the tree
+        nodes[f["id"]] = _node(f, folder_id, child_depth)
+        if is_folder:
+            calls += _walk_into(drive_service, nodes, f["id"], child_depth)
+    return calls
+
+
+def _build(drive_service, root_id: str) -> dict:
+    # Token first: anything that changes during the walk is replayed next refresh.
+    token = drive_service.changes().getStartPageToken().execute()["startPageToken"]
+    nodes: dict[str, dict] = {}
+    t0 = time.time()
+    calls = _walk_into(drive_service, nodes, root_id, 0)
+    print(f"[DRIVE INDEX] Built index: {len(nodes)} entries, {calls} list call(s), "
+          f"{time.time() - t0:.1f}s")
+    return {
+        "version": _INDEX_VERSION,
+        "root_id": root_id,
+        "page_token": token,
+        "refreshed_at": time.time(),
+        "nodes": nodes,
+    }
+
+
+def _drop(nodes: dict, node_id: str) -> None:
+    """Remove a node and everything indexed below it."""
+    stack = [node_id]
+    while stack:
+        nid = stack.pop()
+        nodes.pop(nid, None)
+        stack.extend(k for k, v in nodes.items() if v["parent"] == nid)
+
+
+def _depth_of_parent(index: dict, parent_id: str) -> int | None:
+    if parent_id == index["root_id"]:
+        return 0
+    p = index["nodes"].get(parent_id)
+    return p["depth"] if p and p["folder"] else None
+
+
+def _apply_changes(drive_service, index: dict, changes: list[dict]) -> int:
+    """Apply a batch of changes.list entries. Returns number of index edits."""
+    nodes = index["nodes"]
+    edits = 0
+    pending: list[dict] = []
+    for ch in changes:
+        fid = ch.get("fileId")
+        f = ch.get("file") or {}
+        if ch.get("removed") or f.get("trashed"):
+            if fid in nodes:
+                _drop(nodes, fid)
+                edits += 1
+            continue
+        if f.get("mimeType") not in (FOLDER_MIME, PDF_MIME):
+            continue
+        pending.append(f)
+
+    # Folders before files, and repeat so a new day folder inside a new month
+    # folder is placed regardless of the order the changes arrived in.
+    pending.sort(key=lambda f: f.get("mimeType") != FOLDER_MIME)
+    progress = True
+    while pending and progress:
+        progress = False
+        left = []
+        for f in pending:
+            fid = f["id"]
+            parent = next((p for p in f.get("parents", []) if _depth_of_parent(index, p) is not None), None)
+            if parent is None:
+                left.append(f)
+                continue
+            depth = _depth_of_parent(index, parent) + 1
+            is_folder = f.get("mimeType") == FOLDER_MIME
+            if (is_folder and depth > _MAX_FOLDER_DEPTH) or (not is_folder and depth == 1):
+                left.append(f)
+                continue
+            is_new_folder = is_folder and fid not in nodes
+            nodes[fid] = _node(f, parent, depth)
+            if is_new_folder:
+                # Moved-in folders bring existing children that won't show up as changes.
+                _walk_into(drive_service, nodes, fid, depth)
+            edits += 1
+            progress = True
+        pending = left
+
+    # Whatever is left now lives outside the tree (moved out) — forget it.
+    for f in pending:
+        if f["id"] in nodes:
+            _drop(nodes, f["id"])
+            edits += 1
+    return edits
+
+
+def _refresh(drive_service, index: dict) -> int:
+    token = index["page_token"]
+    edits = 0
+    while token:
+        resp = (
+            drive_service.changes()
+            .list(pageToken=token, spaces="drive", includeRemoved=True, pageSize=1000,
+                  fields=f"nextPageToken, newStartPageToken, "
+                         f"changes(fileId, removed, file({_FILE_FIELDS}))")
+            .execute()
+        )
+        edits += _apply_changes(drive_service, index, resp.get("changes", []))
+        if resp.get("newStartPageToken"):
+            index["page_token"] = resp["newStartPageToken"]
+            break
+        token = resp.get("nextPageToken")
+        index["page_token"] = token
+    index["refreshed_at"] = time.time()
+    return edits
+
+
+def _index_path(root_id: str) -> str:
+    return state_path("drive_index", f"{root_id}.json")
+
+
+def get_index(drive_service, root_id: str, force_rebuild: bool = False) -> dict:
+    """
+    Return the up-to-date index for `root_id`, building or refreshing it as
+    needed and persisting it. Raises on Drive errors during a build.
+    """
+    with _lock:
+        index = None if force_rebuild else _memo.get(root_id)
+        if index is None and not force_rebuild:
+            index = read_json(_index_path(root_id))
+            if not index or index.get("version") != _INDEX_VERSION or index.get("root_id") != root_id:
+                index = None
+
+        if index is None:
+            index = _build(drive_service, root_id)
+            write_json(_index_path(root_id), index)
+        elif time.time() - index.get("refreshed_at", 0) >= REFRESH_SECONDS:
+            # Refresh a copy and swap it in: listers handed out earlier iterate
+            # the old index's nodes without the lock, so it is never edited.
+            index = {**index, "nodes": dict(index["nodes"])}
+            try:
+                edits = _refresh(drive_service, index)
+            except Exception as e:
+                # Expired / invalid page token → start over.
+                print(f"[DRIVE INDEX] Refresh failed ({e}) — rebuilding.")
+                index = _build(drive_service, root_id)
+                edits = 1
+            if edits:
+                print(f"[DRIVE INDEX] Applied {edits} change(s).")
+            write_json(_index_path(root_id), index)
+
+        _memo[root_id] = index
+        return index
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# QUERIES
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _entries(index: dict, parent_id: str, folder: bool) -> list[dict]:
+    return sorted(
+        (
+            {"id": nid, "name": n["name"], "md5Checksum": n["md5"], "modifiedTime": n["modified"]}
+            for nid, n in index["nodes"].items()
+            if n["parent"] == parent_id and n["folder"] == folder
+        ),
+        key=lambda e: e["name"],
+    )
+
+
+def folders_in(index: dict, parent_id: str) -> list[dict]:
+    """Sub-folders (id, name, …) of `parent_id`, by name."""
+    return _entries(index, parent_id, True)
+
+
+def pdfs_in(index: dict, parent_id: str) -> list[dict]:
+    """PDFs (id, name, md5Checksum, modifiedTime) directly inside `parent_id`, by name."""
+    return _entries(index, parent_id, False)
+
+
+def find_folder(index: dict, parent_id: str, name: str) -> str | None:
+    """Id of the sub-folder of `parent_id` called exactly `name`, or None."""
+    for nid, n in index["nodes"].items():
+        if n["parent"] == parent_id and n["folder"] and n["name"] == name:
+            return nid
+    return None
+
+
+def tree_listers(drive_service, root_id: str):
+    """
+    (list_folders, list_pdfs) callables taking a parent id. Answered from the
+    index when it can be loaded; otherwise the live Drive listers.
+    """
+    try:
+        index = get_index(drive_service, root_id)
+        return (lambda pid: folders_in(index, pid)), (lambda pid: pdfs_in(index, pid))
+    except Exception as e:
+        print(f"[DRIVE INDEX] Unavailable ({e}) — listing Drive live.")
+        from services.email_sender_delivery_schedule import _list_drive_folders, _list_drive_pdfs
+        return (
+            lambda pid: _list_drive_folders(drive_service, pid),
+            lambda pid: _list_drive_pdfs(drive_service, pid),
+        )
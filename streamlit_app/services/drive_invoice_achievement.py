@@ -9,6 +9,10 @@ Maps each SO No to a Sales Person via the CRM Google Sheet, then
 aggregates per-salesperson totals for each month and writes them to
 the "Monthly Sales value without GST" Google Sheet.
 
+Re-runs are incremental: each PDF's parse result is remembered per
+(fileId, md5Checksum), so only new or changed invoices are downloaded, and the
+month's sheet rows are upserted rather than rewritten.
+
 Drive folder layout:
   <GOOGLE_DRIVE_INVOICES_FOLDER_ID>         ← root (same secret used by delivery emails)
     └── "1 Apr-2026", "2 May-2026" …        ← financial-month folders
@@ -21,10 +25,13 @@ Usage:
 """
 from __future__ import annotations
 
-import io
 import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
 import pandas as pd
 
@@ -125,23 +132,25 @@ def _extract_invoice_data(pdf_bytes: bytes, filename: str = "") -> dict | None:
     or None if either field cannot be found.
 
     Extraction strategy:
-      1. Use pdfplumber to get all text from all pages.
+      1. Get all text from all pages via services.pdf_text (PyMuPDF first,
+         pdfplumber only if the fast text doesn't yield both fields).
       2. Search for "Other References" and grab the nearby SO number (WON…).
       3. Search for the pre-GST total using common Godrej invoice labels.
     """
-    try:
-        import pdfplumber
-    except ImportError:
-        return None
+    from services.pdf_text import extract_pdf_text
 
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            full_text = "\n".join(
-                page.extract_text() or "" for page in pdf.pages
-            )
+        full_text, _engine = extract_pdf_text(
+            pdf_bytes, accept=lambda t: _parse_invoice_text(t) is not None
+        )
     except Exception:
         return None
 
+    return _parse_invoice_text(full_text)
+
+
+def _parse_invoice_text(full_text: str) -> dict | None:
+    """Steps 2–3 of `_extract_invoice_data` on already-extracted text."""
     if not full_text.strip():
         return None
 
@@ -312,18 +321,25 @@ def _get_gspread_client():
     return gspread.authorize(creds)
 
 
-def _write_invoice_rows_to_sheet(rows: list[dict]) -> None:
+def _write_invoice_rows_to_sheet(rows: list[dict], month_name: str = "", year: int | str = "") -> dict[str, int]:
     """
-    Write (or overwrite the matching rows for the month/year) in the
-    'Monthly Sales value without GST' Google Sheet.
+    Upsert one month's rows in the 'Monthly Sales value without GST' sheet:
+    one row per invoice plus a per-person TOTAL row, recomputed from `rows`.
 
-    Rows with the same (Month, Year) are first removed, then the new rows
-    (one per invoice) are appended, followed by a per-person TOTAL row.
+    Only that month/year's rows are touched — matched on
+    (Month, Year, Day Folder, Invoice File, Godrej SO No, Sales Person) they
+    are updated in place, deleted when gone, appended when new. Other months
+    are never rewritten. With `rows` empty the month's rows are removed.
+
+    Returns the {"updated", "deleted", "added"} counts.
     """
     from services.sheet_config import OPS_SPREADSHEET_ID
+    from services.sheets import sync_rows_in_scope
 
-    if not rows:
-        return
+    month_val = str(rows[0]["Month"]) if rows else str(month_name)
+    year_val  = str(rows[0]["Year"])  if rows else str(year)
+    if not month_val or not year_val:
+        return {"updated": 0, "deleted": 0, "added": 0}
 
     gc = _get_gspread_client()
     sh = gc.open_by_key(OPS_SPREADSHEET_ID)
@@ -340,40 +356,11 @@ def _write_invoice_rows_to_sheet(rows: list[dict]) -> None:
         ws.clear()
         ws.append_row(_SHEET_HEADERS)
 
-    # Read all current data to drop old rows for this month/year
-    all_data = ws.get_all_values()
-    if len(all_data) <= 1:
-        kept_rows = []
-    else:
-        header = all_data[0]
-        try:
-            month_col_idx = header.index("Month")
-            year_col_idx  = header.index("Year")
-        except ValueError:
-            kept_rows = all_data[1:]
-        else:
-            target_month = str(rows[0]["Month"])
-            target_year  = str(rows[0]["Year"])
-            kept_rows = [
-                r for r in all_data[1:]
-                if not (
-                    len(r) > month_col_idx and r[month_col_idx] == target_month and
-                    len(r) > year_col_idx  and r[year_col_idx]  == target_year
-                )
-            ]
-
-    # Re-write the whole sheet
-    ws.clear()
-    ws.append_row(_SHEET_HEADERS)
-    if kept_rows:
-        ws.append_rows(kept_rows)
-
-    # Append new invoice rows
     new_sheet_rows = []
     for r in rows:
         new_sheet_rows.append([
-            str(r.get("Month", "")),
-            str(r.get("Year", "")),
+            month_val,
+            year_val,
             str(r.get("Day Folder", "")),
             str(r.get("Invoice File", "")),
             str(r.get("Godrej SO No", "")),
@@ -381,23 +368,144 @@ def _write_invoice_rows_to_sheet(rows: list[dict]) -> None:
             str(round(float(r.get("Amount (Pre-GST)", 0) or 0), 2)),
         ])
 
-    # Append totals rows (one per sales person for that month/year)
+    # Totals rows (one per sales person for that month/year)
     sp_totals: dict[str, float] = {}
     for r in rows:
         sp = str(r.get("Sales Person", "UNKNOWN"))
         sp_totals[sp] = sp_totals.get(sp, 0.0) + float(r.get("Amount (Pre-GST)", 0) or 0)
 
-    month_val = str(rows[0]["Month"]) if rows else ""
-    year_val  = str(rows[0]["Year"])  if rows else ""
-
     for sp, total in sorted(sp_totals.items()):
         new_sheet_rows.append([
             month_val, year_val, "TOTAL", "TOTAL",
             "TOTAL", sp, str(round(total, 2)),
         ])
 
-    if new_sheet_rows:
-        ws.append_rows(new_sheet_rows)
+    return sync_rows_in_scope(
+        ws,
+        new_sheet_rows,
+        key_cols=[0, 1, 2, 3, 4, 5],
+        in_scope=lambda r: r[0] == month_val and r[1] == year_val,
+    )
+
+
+# ── Per-file processing state (incremental re-runs) ──────────────────────────
+# One JSON per month under the local state folder:
+#   {"files": {fileId: {"sig": md5Checksum, "day": ..., "name": ..., "data": {...} | null}}}
+# A file is downloaded again only when it is new or its md5Checksum changed.
+# "data": null remembers PDFs that are not parseable invoices.
+
+def _month_state_path(month: int, year: int) -> str:
+    from services.local_state import state_path
+    return state_path("drive_achievement", f"{year}-{month:02d}.json")
+
+
+def _file_signature(f: dict) -> str:
+    """md5Checksum, or modifiedTime when Drive reports no checksum."""
+    return f.get("md5Checksum") or f.get("modifiedTime") or ""
+
+
+# ── Download → parse pipeline ────────────────────────────────────────────────
+# Downloads are I/O-bound → a bounded thread pool, one Drive client per thread
+# (googleapiclient / httplib2 objects are not thread-safe). Parsing is
+# CPU-bound → a process pool. Results are handed back as they complete.
+
+_DOWNLOAD_WORKERS = 8
+_PARSE_WORKERS    = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_thread_local = threading.local()
+
+
+def _thread_drive_service():
+    """The calling thread's own Drive client (built on first use)."""
+    svc = getattr(_thread_local, "drive", None)
+    if svc is None:
+        svc = _thread_local.drive = _get_drive_service()
+    return svc
+
+
+def _download_task(job: dict) -> tuple[dict, bytes | None]:
+    return job, _download_drive_file(_thread_drive_service(), job["file"]["id"])
+
+
+def _iter_parsed_invoices(jobs: list[dict]):
+    """
+    Download and parse every job ({"day": day folder name, "file": Drive file
+    dict}) concurrently. Yields (job, parsed-dict-or-None) in completion order
+    and prints throughput when done. A job whose download or parse raised
+    gets job["error"] set, so callers can retry it rather than remember it
+    as "not an invoice".
+
+    If a process pool cannot be started (restricted sandbox), or a worker
+    dies and breaks it, parsing falls back to the download threads; parses
+    lost with a broken pool are resubmitted there.
+    """
+    if not jobs:
+        return
+
+    t0 = time.time()
+    done_files = 0
+    try:
+        parse_pool = ProcessPoolExecutor(max_workers=_PARSE_WORKERS)
+    except Exception as e:
+        print(f"[DRIVE ACHIEVEMENT] Process pool unavailable ({e}) — parsing in threads.")
+        parse_pool = None
+    parse_procs = _PARSE_WORKERS if parse_pool else 0
+
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as dl_pool:
+
+        def drop_parse_pool() -> None:
+            nonlocal parse_pool
+            if parse_pool is not None:
+                print("[DRIVE ACHIEVEMENT] Parse process died — parsing the rest in threads.")
+                parse_pool.shutdown(wait=False, cancel_futures=True)
+                parse_pool = None
+
+        def submit_parse(job: dict, pdf_bytes: bytes):
+            if parse_pool is not None:
+                try:
+                    return parse_pool.submit(_extract_invoice_data, pdf_bytes, job["file"]["name"])
+                except BrokenProcessPool:
+                    drop_parse_pool()
+            return dl_pool.submit(_extract_invoice_data, pdf_bytes, job["file"]["name"])
+
+        pending = {dl_pool.submit(_download_task, j): ("dl", j, None) for j in jobs}
+        try:
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    kind, job, pdf_bytes = pending.pop(fut)
+                    if kind == "dl":
+                        try:
+                            _, pdf_bytes = fut.result()
+                        except Exception:
+                            pdf_bytes = None
+                        if not pdf_bytes:
+                            job["error"] = "download"
+                            done_files += 1
+                            yield job, None
+                            continue
+                        pending[submit_parse(job, pdf_bytes)] = ("parse", job, pdf_bytes)
+                    else:
+                        try:
+                            data = fut.result()
+                        except BrokenProcessPool:
+                            drop_parse_pool()
+                            pending[submit_parse(job, pdf_bytes)] = ("parse", job, pdf_bytes)
+                            continue
+                        except Exception:
+                            job["error"] = "parse"
+                            data = None
+                        done_files += 1
+                        yield job, data
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = max(time.time() - t0, 1e-6)
+    print(f"[DRIVE ACHIEVEMENT] {done_files} file(s) in {elapsed:.1f}s "
+          f"— {done_files / elapsed:.1f} files/sec "
+          f"({_DOWNLOAD_WORKERS} download thread(s), "
+          f"{parse_procs} parse process(es))")
 
 
 # ── Core: scan one month's Drive folder and compute achievement ───────────────
@@ -406,16 +514,24 @@ def compute_drive_achievement_for_month(
     month: int,
     year: int,
     write_to_sheet: bool = True,
+    full_rescan: bool = False,
 ) -> dict[str, float]:
     """
     Scan the Google Drive invoice folder for a specific month/year,
     parse every PDF, and return {SALES_PERSON_UPPER: total_pre_gst_amount}.
 
-    If write_to_sheet is True (default), also updates the
+    Incremental: PDFs whose (fileId, md5Checksum) were already parsed in an
+    earlier run are not downloaded again — their stored result is reused and
+    the totals are recomputed from all stored per-invoice rows. Files removed
+    from Drive drop out. full_rescan=True ignores the stored state.
+
+    If write_to_sheet is True (default), also upserts the month's rows in the
     "Monthly Sales value without GST" Google Sheet.
 
     Returns an empty dict on any unrecoverable error.
     """
+    from services.local_state import read_json, write_json
+
     root_id = _get_drive_folder_id()
     if not root_id:
         return {}
@@ -425,9 +541,12 @@ def compute_drive_achievement_for_month(
     except Exception:
         return {}
 
-    # ── Find the matching month folder ───────────────────────────────────────
+    # ── Find the matching month folder (from the cached Drive tree index) ────
+    from services.drive_index import tree_listers
+    list_folders, list_pdfs = tree_listers(drive, root_id)
+
     try:
-        month_folders = _list_drive_folders(drive, root_id)
+        month_folders = list_folders(root_id)
     except Exception:
         return {}
 
@@ -444,61 +563,86 @@ def compute_drive_achievement_for_month(
     # ── Build SO → Sales Person map ──────────────────────────────────────────
     so_to_sp = _build_so_to_sp_map()
 
-    # ── Walk day folders → download and parse each PDF ───────────────────────
-    invoice_rows: list[dict] = []
-
+    # ── List day folders → PDFs to process ───────────────────────────────────
     try:
-        day_folders = _list_drive_folders(drive, target_month_folder["id"])
+        day_folders = list_folders(target_month_folder["id"])
     except Exception:
         return {}
 
     month_name = _MONTH_NUM_TO_NAME.get(month, str(month))
 
+    all_files: list[dict] = []
     for df in day_folders:
-        day_name = df["name"]  # e.g. "For 1-05-2026"
         try:
-            pdfs = _list_drive_pdfs(drive, df["id"])
+            pdfs = list_pdfs(df["id"])
         except Exception:
             continue
+        all_files.extend({"day": df["name"], "file": f} for f in pdfs)  # day e.g. "For 1-05-2026"
+
+    # ── Only new / changed files need downloading ────────────────────────────
+    state_path = _month_state_path(month, year)
+    stored = {} if full_rescan else (read_json(state_path, default={}) or {}).get("files", {})
+    files_state: dict[str, dict] = {}
+    jobs: list[dict] = []
+    for j in all_files:
+        fid, sig = j["file"]["id"], _file_signature(j["file"])
+        prev = stored.get(fid)
+        if prev and sig and prev.get("sig") == sig:
+            files_state[fid] = {**prev, "day": j["day"], "name": j["file"]["name"]}
+        else:
+            jobs.append(j)
+
+    # ── Download + parse concurrently ────────────────────────────────────────
+    for job, data in _iter_parsed_invoices(jobs):
+        if job.get("error"):
+            continue  # not remembered → retried next run
+        f = job["file"]
+        files_state[f["id"]] = {
+            "sig": _file_signature(f), "day": job["day"], "name": f["name"], "data": data,
+        }
+    print(f"[DRIVE ACHIEVEMENT] {month_name} {year}: {len(jobs)} new/changed of "
+          f"{len(all_files)} file(s); {len(all_files) - len(jobs)} reused.")
 
-        for pdf_file in pdfs:
-            pdf_bytes = _download_drive_file(drive, pdf_file["id"])
-            if not pdf_bytes:
-                continue
-
-            data = _extract_invoice_data(pdf_bytes, filename=pdf_file["name"])
-            if not data:
-                continue
+    try:
+        write_json(state_path, {"files": files_state})
+    except Exception as e:
+        print(f"[DRIVE ACHIEVEMENT] Warning — state not saved: {e}")
 
-            godrej_so = data["godrej_so"].upper()
-            amount    = data["amount"]
+    # ── Rebuild per-invoice rows + totals from the stored state ──────────────
+    invoice_rows: list[dict] = []
+    aggregated: dict[str, float] = {}
+    for entry in files_state.values():
+        data = entry.get("data")
+        if not data:
+            continue
 
-            # Look up sales person from CRM
-            sales_person = so_to_sp.get(godrej_so, "UNKNOWN")
+        godrej_so = str(data["godrej_so"]).upper()
+        amount    = float(data["amount"])
 
-            invoice_rows.append({
-                "Month":           month_name,
-                "Year":            year,
-                "Day Folder":      day_name,
-                "Invoice File":    pdf_file["name"],
-                "Godrej SO No":    godrej_so,
-                "Sales Person":    sales_person,
-                "Amount (Pre-GST)": amount,
-            })
+        # Look up sales person from CRM (re-applied every run — CRM edits count)
+        sales_person = so_to_sp.get(godrej_so, "UNKNOWN")
+        aggregated[sales_person] = aggregated.get(sales_person, 0.0) + amount
 
-    if not invoice_rows:
-        return {}
+        invoice_rows.append({
+            "Month":           month_name,
+            "Year":            year,
+            "Day Folder":      entry["day"],
+            "Invoice File":    entry["name"],
+            "Godrej SO No":    godrej_so,
+            "Sales Person":    sales_person,
+            "Amount (Pre-GST)": amount,
+        })
 
-    # ── Aggregate per sales person ────────────────────────────────────────────
-    aggregated: dict[str, float] = {}
-    for row in invoice_rows:
-        sp = row["Sales Person"]
-        aggregated[sp] = aggregated.get(sp, 0.0) + row["Amount (Pre-GST)"]
+    # Keep the sheet in folder/file order.
+    invoice_rows.sort(key=lambda r: (r["Day Folder"], r["Invoice File"]))
 
     # ── Write to Google Sheet ─────────────────────────────────────────────────
+    # Also with no rows left: that clears the month's rows from the sheet
+    # (aggregated is then {}).
     if write_to_sheet:
         try:
-            _write_invoice_rows_to_sheet(invoice_rows)
+            counts = _write_invoice_rows_to_sheet(invoice_rows, month_name, year)
+            print(f"[DRIVE ACHIEVEMENT] Sheet upsert: {counts}")
         except Exception:
             pass  # Sheet write failure must not break the dashboard
 
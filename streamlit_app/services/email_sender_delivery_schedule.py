@@ -406,7 +406,7 @@ def _list_drive_folders(drive_service, parent_id: str) -> list[dict]:
 
 
 def _list_drive_pdfs(drive_service, parent_id: str) -> list[dict]:
-    """Return all PDF files (id, name) directly inside `parent_id`."""
+    """Return all PDF files (id, name, md5Checksum, modifiedTime) directly inside `parent_id`."""
     q = (
         f"'{parent_id}' in parents "
         "and mimeType = 'application/pdf' "
@@ -414,7 +414,7 @@ def _list_drive_pdfs(drive_service, parent_id: str) -> list[dict]:
     )
     result = (
         drive_service.files()
-        .list(q=q, fields="files(id, name)", pageSize=200)
+        .list(q=q, fields="files(id, name, md5Checksum, modifiedTime)", pageSize=200)
         .execute()
     )
     return result.get("files", [])
@@ -457,7 +457,7 @@ def fetch_invoice_from_drive(
                 └── <Day>                  e.g. "21"
                       └── <CustomerName>.pdf
 
-    Strategy:
+    Strategy (folder listings are answered by the local Drive tree index):
       1. List all month folders under root.
       2. For each month folder, list all day sub-folders.
       3. In every day folder (and in the month folder itself as fallback),
@@ -485,21 +485,25 @@ def fetch_invoice_from_drive(
     found_files: list[dict] = []   # {id, name}
 
     try:
-        month_folders = _list_drive_folders(drive, root_id)
+        # Folder listings come from the cached tree index (services/drive_index.py)
+        from services.drive_index import tree_listers
+        list_folders, list_pdfs = tree_listers(drive, root_id)
+
+        month_folders = list_folders(root_id)
         if not month_folders:
             return [], f"No month folders found in the Drive invoice root folder."
 
         for mf in month_folders:
             # Also check files sitting directly in the month folder (no day sub-folder)
-            direct_pdfs = _list_drive_pdfs(drive, mf["id"])
+            direct_pdfs = list_pdfs(mf["id"])
             for f in direct_pdfs:
                 if _name_matches(f["name"], customer_name):
                     found_files.append(f)
 
             # Check inside each day sub-folder
-            day_folders = _list_drive_folders(drive, mf["id"])
+            day_folders = list_folders(mf["id"])
             for df in day_folders:
-                day_pdfs = _list_drive_pdfs(drive, df["id"])
+                day_pdfs = list_pdfs(df["id"])
                 for f in day_pdfs:
                     if _name_matches(f["name"], customer_name):
                         found_files.append(f)
@@ -0,0 +1,769 @@
+"""
+services/forecast_engine.py
+
+Staged month-end forecast pipeline shared by the Monthend Sales Forecast page
+(pages/55_Monthend_Sales_Forecast.py), services/monthly_metrics.py and, through
+it, the Sales Reports and Strategy page. All three read the same computed
+result instead of each running its own copy of the pipeline.
+
+Stages, and the input each one is versioned on:
+
+    mis_stage()          MIS_Daily                      → raw MIS, pending / committed value
+    crm_stage()          CRM tabs (SO, date, rep cols)  → GODREJ SO → delivery date / rep
+    invoice_stage(m)     SALE INVOICE- <Month>          → invoice frame, WFX value, SO numbers
+    state_stage(m)       MONTHEND SALES FORECAST- <Month> → saved per-line decisions
+    forecast_result()    (mis, crm, state) versions     → merged frame + forecast breakdown
+
+A version is a content fingerprint (row count + hash) of the sheet as read
+through services.sheets.get_df, so a stage is rebuilt exactly when its input
+changes — an MIS / invoice import, a CRM edit, a save on the forecast page —
+and every later caller in the process gets the memoised value. Results are
+shared: callers that edit the forecast frame must copy it first.
+
+Forecast rules (the page's):
+  • every MIS line item is kept — no delivery-date window and no invoiced /
+    delivered exclusions — with the CRM delivery date and sales executive
+    mapped on by GODREJ SO NO
+  • the saved state overlays the per-order delivery decision and the per-item
+    manual-commitment flags on (SO_NO, SO_POSITION)
+  • Monthend Forecast Value = Agree + Godown + Partial (ticked items) +
+    Manually Committed — see `compute_forecast_breakdown`
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+_memo: dict[str, tuple] = {}   # stage key -> (version, value)
+
+FORECAST_SHEET_PREFIX = "MONTHEND SALES FORECAST- "
+
+# Delivery decisions whose forecast value is full-order by default and can be
+# narrowed to committed items only.
+DELIVER_SCOPE_FULL = "FULL"
+DELIVER_SCOPE_COMMITTED = "COMMITTED_ONLY"
+
+# "Order Cancelled" scope: cancel the whole order, or only specific ticked items.
+CANCEL_SCOPE_ENTIRE = "ENTIRE"
+CANCEL_SCOPE_ITEMS = "ITEMS"
+
+# Columns fetched from MIS_Daily
+MIS_FETCH_COLS = [
+    "Sales Order No.",
+    "Sales Order Position",
+    "Item Code",
+    "Item Description",
+    "Sales Order Qty",
+    "Sales Order Warehouse",
+    "Total Net Basic",
+    "Sales Order Committed Qty",
+    "Address Line 4(Ship To)",
+    "City",
+    "Customer Name",
+    "Inventory Commitment Date",
+]
+
+# Canonical column names used internally
+INTERNAL_COLS = [
+    "SO_NO", "SO_POSITION", "ITEM_CODE", "ITEM_DESCRIPTION",
+    "SO_QTY", "WAREHOUSE", "TOTAL_NET_BASIC", "SO_COMMITTED_QTY",
+    "ADDRESS_LINE_4", "CITY",
+    "CUSTOMER_NAME", "INV_COMMITMENT_DATE",
+    "DELIVERY_DATE", "SALES_EXECUTIVE",
+    "DELIVERY_STATUS",      # per order (same value for every item in same SO)
+    "PARTIAL_SELECTED",     # per item: True when DELIVERY_STATUS == "Partial Delivery"
+    "CAN_COMMIT_MANUALLY",  # per item
+    "APPROVED_BY",          # per item
+    "COMMITTED_VIA",        # per item: how a manually-committed item is sourced (RPL / 34S Stock)
+    "DELIVER_SCOPE",        # per order: FULL or COMMITTED_ONLY (for Agree / Godown with uncommitted items)
+    "CANCEL_SCOPE",         # per order: ENTIRE or ITEMS (for "Order Cancelled")
+    "CANCEL_SELECTED",      # per item: True when this item is cancelled in an item-scope cancellation
+    "STOCK_34S_MESSAGE",    # per item
+]
+
+MIS_TO_INTERNAL = {
+    "Sales Order No.":           "SO_NO",
+    "Sales Order Position":      "SO_POSITION",
+    "Item Code":                 "ITEM_CODE",
+    "Item Description":          "ITEM_DESCRIPTION",
+    "Sales Order Qty":           "SO_QTY",
+    "Sales Order Warehouse":     "WAREHOUSE",
+    "Total Net Basic":           "TOTAL_NET_BASIC",
+    "Sales Order Committed Qty": "SO_COMMITTED_QTY",
+    "Address Line 4(Ship To)":   "ADDRESS_LINE_4",
+    "City":                      "CITY",
+    "Customer Name":             "CUSTOMER_NAME",
+    "Inventory Commitment Date": "INV_COMMITMENT_DATE",
+}
+
+# Saved-state columns overlaid on the fresh MIS frame, and their defaults
+STATE_DEFAULTS = {
+    "DELIVERY_STATUS":     "",
+    "PARTIAL_SELECTED":    False,
+    "CAN_COMMIT_MANUALLY": False,
+    "APPROVED_BY":         "",
+    "COMMITTED_VIA":       "",
+    "DELIVER_SCOPE":       DELIVER_SCOPE_FULL,
+    "CANCEL_SCOPE":        CANCEL_SCOPE_ENTIRE,
+    "CANCEL_SELECTED":     False,
+    "STOCK_34S_MESSAGE":   "",
+}
+STATE_BOOL_COLS = ["CAN_COMMIT_MANUALLY", "PARTIAL_SELECTED", "CANCEL_SELECTED"]
+
+_CRM_DATE_COLS = ("CUSTOMER DELIVERY DATE (TO BE)", "CUSTOMER DELIVERY DATE", "DELIVERY DATE")
+_CRM_REP_COLS = ("SALES PERSON", "SALES REP")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MONTH / SHEET NAMES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def forecast_month(ref: date | None = None) -> str:
+    """Month label ("June") the forecast, its state sheet and targets are keyed on."""
+    if ref is None:
+        ref = datetime.now(IST).date()
+    return ref.strftime("%B")
+
+
+def forecast_sheet_name(month: str) -> str:
+    return f"{FORECAST_SHEET_PREFIX}{month}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMMITMENT / STATUS PREDICATES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _to_num(v) -> float:
+    try:
+        return float(str(v).replace(",", "").strip())
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _is_mis_committed(row: pd.Series) -> bool:
+    qty = _to_num(row.get("SO_QTY", 0))
+    com = _to_num(row.get("SO_COMMITTED_QTY", 0))
+    return qty > 0 and qty == com
+
+
+def _is_manual_committed(row: pd.Series) -> bool:
+    can = str(row.get("CAN_COMMIT_MANUALLY", "")).upper() in ("TRUE", "1", "YES")
+    approved = str(row.get("APPROVED_BY", "")).strip()
+    return can and bool(approved) and approved.lower() not in ("nan", "none", "")
+
+
+def _is_committed(row: pd.Series) -> bool:
+    return _is_mis_committed(row) or _is_manual_committed(row)
+
+
+def _delivery_status(row: pd.Series) -> str:
+    return str(row.get("DELIVERY_STATUS", "")).strip()
+
+
+def _deliver_scope(grp: pd.DataFrame) -> str:
+    """
+    Order-level delivery scope: FULL (whole order) or COMMITTED_ONLY (only the
+    committed items). Defaults to FULL when unset or column absent.
+    """
+    if "DELIVER_SCOPE" not in grp.columns:
+        return DELIVER_SCOPE_FULL
+    val = str(grp["DELIVER_SCOPE"].iloc[0]).strip().upper()
+    return DELIVER_SCOPE_COMMITTED if val == DELIVER_SCOPE_COMMITTED else DELIVER_SCOPE_FULL
+
+
+def _partial_selected(row: pd.Series) -> bool:
+    return str(row.get("PARTIAL_SELECTED", "")).upper() in ("TRUE", "1", "YES")
+
+
+def _cancel_scope(grp: pd.DataFrame) -> str:
+    """
+    Order-level cancellation scope for "Order Cancelled" orders:
+    ENTIRE (whole order) or ITEMS (only the ticked items). Defaults to ENTIRE.
+    """
+    if "CANCEL_SCOPE" not in grp.columns:
+        return CANCEL_SCOPE_ENTIRE
+    val = str(grp["CANCEL_SCOPE"].iloc[0]).strip().upper()
+    return CANCEL_SCOPE_ITEMS if val == CANCEL_SCOPE_ITEMS else CANCEL_SCOPE_ENTIRE
+
+
+def _cancel_scope_value(row: pd.Series) -> str:
+    """Row-level read of the order's cancellation scope (constant per order)."""
+    val = str(row.get("CANCEL_SCOPE", "")).strip().upper()
+    return CANCEL_SCOPE_ITEMS if val == CANCEL_SCOPE_ITEMS else CANCEL_SCOPE_ENTIRE
+
+
+def _cancel_selected(row: pd.Series) -> bool:
+    return str(row.get("CANCEL_SELECTED", "")).upper() in ("TRUE", "1", "YES")
+
+
+# ─── Column forms ─────────────────────────────────────────────────────────────
+# The same rules as boolean Series over a whole frame. The calculators below use
+# these; the row forms above stay for per-item display logic.
+# tools/benchmark_forecast_predicates.py checks the two agree.
+
+_TRUE_TOKENS = ("TRUE", "1", "YES")
+_ORDER_STATUSES = (
+    "Order Cancelled", "Agree for Delivery", "Delivery to Godown",
+    "Partial Delivery", "Denied Delivery",
+)
+
+
+def _col(df: pd.DataFrame, name: str, default="") -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _num(s: pd.Series) -> pd.Series:
+    """Column form of `_to_num`."""
+    return pd.to_numeric(
+        s.astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce"
+    ).fillna(0.0)
+
+
+def _flag(s: pd.Series) -> pd.Series:
+    return s.astype(str).str.upper().isin(_TRUE_TOKENS)
+
+
+def mis_committed_mask(df: pd.DataFrame) -> pd.Series:
+    qty = _num(_col(df, "SO_QTY", 0))
+    com = _num(_col(df, "SO_COMMITTED_QTY", 0))
+    return (qty > 0) & (qty == com)
+
+
+def manual_committed_mask(df: pd.DataFrame) -> pd.Series:
+    approved = _col(df, "APPROVED_BY").astype(str).str.strip()
+    return _flag(_col(df, "CAN_COMMIT_MANUALLY")) & ~approved.str.lower().isin(["nan", "none", ""])
+
+
+def committed_mask(df: pd.DataFrame) -> pd.Series:
+    return mis_committed_mask(df) | manual_committed_mask(df)
+
+
+def _per_order(df: pd.DataFrame, values: pd.Series) -> pd.Series:
+    """`values` of each order's first row, broadcast to every row of the order."""
+    so = df["SO_NO"]
+    first = ~so.duplicated().to_numpy()
+    return so.map(pd.Series(values.to_numpy()[first], index=so.to_numpy()[first]))
+
+
+def _order_scope_is(df: pd.DataFrame, col: str, value: str) -> pd.Series:
+    """Per row: the order's `col` scope (read from its first row) equals `value`."""
+    if col not in df.columns:
+        return pd.Series(False, index=df.index)
+    return _per_order(df, df[col].astype(str).str.strip().str.upper() == value).astype(bool)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FORECAST VALUE CALCULATORS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def compute_mis_committed_value(mis_df: pd.DataFrame) -> float:
+    """
+    Sum of Total Net Basic for ALL MIS items where SO Qty == SO Committed Qty.
+    Uses the raw MIS sheet with no exclusions — this reflects exactly what the
+    MIS file shows as committed, matching the value a user would compute manually.
+    """
+    if mis_df is None or mis_df.empty:
+        return 0.0
+    df = mis_df.copy()
+
+    qty_col = next((c for c in df.columns if c.strip() == "Sales Order Qty"), None)
+    com_col = next((c for c in df.columns if c.strip() == "Sales Order Committed Qty"), None)
+    val_col = next((c for c in df.columns if c.strip() == "Total Net Basic"), None)
+
+    if not all([qty_col, com_col, val_col]):
+        return 0.0
+
+    df = df[[qty_col, com_col, val_col]].copy()
+    df.columns = ["SO_QTY", "SO_COMMITTED_QTY", "TOTAL_NET_BASIC"]
+
+    return float(_num(df.loc[mis_committed_mask(df), "TOTAL_NET_BASIC"]).sum())
+
+
+def compute_pending_order_value(mis_df: pd.DataFrame) -> float:
+    """Sum of ALL MIS Net Basic rows (negative-qty rows already carry negative values)."""
+    if mis_df is None or mis_df.empty:
+        return 0.0
+    cols = [str(c).strip() for c in mis_df.columns]
+    net_col = next(
+        (c for c in cols if c.lower() in ("total net basic", "net basic value", "net basic")),
+        next((c for c in cols if "net" in c.lower() and "basic" in c.lower()), None),
+    )
+    if not net_col:
+        return 0.0
+    values = mis_df.iloc[:, cols.index(net_col)]
+    net_basic_num = pd.to_numeric(
+        values.astype(str).str.strip().str.replace(",", "", regex=False),
+        errors="coerce",
+    ).fillna(0)
+    return float(net_basic_num.sum())
+
+
+def compute_forecast_breakdown(df: pd.DataFrame) -> dict[str, float]:
+    """
+    Returns a dict with keys:
+      agree, godown, partial, manual, committed_ns, denied, not_committed, total
+    (committed_mis is computed separately from full MIS via compute_mis_committed_value)
+
+    The buckets mirror the "Orders by Category" classification one-to-one so the
+    sub-field values match the per-category chips:
+      • agree / godown          — full order value of those order-level statuses
+      • partial                 — only the ticked items of Partial Delivery orders
+      • manual                  — manually-committed items in undecided orders
+      • committed_ns            — MIS-committed (non-manual) items in undecided orders
+      • not_committed           — remaining items in undecided orders
+      • denied                  — full order value of Denied Delivery orders
+    ``total`` (the Monthend Forecast Value) is agree + godown + partial + manual
+    only; committed_ns, denied and not_committed are reported but excluded.
+    """
+    if df.empty:
+        return dict(agree=0, godown=0, partial=0, manual=0, committed_ns=0,
+                    denied=0, not_committed=0, cancelled=0, total=0)
+
+    val = _num(df["TOTAL_NET_BASIC"])
+    row_status = _col(df, "DELIVERY_STATUS").astype(str).str.strip()
+    status = _per_order(df, row_status)          # the order's status (first row)
+    manual = manual_committed_mask(df)
+    mis = mis_committed_mask(df)
+
+    # Order Cancelled: whole order → the full order value is cancelled. Item
+    # scope → only the ticked items; the rest are classified per item below.
+    # Cancelled value is excluded from the total.
+    cancelled = status == "Order Cancelled"
+    item_scope = cancelled & _order_scope_is(df, "CANCEL_SCOPE", CANCEL_SCOPE_ITEMS)
+    cancel_sel = _flag(_col(df, "CANCEL_SELECTED"))
+    cancelled_rows = cancelled & (~item_scope | cancel_sel)
+
+    # Agree / Godown: full order by default; only committed items when the
+    # order is set to "Deliver committed items only" — the uncommitted items
+    # are not delivered, so they drop to Not Committed.
+    agree = status == "Agree for Delivery"
+    godown = status == "Delivery to Godown"
+    narrowed = (
+        (agree | godown)
+        & _order_scope_is(df, "DELIVER_SCOPE", DELIVER_SCOPE_COMMITTED)
+        & ~(mis | manual)
+    )
+
+    partial = (status == "Partial Delivery") & _flag(_col(df, "PARTIAL_SELECTED"))
+    denied = status == "Denied Delivery"      # stays out of every other bucket
+
+    # No order-level status set (and the unticked items of an item-scope
+    # cancellation): each item on its own — MIS-committed (non-manual) items go
+    # to "Committed (No Status)", the rest to "Not Committed". Manual items are
+    # counted under Manually Committed.
+    per_item = (~status.isin(_ORDER_STATUSES) | (item_scope & ~cancel_sel)) & ~manual
+
+    # Manually committed: items not already in cancelled / agree / godown /
+    # partial buckets and not in "Denied Delivery" orders
+    counted = cancelled_rows | agree | godown | partial
+    manual_rows = manual & ~counted & (row_status != "Denied Delivery")
+
+    agree_val = float(val[agree & ~narrowed].sum())
+    godown_val = float(val[godown & ~narrowed].sum())
+    partial_val = float(val[partial].sum())
+    manual_val = float(val[manual_rows].sum())
+    committed_ns_val = float(val[per_item & mis].sum())
+    denied_val = float(val[denied].sum())
+    not_committed_val = float(val[narrowed].sum() + val[per_item & ~mis].sum())
+    cancelled_val = float(val[cancelled_rows].sum())
+
+    total = agree_val + godown_val + partial_val + manual_val
+    return dict(
+        agree=agree_val,
+        godown=godown_val,
+        partial=partial_val,
+        manual=manual_val,
+        committed_ns=committed_ns_val,
+        denied=denied_val,
+        not_committed=not_committed_val,
+        cancelled=cancelled_val,
+        total=total,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FORECAST SHEET PERSISTENCE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _parse_saved_state(df: pd.DataFrame) -> pd.DataFrame:
+    """Saved-state sheet → state frame (typed flags, columns added since filled in)."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=INTERNAL_COLS)
+    df = df.copy()
+    df.columns = [str(c).strip().upper() for c in df.columns]
+
+    for bc in STATE_BOOL_COLS:
+        if bc in df.columns:
+            df[bc] = df[bc].astype(str).str.upper().map(
+                {"TRUE": True, "FALSE": False,
+                 "1": True, "0": False,
+                 "YES": True, "NO": False}
+            ).fillna(False)
+
+    # Ensure DELIVERY_STATUS column exists (backward compat with old sheets)
+    if "DELIVERY_STATUS" not in df.columns:
+        # Migrate old CUSTOMER_DENIED_DELIVERY → Denied Delivery
+        if "CUSTOMER_DENIED_DELIVERY" in df.columns:
+            denied_map = df["CUSTOMER_DENIED_DELIVERY"].astype(str).str.upper().map(
+                {"TRUE": "Denied Delivery", "1": "Denied Delivery"}
+            ).fillna("")
+            df["DELIVERY_STATUS"] = denied_map
+        else:
+            df["DELIVERY_STATUS"] = ""
+
+    # Backward compat: columns added in later versions.
+    for col in ("PARTIAL_SELECTED", "COMMITTED_VIA", "DELIVER_SCOPE",
+                "CANCEL_SCOPE", "CANCEL_SELECTED"):
+        if col not in df.columns:
+            df[col] = STATE_DEFAULTS[col]
+
+    return df
+
+
+def load_saved_state(sheet_name: str) -> pd.DataFrame:
+    try:
+        from services.sheets import get_df
+        return _parse_saved_state(get_df(sheet_name))
+    except Exception:
+        return pd.DataFrame(columns=INTERNAL_COLS)
+
+
+def save_state(df: pd.DataFrame, sheet_name: str) -> str:
+    try:
+        from services.sheets import write_df
+        out = df.copy()
+        for bc in STATE_BOOL_COLS:
+            if bc in out.columns:
+                out[bc] = out[bc].map(
+                    lambda v: "TRUE" if v is True or str(v).upper() in ("TRUE", "1", "YES") else "FALSE"
+                )
+        write_df(sheet_name, out)
+        return f"✅ Saved to sheet **{sheet_name}**."
+    except Exception as e:
+        return f"❌ Save failed: {e}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CORE BUILDER
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def build_forecast(
+    mis_df: pd.DataFrame,
+    pending_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Transform the raw MIS into the internal forecast frame. Every MIS line item
+    is kept — there is no delivery-date window — so the page mirrors the MIS
+    exactly. CRM delivery dates / sales executives are still mapped on where a
+    matching SO exists, purely for display and sorting.
+    """
+    if mis_df is None or mis_df.empty:
+        return pd.DataFrame(columns=INTERNAL_COLS)
+
+    mis_df = mis_df.copy()
+
+    col_renames: dict[str, str] = {}
+    for wanted in MIS_FETCH_COLS:
+        if wanted in mis_df.columns:
+            col_renames[wanted] = MIS_TO_INTERNAL[wanted]
+        else:
+            found = next(
+                (c for c in mis_df.columns if c.strip().lower() == wanted.lower()), None
+            )
+            if found:
+                col_renames[found] = MIS_TO_INTERNAL[wanted]
+
+    keep = list(col_renames.keys())
+    df = mis_df[keep].copy().rename(columns=col_renames)
+
+    for ic in MIS_TO_INTERNAL.values():
+        if ic not in df.columns:
+            df[ic] = ""
+
+    df["SO_NO"] = df["SO_NO"].astype(str).str.strip()
+
+    if not pending_df.empty and "GODREJ_SO" in pending_df.columns:
+        so = pending_df["GODREJ_SO"].astype(str).str.strip()
+        dates = _col(pending_df, "DELIVERY_DATE", pd.NaT)
+        execs = _col(pending_df, "SALES_EXECUTIVE").astype(str).str.strip()
+        has_date = so.ne("") & dates.notna()
+        has_exec = so.ne("") & execs.ne("")
+        # Later lookup rows win, as with the dict the lookup used to be
+        so_to_date = pd.Series(dates[has_date].to_numpy(), index=so[has_date].to_numpy())
+        so_to_exec = pd.Series(execs[has_exec].to_numpy(), index=so[has_exec].to_numpy())
+        so_to_date = so_to_date[~so_to_date.index.duplicated(keep="last")]
+        so_to_exec = so_to_exec[~so_to_exec.index.duplicated(keep="last")]
+
+        df["DELIVERY_DATE"] = df["SO_NO"].map(so_to_date)
+        df["SALES_EXECUTIVE"] = df["SO_NO"].map(so_to_exec).fillna("")
+    else:
+        df["DELIVERY_DATE"] = pd.NaT
+        df["SALES_EXECUTIVE"] = ""
+
+    df["DELIVERY_DATE"] = pd.to_datetime(df["DELIVERY_DATE"], errors="coerce")
+
+    if df.empty:
+        return pd.DataFrame(columns=INTERNAL_COLS)
+
+    # Sort: dated orders first (ascending), then undated orders at the bottom
+    df = df.sort_values(
+        ["DELIVERY_DATE", "SO_NO", "SO_POSITION"],
+        na_position="last",
+    ).reset_index(drop=True)
+
+    for col, default in STATE_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+
+    return df[INTERNAL_COLS]
+
+
+def merge_state(fresh: pd.DataFrame, saved: pd.DataFrame) -> pd.DataFrame:
+    """
+    Overlay the saved state columns on `fresh`, matched on (SO_NO, SO_POSITION):
+    a hash join of the fresh keys against the saved keys (for a key saved twice
+    the last row wins). Rows with no saved state keep their defaults.
+    """
+    if fresh.empty:
+        return fresh
+    if saved is None or saved.empty or "SO_NO" not in saved.columns:
+        return fresh
+
+    fresh = fresh.copy()
+    fresh["SO_NO"] = fresh["SO_NO"].astype(str).str.strip()
+    fresh["SO_POSITION"] = fresh["SO_POSITION"].astype(str).str.strip()
+
+    cols = [c for c in STATE_DEFAULTS if c in saved.columns]
+    if not cols:
+        return fresh
+
+    saved_keys = pd.MultiIndex.from_arrays([
+        saved["SO_NO"].astype(str).str.strip(),
+        _col(saved, "SO_POSITION").astype(str).str.strip(),
+    ])
+    last = ~saved_keys.duplicated(keep="last")
+    pos = saved_keys[last].get_indexer(
+        pd.MultiIndex.from_arrays([fresh["SO_NO"], fresh["SO_POSITION"]])
+    )
+    hit = pos >= 0
+    if not hit.any():
+        return fresh
+
+    for col in cols:
+        merged = fresh[col].to_numpy(dtype=object, copy=True)
+        merged[hit] = saved[col].to_numpy(dtype=object)[last][pos[hit]]
+        fresh[col] = pd.Series(merged, index=fresh.index).infer_objects()
+
+    return fresh
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STAGES (memoised on input versions)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _fingerprint(df: pd.DataFrame | None):
+    """Cheap content version of a frame: (rows, columns, hash of the values)."""
+    if df is None or df.empty:
+        return (0,)
+    h = pd.util.hash_pandas_object(df.fillna("").astype(str), index=False)
+    return (len(df), tuple(map(str, df.columns)), int(h.sum()))
+
+
+def _memoised(key: str, version, build):
+    """`build()` memoised under `key` until `version` changes."""
+    hit = _memo.get(key)
+    if hit and hit[0] == version:
+        return hit[1]
+    value = build()
+    _memo[key] = (version, value)
+    return value
+
+
+def _read(sheet_name: str) -> pd.DataFrame:
+    try:
+        from services.sheets import get_df
+        df = get_df(sheet_name)
+        return df if df is not None else pd.DataFrame()
+    except Exception:
+        return pd.DataFrame()
+
+
+def mis_stage() -> dict:
+    """
+    Current MIS (MIS_Daily) → {"version", "df", "pending_value", "committed_value"}.
+    `df` is the raw MIS as returned by load_cached_mis().
+    """
+    try:
+        from services.mis_email_import import load_cached_mis
+        raw, _ = load_cached_mis()
+    except Exception:
+        raw = None
+    if raw is None:
+        raw = pd.DataFrame()
+    version = _fingerprint(raw)
+    return _memoised("mis", version, lambda: {
+        "version":         version,
+        "df":              raw,
+        "pending_value":   compute_pending_order_value(raw),
+        "committed_value": compute_mis_committed_value(raw),
+    })
+
+
+def _crm_sheet_names() -> list[str]:
+    cfg = _read("SHEET_DETAILS")
+    sheets: list[str] = []
+    for col in ("Franchise_sheets", "four_s_sheets"):
+        if col in cfg.columns:
+            sheets += cfg[col].dropna().astype(str).str.strip().tolist()
+    return sorted({s for s in sheets if s})
+
+
+def _crm_columns(raw: pd.DataFrame) -> pd.DataFrame | None:
+    """GODREJ_SO / DELIVERY_DATE (text) / SALES_EXECUTIVE of one CRM tab, or None."""
+    if raw is None or raw.empty:
+        return None
+    raw = raw.copy()
+    raw.columns = [str(c).strip().upper() for c in raw.columns]
+    raw = raw.loc[:, ~raw.columns.duplicated()]
+    if "GODREJ SO NO" not in raw.columns:
+        return None
+    del_col = next((c for c in raw.columns if c in _CRM_DATE_COLS), None)
+    sp_col = next((c for c in raw.columns if c in _CRM_REP_COLS), None)
+    return pd.DataFrame({
+        "GODREJ_SO":       raw["GODREJ SO NO"].to_numpy(),
+        "DELIVERY_DATE":   raw[del_col].to_numpy() if del_col else "",
+        "SALES_EXECUTIVE": raw[sp_col].astype(str).str.strip().to_numpy() if sp_col else "",
+    })
+
+
+def _crm_lookup(subs: list[pd.DataFrame]) -> pd.DataFrame:
+    """Deduplicated lookup: GODREJ_SO | DELIVERY_DATE | SALES_EXECUTIVE (earliest date wins)."""
+    if not subs:
+        return pd.DataFrame()
+    frames = []
+    for sub in subs:
+        # Parsed per tab: date formats are inferred per call and differ between tabs
+        sub = sub.copy()
+        sub["DELIVERY_DATE"] = pd.to_datetime(sub["DELIVERY_DATE"], errors="coerce", dayfirst=True)
+        frames.append(sub)
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined.dropna(subset=["GODREJ_SO"])
+    combined["GODREJ_SO"] = combined["GODREJ_SO"].astype(str).str.strip()
+    combined = combined[~combined["GODREJ_SO"].str.lower().isin(["", "nan", "none"])]
+    combined = combined.sort_values("DELIVERY_DATE", na_position="last", kind="stable")
+    combined = combined.drop_duplicates(subset=["GODREJ_SO"], keep="first")
+    return combined.reset_index(drop=True)
+
+
+def crm_stage() -> dict:
+    """
+    CRM delivery lookup across the Franchise + 4S tabs → {"version", "lookup"}.
+    Versioned on the SO / delivery-date / sales-person columns only, so edits to
+    other CRM columns do not rebuild the forecast.
+    """
+    subs: list[pd.DataFrame] = []
+    parts = []
+    for sname in _crm_sheet_names():
+        sub = _crm_columns(_read(sname))
+        if sub is None:
+            continue
+        subs.append(sub)
+        parts.append((sname, _fingerprint(sub)))
+    version = tuple(parts)
+    return _memoised("crm", version, lambda: {
+        "version": version,
+        "lookup":  _crm_lookup(subs),
+    })
+
+
+def invoice_stage(month: str) -> dict:
+    """
+    "SALE INVOICE- <Month>" → {"version", "df", "wfx_df", "wfx_value", "so_numbers"}.
+    `wfx_df` holds the WFX invoice rows, `wfx_value` their Taxable Value
+    (without tax).
+    """
+    try:
+        from services.invoice_email_import import load_invoice_sheet
+        inv_df = load_invoice_sheet(month)
+    except Exception:
+        inv_df = pd.DataFrame()
+    version = _fingerprint(inv_df)
+
+    def build() -> dict:
+        wfx = inv_df
+        wfx_value = 0.0
+        sos: set[str] = set()
+        if not inv_df.empty:
+            if "Customer Code Name" in wfx.columns:
+                wfx_mask = (
+                    wfx["Customer Code Name"]
+                    .fillna("").astype(str).str.strip().str.upper()
+                    .str.startswith("WFX")
+                )
+                wfx = wfx[wfx_mask]
+            if "Taxable Value" in wfx.columns:
+                wfx_value = float(wfx["Taxable Value"].apply(_to_num).sum())
+            so_col = next(
+                (c for c in inv_df.columns
+                 if c.strip().lower() in ("sales order no", "so no", "sales order no.")),
+                None,
+            )
+            if so_col:
+                s = inv_df[so_col].dropna().astype(str).str.strip()
+                sos = set(s[~s.str.lower().isin(["", "nan", "none"])])
+        return {"version": version, "df": inv_df, "wfx_df": wfx,
+                "wfx_value": wfx_value, "so_numbers": sos}
+
+    return _memoised(f"invoice:{month}", version, build)
+
+
+def state_stage(month: str) -> dict:
+    """Saved "MONTHEND SALES FORECAST- <Month>" state → {"version", "df"}."""
+    raw = _read(forecast_sheet_name(month))
+    version = _fingerprint(raw)
+    return _memoised(f"state:{month}", version, lambda: {
+        "version": version,
+        "df":      _parse_saved_state(raw),
+    })
+
+
+def forecast_result(ref: date | None = None) -> dict:
+    """
+    The month-end forecast for `ref`'s month:
+        {"month", "sheet_name", "version", "df", "breakdown", "mis_committed"}
+    `df` is the MIS merged with the saved state, `breakdown` its
+    compute_forecast_breakdown, `mis_committed` the raw-MIS committed value.
+    Shared between callers — copy `df` before editing it.
+    """
+    month = forecast_month(ref)
+    mis = mis_stage()
+    crm = crm_stage()
+    state = state_stage(month)
+    version = (mis["version"], crm["version"], state["version"])
+
+    def build() -> dict:
+        fresh = _memoised(
+            "fresh", (mis["version"], crm["version"]),
+            lambda: build_forecast(mis["df"], crm["lookup"]),
+        )
+        df = merge_state(fresh, state["df"])
+        return {
+            "month":         month,
+            "sheet_name":    forecast_sheet_name(month),
+            "version":       version,
+            "df":            df,
+            "breakdown":     compute_forecast_breakdown(df),
+            "mis_committed": mis["committed_value"],
+        }
+
+    return _memoised(f"forecast:{month}", version, build)
+
+
+def clear() -> None:
+    """Drop every memoised stage (the next call rebuilds from the sheets)."""
+    _memo.clear()
@@ -0,0 +1,156 @@
+"""
+services/forecast_history.py
+
+Append-only time series of the current-month sales metrics, for intra-month
+trend / pace views.
+
+get_monthend_forecast_value / get_pending_order_value only answer "right now";
+every refresh of the metrics snapshot (services/metrics_snapshot.py — the
+scheduled job, the import jobs and "Recompute now") appends one row per scope
+here, so history never has to be re-derived from old MIS emails.
+
+Storage: the FORECAST HISTORY tab in the OPS spreadsheet, next to the
+MONTHLY METRICS SNAPSHOT tab — shared by every writer (GitHub Actions,
+scheduler.py, Streamlit Cloud), same idea as JOB_RUN_LEDGER:
+
+    RECORDED AT | MONTH | SALES PERSON | FORECAST | PENDING ORDER VALUE |
+    INVOICE VALUE | COMMITTED LINES
+
+`SALES PERSON` is "ALL" for the month totals, else the upper-cased rep name.
+Rows are only ever appended (one append_rows per snapshot) — there is no
+update or delete path. Queries read the tab through the cached get_df.
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+ALL = "ALL"
+HISTORY_SHEET = "FORECAST HISTORY"
+
+# snapshot key → tab column
+SERIES_COLUMNS = {
+    "forecast":            "FORECAST",
+    "pending_order_value": "PENDING ORDER VALUE",
+    "invoice_value":       "INVOICE VALUE",
+    "committed_lines":     "COMMITTED LINES",
+}
+HISTORY_HEADERS = ["RECORDED AT", "MONTH", "SALES PERSON", *SERIES_COLUMNS.values()]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WRITE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def record_points(recorded_at: str, month: str, points: dict[str, dict]) -> int:
+    """
+    Append one row per scope to FORECAST HISTORY. `points` maps sales person
+    (or ALL) → dict with the SERIES_COLUMNS keys; missing keys record 0.
+    Returns rows written. Raises on sheet errors.
+    """
+    rows = [
+        [
+            recorded_at, month, str(scope).strip().upper(),
+            round(float(p.get("forecast", 0.0) or 0.0), 2),
+            round(float(p.get("pending_order_value", 0.0) or 0.0), 2),
+            round(float(p.get("invoice_value", 0.0) or 0.0), 2),
+            int(p.get("committed_lines", 0) or 0),
+        ]
+        for scope, p in points.items()
+    ]
+    if not rows:
+        return 0
+
+    from services.sheets import _get_sh
+
+    sh = _get_sh(HISTORY_SHEET)
+    try:
+        ws = sh.worksheet(HISTORY_SHEET)
+    except Exception:
+        ws = sh.add_worksheet(title=HISTORY_SHEET, rows=2000, cols=len(HISTORY_HEADERS))
+    if not ws.row_values(1):
+        ws.append_row(HISTORY_HEADERS)
+    ws.append_rows(rows, value_input_option="RAW")
+    return len(rows)
+
+
+def record_snapshot(snap: dict) -> int:
+    """Append a metrics snapshot (ALL + every salesperson) at its computed_at."""
+    points = {ALL: snap["totals"]}
+    for row in snap.get("by_salesperson", []):
+        points[row["sales_person"]] = row
+    return record_points(str(snap["computed_at"]), str(snap["month_label"]), points)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QUERY
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _history() -> pd.DataFrame:
+    """The whole tab, typed; an empty frame with HISTORY_HEADERS when unreadable."""
+    try:
+        from services.sheets import get_df
+        df = get_df(HISTORY_SHEET)
+    except Exception as e:
+        print(f"[FORECAST_HISTORY] Read failed: {e}")
+        df = None
+    if df is None or df.empty or not set(HISTORY_HEADERS) <= set(df.columns):
+        return pd.DataFrame(columns=HISTORY_HEADERS)
+    df = df[HISTORY_HEADERS].copy()
+    df["RECORDED AT"] = pd.to_datetime(df["RECORDED AT"], errors="coerce", utc=True)
+    df["MONTH"] = df["MONTH"].astype(str).str.strip()
+    df["SALES PERSON"] = df["SALES PERSON"].astype(str).str.strip().str.upper()
+    for col in SERIES_COLUMNS.values():
+        df[col] = pd.to_numeric(
+            df[col].astype(str).str.replace(",", "", regex=False), errors="coerce"
+        ).fillna(0.0)
+    df["COMMITTED LINES"] = df["COMMITTED LINES"].astype(int)
+    df = df.dropna(subset=["RECORDED AT"])
+    # Shown in IST whatever offset the writer used
+    df["RECORDED AT"] = df["RECORDED AT"].dt.tz_convert("Asia/Kolkata")
+    return df.sort_values("RECORDED AT", kind="stable").reset_index(drop=True)
+
+
+def months() -> list[str]:
+    """Month labels ("June 2026") with history, newest first."""
+    df = _history()
+    if df.empty:
+        return []
+    return df.groupby("MONTH")["RECORDED AT"].max().sort_values(ascending=False).index.tolist()
+
+
+def sales_people(month: str) -> list[str]:
+    """Salespeople recorded for `month` (ALL excluded), sorted."""
+    df = _history()
+    reps = df.loc[(df["MONTH"] == month) & (df["SALES PERSON"] != ALL), "SALES PERSON"]
+    return sorted(reps.unique().tolist())
+
+
+def series(month: str, sales_person: str = ALL) -> pd.DataFrame:
+    """Every recorded point for one scope in `month`, oldest first."""
+    df = _history()
+    mask = (df["MONTH"] == month) & (df["SALES PERSON"] == sales_person.strip().upper())
+    return df.loc[mask].drop(columns="MONTH").reset_index(drop=True)
+
+
+def daily_series(month: str, sales_person: str = ALL) -> pd.DataFrame:
+    """
+    The last point of each day for one scope in `month` — the shape pace
+    views want (one value per day, however often the snapshot ran).
+    """
+    df = series(month, sales_person)
+    if df.empty:
+        return df.assign(DATE=pd.Series(dtype="datetime64[ns]"))
+    df["DATE"] = df["RECORDED AT"].dt.tz_localize(None).dt.normalize()
+    return df.groupby("DATE", as_index=False).last()
+
+
+def latest_by_salesperson(month: str) -> pd.DataFrame:
+    """The most recent point of every scope (ALL first) in `month`."""
+    df = _history()
+    df = df[df["MONTH"] == month].drop(columns="MONTH")
+    if df.empty:
+        return df
+    df = df.groupby("SALES PERSON", as_index=False).last()
+    return df.sort_values(
+        "SALES PERSON", key=lambda s: s.where(s != ALL, ""), kind="stable"
+    ).reset_index(drop=True)
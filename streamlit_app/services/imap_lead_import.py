@@ -17,7 +17,7 @@ import sys
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, BASE_DIR)
 
-from services.sheets import get_df, write_df
+from services.sheets import get_df
 
 
 # ═════════════════════════════════════════════════════════════════════════════
@@ -208,66 +208,126 @@ def fetch_lead_emails(mail):
         return []
 
 
+LEADS_SHEET = "LEADS"
+
+
+def _existing_leads_state(df: pd.DataFrame | None) -> tuple[set[str], int]:
+    """
+    From the current LEADS DataFrame return (Salesforce URLs already imported,
+    next free LEAD ID).  The next ID is max(LEAD ID) + 1 so deleted records
+    never cause an ID to be re-used.
+    """
+    if df is None or df.empty:
+        return set(), 1
+
+    df = df.copy()
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    urls: set[str] = set()
+    if "SALESFORCE URL" in df.columns:
+        urls = {u for u in df["SALESFORCE URL"].astype(str).str.strip() if u}
+
+    if "LEAD ID" in df.columns:
+        try:
+            next_id = int(df["LEAD ID"].astype(str).str.strip().astype(int).max()) + 1
+        except Exception:
+            next_id = len(df) + 1
+    else:
+        next_id = len(df) + 1
+    return urls, next_id
+
+
+def _build_lead_row(lead_data: dict, lead_id: int) -> dict:
+    """One LEADS row (upper-case header → value) for a parsed lead email."""
+    # NOTE: ASSIGNED TO is intentionally left empty.
+    # Sales team will manually assign leads after viewing Salesforce details.
+    # The assigned_to info from email is stored in notes for reference.
+    assigned_to_from_email = lead_data.get("assigned_to", "")
+
+    return {
+        "LEAD ID": str(lead_id),
+        "LEAD NAME": lead_data.get("lead_name", ""),
+        "COMPANY": lead_data.get("company", ""),
+        "EMAIL": lead_data.get("email", ""),
+        "PHONE": lead_data.get("phone", ""),
+        "ADDRESS": lead_data.get("address", ""),
+        "STATUS": "🟢 New",
+        "PRIORITY": "Medium",
+        "SOURCE": "Email (OneCRM)",
+        "SOURCE_DETAILS": "Salesforce Lead Assignment",
+        "ASSIGNED TO": "",  # ← Intentionally empty - manual assignment by sales team
+        "SALESFORCE URL": lead_data.get("salesforce_url", ""),
+        "CREATED DATE": datetime.now().strftime("%d-%m-%Y %H:%M"),
+        "LAST CONTACT": "",
+        "FOLLOW UP DATE": (datetime.now() + pd.Timedelta(days=1)).strftime("%d-%m-%Y"),
+        "NOTES": f"Salesforce Lead Assignment: {assigned_to_from_email}\nSalesforce URL: {lead_data.get('salesforce_url', 'N/A')}\nImported from email - Sales team to assign manually.",
+        "CONVERSION DATE": "",
+        "DEAL VALUE": "0"
+    }
+
+
+def build_new_leads(lead_emails: list[dict], df: pd.DataFrame | None) -> list[tuple[dict, dict]]:
+    """
+    Turn parsed lead emails into new LEADS rows, allocating LEAD IDs in one
+    contiguous block after the current maximum.
+
+    Emails whose Salesforce URL is already in the sheet — or earlier in this
+    batch — are skipped.  Returns [(email_data, lead_row), …] in email order.
+    """
+    seen_urls, next_id = _existing_leads_state(df)
+
+    batch: list[tuple[dict, dict]] = []
+    for email_data in lead_emails:
+        lead_data = email_data["parsed"]
+        salesforce_url = lead_data.get("salesforce_url", "").strip()
+        if salesforce_url and salesforce_url in seen_urls:
+            # Lead already imported - skip silently
+            continue
+        if salesforce_url:
+            seen_urls.add(salesforce_url)
+        batch.append((email_data, _build_lead_row(lead_data, next_id)))
+        next_id += 1
+    return batch
+
+
+def append_leads_to_sheet(lead_rows: list[dict]) -> None:
+    """
+    Append all `lead_rows` to the LEADS sheet with a single `append_rows`
+    call, ordered to match the sheet's existing header row (matched
+    case-insensitively).  Raises on failure so the caller can leave the
+    source emails unread.
+    """
+    if not lead_rows:
+        return
+
+    from services.sheets import _ensure_sheet
+
+    ws = _ensure_sheet(LEADS_SHEET)
+    headers = ws.row_values(1)
+
+    if not headers:
+        headers = list(lead_rows[0].keys())
+        values = [headers] + [[row.get(h, "") for h in headers] for row in lead_rows]
+    else:
+        values = [[row.get(str(h).strip().upper(), "") for h in headers] for row in lead_rows]
+
+    ws.append_rows(values, value_input_option="RAW")
+
+    try:
+        get_df.clear()
+    except Exception:
+        pass
+
+
 def import_lead_to_sheet(lead_data: dict):
-    """Import lead to LEADS sheet (skip silently if already exists)"""
+    """Import a single lead to LEADS sheet (skip silently if already exists)"""
     try:
-        df = get_df("LEADS")
-
-        if df is None or df.empty:
-            df = pd.DataFrame()
-            next_id = 1
-        else:
-            df.columns = [str(c).strip().upper() for c in df.columns]
-            df = df.loc[:, ~df.columns.duplicated()]
-
-            # ═══════════════════════════════════════════════════════════════════
-            # DUPLICATE CHECK: Skip if Salesforce URL already exists
-            # ═══════════════════════════════════════════════════════════════════
-            salesforce_url = lead_data.get("salesforce_url", "").strip()
-            if salesforce_url and "SALESFORCE URL" in df.columns:
-                existing = df[df["SALESFORCE URL"].astype(str).str.strip() == salesforce_url]
-                if not existing.empty:
-                    # Lead already imported - skip silently (return False to indicate skipped)
-                    return False
-
-            # Get maximum existing ID and increment (handles deleted records)
-            if "LEAD ID" in df.columns:
-                try:
-                    max_id = df["LEAD ID"].astype(str).str.strip().astype(int).max()
-                    next_id = max_id + 1
-                except:
-                    next_id = len(df) + 1
-            else:
-                next_id = len(df) + 1
-
-        # NOTE: ASSIGNED TO is intentionally left empty.
-        # Sales team will manually assign leads after viewing Salesforce details.
-        # The assigned_to info from email is stored in notes for reference.
-        assigned_to_from_email = lead_data.get("assigned_to", "")
-
-        new_lead = {
-            "LEAD ID": str(next_id),
-            "LEAD NAME": lead_data.get("lead_name", ""),
-            "COMPANY": lead_data.get("company", ""),
-            "EMAIL": lead_data.get("email", ""),
-            "PHONE": lead_data.get("phone", ""),
-            "ADDRESS": lead_data.get("address", ""),
-            "STATUS": "🟢 New",
-            "PRIORITY": "Medium",
-            "SOURCE": "Email (OneCRM)",
-            "SOURCE_DETAILS": "Salesforce Lead Assignment",
-            "ASSIGNED TO": "",  # ← Intentionally empty - manual assignment by sales team
-            "SALESFORCE URL": lead_data.get("salesforce_url", ""),
-            "CREATED DATE": datetime.now().strftime("%d-%m-%Y %H:%M"),
-            "LAST CONTACT": "",
-            "FOLLOW UP DATE": (datetime.now() + pd.Timedelta(days=1)).strftime("%d-%m-%Y"),
-            "NOTES": f"Salesforce Lead Assignment: {assigned_to_from_email}\nSalesforce URL: {lead_data.get('salesforce_url', 'N/A')}\nImported from email - Sales team to assign manually.",
-            "CONVERSION DATE": "",
-            "DEAL VALUE": "0"
-        }
-
-        df = pd.concat([df, pd.DataFrame([new_lead])], ignore_index=True)
-        write_df("LEADS", df)
+        batch = build_new_leads([{"parsed": lead_data}], get_df(LEADS_SHEET))
+        if not batch:
+            # Lead already imported - skip silently (return False to indicate skipped)
+            return False
+        append_leads_to_sheet([row for _, row in batch])
 
         print(f"✅ Lead '{lead_data.get('lead_name')}' imported successfully (Unassigned - Manual assignment pending)")
         return True
@@ -286,7 +346,14 @@ def mark_email_as_read(mail, msg_id):
 
 
 def process_lead_emails():
-    """Main function to fetch and import lead emails"""
+    """
+    Main function to fetch and import lead emails.
+
+    All pending lead emails are parsed first, de-duplicated against the LEADS
+    sheet (read once), given a contiguous block of LEAD IDs and appended with
+    one `append_rows` call.  Messages are marked read only after that append
+    succeeds — if it fails, every message stays unread for the next run.
+    """
     print("\n" + "="*70)
     print("🔍 Starting Lead Email Import Process")
     print(f"📧 Email: {SENDER_EMAIL}")
@@ -310,12 +377,27 @@ def process_lead_emails():
             mail.logout()
             return 0
 
-        # Process each email
-        imported_count = 0
-        for email_data in lead_emails:
-            if import_lead_to_sheet(email_data['parsed']):
-                mark_email_as_read(mail, email_data['msg_id'])
-                imported_count += 1
+        # Build every new row against a single read of the LEADS sheet
+        batch = build_new_leads(lead_emails, get_df(LEADS_SHEET))
+
+        if not batch:
+            print("✅ All lead emails are already imported")
+            mail.close()
+            mail.logout()
+            return 0
+
+        try:
+            append_leads_to_sheet([row for _, row in batch])
+        except Exception as e:
+            print(f"❌ Error appending {len(batch)} lead(s) — no emails marked as read: {e}")
+            mail.close()
+            mail.logout()
+            return 0
+
+        for email_data, row in batch:
+            mark_email_as_read(mail, email_data['msg_id'])
+            print(f"✅ Lead '{row['LEAD NAME']}' imported (LEAD ID {row['LEAD ID']}, unassigned)")
+        imported_count = len(batch)
 
         mail.close()
         mail.logout()
@@ -131,6 +131,7 @@ def configured_invoice_inboxes() -> list[str]:
 IMAP_HOST            = "imap.gmail.com"
 INVOICE_SUBJECT      = "invoice information"
 INVOICE_SHEET_PREFIX = "SALE INVOICE- "
+INVOICE_LEDGER_JOB   = "Invoice Email Import"   # run-ledger job name (services/run_ledger.py)
 IST                  = timezone(timedelta(hours=5, minutes=30))
 
 # Canonical column names written to the Google Sheet
@@ -358,28 +359,34 @@ def _filter_invoices_by_month(
 # PDF PARSER
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _count_pdf_fields(text: str) -> int:
+    """Number of `_PDF_PATTERNS` fields that have a regex hit in `text`."""
+    return sum(1 for patterns in _PDF_PATTERNS.values() if _regex_find(patterns, text))
+
+
+def _has_all_pdf_fields(text: str) -> bool:
+    """True when every `_PDF_PATTERNS` field matches — the fast-engine acceptance check."""
+    return _count_pdf_fields(text) == len(_PDF_PATTERNS)
+
+
 def parse_invoice_pdf(pdf_bytes: bytes) -> tuple[pd.DataFrame, str]:
     """
-    Parse a Godrej & Boyce invoice PDF using pdfplumber text extraction
-    + targeted regex patterns.  Returns (single-row DataFrame, status_message).
+    Parse a Godrej & Boyce invoice PDF using text extraction + targeted regex
+    patterns.  Returns (single-row DataFrame, status_message).
+
+    Text comes from services.pdf_text: PyMuPDF first, falling back to pdfplumber
+    only when the fast output misses one of the `_PDF_PATTERNS` fields.
 
     The broken table-extraction fallback that was writing multi-line garbage
     into fields has been intentionally removed.
     """
-    try:
-        import pdfplumber
-    except ImportError:
-        return pd.DataFrame(), "❌ pdfplumber not installed — run: pip install pdfplumber"
+    from services.pdf_text import extract_pdf_text
 
     # ── 1. Extract raw text from every page ───────────────────────────────────
-    full_text = ""
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            pages = []
-            for page in pdf.pages:
-                t = page.extract_text(x_tolerance=3, y_tolerance=3) or ""
-                pages.append(t)
-            full_text = "\n".join(pages)
+        full_text, _engine = extract_pdf_text(
+            pdf_bytes, accept=_has_all_pdf_fields, score=_count_pdf_fields
+        )
     except Exception as e:
         return pd.DataFrame(), f"❌ PDF read error: {e}"
 
@@ -872,44 +879,61 @@ def _fetch_from_account(
     imap_email: str,
     imap_password: str,
     query: str,
-) -> tuple[list[pd.DataFrame], list[str], int, int, str]:
+    ledger_job: str | None = None,
+) -> tuple[list[pd.DataFrame], list[str], int, int, str, list[str], int]:
     """
     Read invoice emails from a single Gmail account.
 
-    Returns: (all_frames, parse_errors, no_attachment_count, email_count, login_error)
+    With `ledger_job` set, messages already recorded in the run ledger for
+    that job are dropped right after the UID SEARCH and never downloaded.
+
+    Returns: (all_frames, parse_errors, no_attachment_count, email_count,
+              login_error, source_keys, skipped_count)
     `login_error` is "" on success, otherwise a human-readable error string.
+    `source_keys` are the run-ledger keys of the messages whose attachments
+    all parsed into invoice rows. Messages with no attachment, a failed or
+    partial parse, or a FETCH error are left out so a later run retries them.
     """
+    from services.run_ledger import imap_uid_search, message_key, seen_keys
+
     all_frames: list[pd.DataFrame] = []
     parse_errors: list[str]        = []
     no_attachment_count            = 0
+    parsed_keys: list[str]         = []
 
     try:
         mail = imaplib.IMAP4_SSL(IMAP_HOST)
         mail.login(imap_email, imap_password)
         mail.select("inbox")
     except Exception as e:
-        return all_frames, parse_errors, 0, 0, f"{imap_email}: IMAP login failed: {e}"
+        return all_frames, parse_errors, 0, 0, f"{imap_email}: IMAP login failed: {e}", [], 0
 
     try:
-        _, data = mail.search(None, query)
+        uidvalidity, email_ids = imap_uid_search(mail, query)
     except Exception as e:
         try:
             mail.logout()
         except Exception:
             pass
-        return all_frames, parse_errors, 0, 0, f"{imap_email}: IMAP search error: {e}"
+        return all_frames, parse_errors, 0, 0, f"{imap_email}: IMAP search error: {e}", [], 0
+
+    keys = {eid: message_key(imap_email, uidvalidity, eid) for eid in email_ids}
+    skipped = 0
+    if ledger_job and email_ids:
+        done = seen_keys(ledger_job, list(keys.values()))
+        skipped = sum(1 for eid in email_ids if keys[eid] in done)
+        email_ids = [eid for eid in email_ids if keys[eid] not in done]
 
-    email_ids = data[0].split() if data and data[0] else []
     if not email_ids:
         try:
             mail.logout()
         except Exception:
             pass
-        return all_frames, parse_errors, 0, 0, ""
+        return all_frames, parse_errors, 0, 0, "", [], skipped
 
     for eid in email_ids:
         try:
-            _, msg_data = mail.fetch(eid, "(RFC822)")
+            _, msg_data = mail.uid("FETCH", eid, "(RFC822)")
             raw = msg_data[0][1]
             msg = email.message_from_bytes(raw)
 
@@ -927,6 +951,7 @@ def _fetch_from_account(
                 no_attachment_count += 1
                 continue
 
+            msg_ok = True
             for att_bytes, att_name in attachments:
                 df_parsed, parse_msg = parse_attachment(att_bytes, att_name)
                 if df_parsed is not None and not df_parsed.empty:
@@ -935,20 +960,24 @@ def _fetch_from_account(
                         mask = df_parsed["Sales Invoice No"].str.strip() == ""
                         df_parsed.loc[mask, "Sales Invoice No"] = subject_inv_no
                     all_frames.append(df_parsed)
-                elif "⚠️" in parse_msg or "❌" in parse_msg:
-                    # If we at least have an invoice number from subject, create a partial row
-                    if subject_inv_no:
-                        partial = pd.DataFrame([{
-                            "Sales Invoice No": subject_inv_no,
-                            "Date":             "",
-                            "Customer Code Name": "",
-                            "Sales Order No":   "",
-                            "Taxable Value":    "",
-                        }])
-                        all_frames.append(partial)
-                        parse_errors.append(f"{att_name}: partial row from subject (PDF parse: {parse_msg[:80]})")
-                    else:
-                        parse_errors.append(f"{att_name}: {parse_msg}")
+                else:
+                    msg_ok = False
+                    if "⚠️" in parse_msg or "❌" in parse_msg:
+                        # If we at least have an invoice number from subject, create a partial row
+                        if subject_inv_no:
+                            partial = pd.DataFrame([{
+                                "Sales Invoice No": subject_inv_no,
+                                "Date":             "",
+                                "Customer Code Name": "",
+                                "Sales Order No":   "",
+                                "Taxable Value":    "",
+                            }])
+                            all_frames.append(partial)
+                            parse_errors.append(f"{att_name}: partial row from subject (PDF parse: {parse_msg[:80]})")
+                        else:
+                            parse_errors.append(f"{att_name}: {parse_msg}")
+            if msg_ok:
+                parsed_keys.append(keys[eid])
         except Exception as ex:
             parse_errors.append(str(ex))
 
@@ -957,13 +986,17 @@ def _fetch_from_account(
     except Exception:
         pass
 
-    return all_frames, parse_errors, no_attachment_count, len(email_ids), ""
+    return (
+        all_frames, parse_errors, no_attachment_count, len(email_ids), "",
+        parsed_keys, skipped,
+    )
 
 
 def fetch_invoice_emails(
     today_only: bool = False,
     month_start: date | None = None,
     month_end: date | None = None,
+    ledger_job: str | None = None,
 ) -> tuple[pd.DataFrame, str]:
     """
     Fetch invoice emails from ALL configured Gmail accounts (IMAP_ACCOUNTS).
@@ -971,6 +1004,11 @@ def fetch_invoice_emails(
     today_only=True          → only today's emails
     month_start + month_end  → emails in that date range
     neither                  → last 7 days (fallback)
+
+    ledger_job               → skip messages already in the run ledger for
+                               that job (services/run_ledger.py). The ledger
+                               keys of the fully-parsed messages are left in
+                               df.attrs["source_keys"] for the caller.
     """
     if not IMAP_ACCOUNTS:
         return pd.DataFrame(), (
@@ -985,10 +1023,12 @@ def fetch_invoice_emails(
     no_attachment_count            = 0
     total_emails                   = 0
     login_errors: list[str]        = []
+    source_keys: list[str]         = []
+    total_skipped                  = 0
 
     for acct_email, acct_password in IMAP_ACCOUNTS:
-        frames, errors, no_att, n_emails, login_err = _fetch_from_account(
-            acct_email, acct_password, query
+        frames, errors, no_att, n_emails, login_err, keys, skipped = _fetch_from_account(
+            acct_email, acct_password, query, ledger_job=ledger_job
         )
         if login_err:
             login_errors.append(login_err)
@@ -997,11 +1037,19 @@ def fetch_invoice_emails(
         parse_errors.extend(errors)
         no_attachment_count += no_att
         total_emails        += n_emails
+        source_keys.extend(keys)
+        total_skipped       += skipped
 
     # All accounts failed to log in
     if login_errors and not all_frames and total_emails == 0 and len(login_errors) == len(IMAP_ACCOUNTS):
         return pd.DataFrame(), "❌ " + "; ".join(login_errors)
 
+    if total_emails == 0 and total_skipped and not login_errors:
+        from services.run_ledger import ALREADY_IMPORTED
+        return pd.DataFrame(), (
+            f"✅ No new invoice emails — {total_skipped} email(s) {ALREADY_IMPORTED}."
+        )
+
     if total_emails == 0 and not all_frames:
         label = "today" if today_only else "the selected period"
         suffix = f"\n⚠️ {'; '.join(login_errors)}" if login_errors else ""
@@ -1039,7 +1087,10 @@ def fetch_invoice_emails(
         status_msg += f"  ⚠️ {len(login_errors)} account(s) failed to log in: {'; '.join(login_errors)}"
     if parse_errors:
         status_msg += f"  ⚠️ {len(parse_errors)} attachment(s) could not be parsed"
+    if total_skipped:
+        status_msg += f"  · {total_skipped} email(s) already imported, skipped"
 
+    combined.attrs["source_keys"] = source_keys
     return combined, status_msg
 
 
@@ -1155,11 +1206,21 @@ def load_invoice_sheet(month: str) -> pd.DataFrame:
 # SCHEDULER ENTRY POINTS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def fetch_and_save_today_invoices() -> tuple[pd.DataFrame, str]:
-    """Fetch today's invoice emails → save to current month's sheet."""
-    df, status = fetch_invoice_emails(today_only=True)
+def fetch_and_save_today_invoices(skip_unchanged: bool = False) -> tuple[pd.DataFrame, str]:
+    """
+    Fetch today's invoice emails → save to current month's sheet.
+
+    skip_unchanged=True (scheduled runs) only downloads messages not yet in
+    the run ledger; when every message of the day was already imported the
+    run ends after the IMAP search.
+    """
+    df, status = fetch_invoice_emails(
+        today_only=True,
+        ledger_job=INVOICE_LEDGER_JOB if skip_unchanged else None,
+    )
     if df is None or df.empty:
         return df, status
+    source_keys = df.attrs.get("source_keys", [])
     now   = datetime.now(IST)
     month = now.strftime("%B")
     # Filter: only save invoices whose date belongs to the current month
@@ -1169,6 +1230,9 @@ def fetch_and_save_today_invoices() -> tuple[pd.DataFrame, str]:
     if df is None or df.empty:
         return df, f"{status}\n⚠️ No invoices remain after date filtering."
     save_msg = save_invoices_to_sheet(df, month)
+    if "✅" in save_msg:
+        from services.run_ledger import record_keys
+        record_keys(INVOICE_LEDGER_JOB, source_keys, records_count=len(df))
     return df, f"{status}\n{save_msg}"
 
 
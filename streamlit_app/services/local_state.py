@@ -0,0 +1,69 @@
+"""
+services/local_state.py
+
+Small on-disk state store shared by the import jobs (MIS snapshots, run
+ledgers, Drive indexes, parse caches …).
+
+Everything lives under one directory so it can be persisted as a unit:
+
+  * CRM_STATE_DIR env var, when set (e.g. a mounted volume)
+  * otherwise  streamlit_app/.crm_state/   (git-ignored)
+
+On GitHub Actions the folder is restored/saved with actions/cache by the
+workflows that use it; on Streamlit Cloud it lives as long as the container.
+All state kept here is a cache or an index — losing it must only cost a slower
+next run, never wrong data.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def state_dir(*parts: str) -> str:
+    """Return (and create) a directory under the state root."""
+    root = os.getenv("CRM_STATE_DIR", "").strip() or os.path.join(BASE_DIR, ".crm_state")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def state_path(*parts: str) -> str:
+    """Return a file path under the state root, creating its parent directory."""
+    if not parts:
+        raise ValueError("state_path needs at least a file name")
+    return os.path.join(state_dir(*parts[:-1]), parts[-1])
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """Write `data` to `path` via a temp file + rename, so readers never see half a file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: str, default=None):
+    """Load JSON from `path`; return `default` when missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path: str, data) -> None:
+    """Atomically write `data` as JSON to `path`."""
+    atomic_write_bytes(
+        path, json.dumps(data, ensure_ascii=False, indent=1, default=str).encode("utf-8")
+    )
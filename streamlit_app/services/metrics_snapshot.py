@@ -0,0 +1,289 @@
+"""
+services/metrics_snapshot.py
+
+Precomputed current-month sales metrics for the Sales Reports and Strategy page.
+
+The five headline numbers — Monthly Sales Target, Current Sales Invoice Value,
+Pending Order Value (MIS + CRM), Month-end Forecast and Pending Target — each
+need several sheets (targets, SALE INVOICE, MIS_Daily, every CRM tab, the
+saved forecast state). Computing them on every page load is slow, so a
+headless job (monthly_metrics_snapshot_job.py, scheduler.py and the import
+jobs) computes them, with a per-salesperson breakdown, and stores the result:
+
+  * locally   — .crm_state/metrics_snapshot/latest.json (services/local_state)
+  * OPS tab   — "MONTHLY METRICS SNAPSHOT": one row for ALL, then one per
+                salesperson, so the Streamlit app sees what the job computed.
+
+The page renders `load_snapshot()` straight away and calls `refresh_snapshot()`
+only when asked to ("Recompute now") or when no snapshot exists for the month.
+
+All figures are the ones services/monthly_metrics.py and the Month-end Sales
+Forecast page show; the per-salesperson rows add up to the ALL row.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pandas as pd
+
+from services import forecast_engine as fe
+from services import monthly_metrics as mm
+from services.local_state import read_json, state_path, write_json
+
+SNAPSHOT_SHEET = "MONTHLY METRICS SNAPSHOT"
+ALL_ROW = "ALL"
+UNASSIGNED = "(UNASSIGNED)"
+
+# snapshot key → OPS tab column
+METRIC_COLUMNS = {
+    "target":                  "TARGET",
+    "invoice_value":           "INVOICE VALUE",
+    "pending_target":          "PENDING TARGET",
+    "pending_order_value":     "PENDING ORDER VALUE",
+    "pending_order_value_crm": "PENDING ORDER VALUE (CRM)",
+    "forecast":                "MONTHEND FORECAST",
+}
+SHEET_COLUMNS = ["MONTH", "COMPUTED AT", "SALES PERSON", *METRIC_COLUMNS.values()]
+
+
+def _local_path() -> str:
+    return state_path("metrics_snapshot", "latest.json")
+
+
+def month_label(ref: date | None = None) -> str:
+    """"October 2026" — the month a snapshot belongs to."""
+    if ref is None:
+        ref = datetime.now(fe.IST).date()
+    return ref.strftime("%B %Y")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPUTE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _rep(s: pd.Series) -> pd.Series:
+    """Normalise a salesperson column; blanks become UNASSIGNED."""
+    s = s.fillna("").astype(str).str.strip().str.upper()
+    return s.where(~s.isin(["", "NAN", "NONE"]), UNASSIGNED)
+
+
+def _sum_by_rep(reps: pd.Series, values: pd.Series) -> dict[str, float]:
+    if reps.empty:
+        return {}
+    return {k: float(v) for k, v in values.groupby(reps.values).sum().items()}
+
+
+def _targets_by_rep(month: str) -> dict[str, float]:
+    try:
+        from services.incentive_store import get_targets_df
+        df = get_targets_df()
+    except Exception:
+        return {}
+    if df is None or df.empty:
+        return {}
+    df = df[df["MONTH"] == month.upper()]
+    return _sum_by_rep(_rep(df["SALES PERSON"]), df["TARGET"] * 1_00_000)
+
+
+def _invoices_by_rep(month: str) -> dict[str, float]:
+    try:
+        wfx = fe.invoice_stage(month)["wfx_df"]
+    except Exception:
+        return {}
+    if wfx.empty or "Taxable Value" not in wfx.columns:
+        return {}
+    return _sum_by_rep(_rep(fe._col(wfx, "Sales Executive")), fe._num(wfx["Taxable Value"]))
+
+
+def _crm_pending_by_rep() -> dict[str, float]:
+    try:
+        detail = mm.get_pending_order_details_crm()
+    except Exception:
+        return {}
+    if detail is None or detail.empty:
+        return {}
+    return _sum_by_rep(
+        _rep(fe._col(detail, "SALES PERSON")),
+        pd.to_numeric(detail["ORDER VALUE WITHOUT GST"], errors="coerce").fillna(0.0),
+    )
+
+
+def _forecast_by_rep(df: pd.DataFrame) -> tuple[dict, dict, dict]:
+    """
+    (pending order value, month-end forecast, committed lines) per salesperson
+    from the forecast frame.
+    """
+    if df.empty:
+        return {}, {}, {}
+    reps = _rep(fe._col(df, "SALES_EXECUTIVE"))
+    pending = _sum_by_rep(reps, fe._num(fe._col(df, "TOTAL_NET_BASIC", 0)))
+    forecast = {
+        rep: float(fe.compute_forecast_breakdown(sub)["total"])
+        for rep, sub in df.groupby(reps.values, sort=False)
+    }
+    committed = {
+        k: int(v) for k, v in fe.committed_mask(df).groupby(reps.values).sum().items()
+    }
+    return pending, forecast, committed
+
+
+def compute_snapshot(ref: date | None = None) -> dict:
+    """
+    Compute the current-month metrics:
+        {"month", "month_label", "computed_at", "totals", "by_salesperson"}
+    `totals` and each `by_salesperson` entry carry the METRIC_COLUMNS keys
+    plus `committed_lines` (MIS- or manually-committed forecast lines).
+    """
+    now = datetime.now(fe.IST)
+    ref = ref or now.date()
+    month = fe.forecast_month(ref)
+
+    result = fe.forecast_result(ref)
+    totals = {
+        "target":                  mm.get_monthly_target(month),
+        "invoice_value":           mm.get_current_sales_invoice_value(month),
+        "pending_order_value":     mm.get_pending_order_value(),
+        "pending_order_value_crm": mm.get_pending_order_value_crm(),
+        "forecast":                float(result["breakdown"]["total"]),
+        "committed_lines":         int(fe.committed_mask(result["df"]).sum()),
+    }
+    totals["pending_target"] = totals["target"] - totals["invoice_value"]
+
+    pending, forecast, committed = _forecast_by_rep(result["df"])
+    parts = {
+        "target":                  _targets_by_rep(month),
+        "invoice_value":           _invoices_by_rep(month),
+        "pending_order_value":     pending,
+        "pending_order_value_crm": _crm_pending_by_rep(),
+        "forecast":                forecast,
+        "committed_lines":         committed,
+    }
+    reps = sorted(set().union(*parts.values()), key=lambda r: (r == UNASSIGNED, r))
+    by_rep = []
+    for rep in reps:
+        row = {key: parts[key].get(rep, 0) for key in parts}
+        row["pending_target"] = row["target"] - row["invoice_value"]
+        by_rep.append({"sales_person": rep, **row})
+
+    return {
+        "month":          month,
+        "month_label":    month_label(ref),
+        "computed_at":    now.isoformat(timespec="seconds"),
+        "totals":         totals,
+        "by_salesperson": by_rep,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PERSIST / LOAD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def snapshot_to_df(snap: dict) -> pd.DataFrame:
+    """One row for ALL, then one per salesperson (the OPS tab layout)."""
+    rows = [{"sales_person": ALL_ROW, **snap["totals"]}, *snap["by_salesperson"]]
+    return pd.DataFrame([
+        {
+            "MONTH":        snap["month_label"],
+            "COMPUTED AT":  snap["computed_at"],
+            "SALES PERSON": r["sales_person"],
+            **{col: round(float(r.get(key, 0.0)), 2) for key, col in METRIC_COLUMNS.items()},
+        }
+        for r in rows
+    ], columns=SHEET_COLUMNS)
+
+
+def _snapshot_from_df(df: pd.DataFrame) -> dict | None:
+    """Inverse of snapshot_to_df; None when the tab is empty or malformed."""
+    if df is None or df.empty or not set(SHEET_COLUMNS) <= set(df.columns):
+        return None
+    rows = []
+    for r in df.to_dict("records"):
+        vals = {key: fe._to_num(r.get(col)) for key, col in METRIC_COLUMNS.items()}
+        rows.append({"sales_person": str(r["SALES PERSON"]).strip(), **vals})
+    totals = next((r for r in rows if r["sales_person"] == ALL_ROW), None)
+    if totals is None:
+        return None
+    label = str(df["MONTH"].iloc[0]).strip()
+    return {
+        "month":          label.split(" ")[0],
+        "month_label":    label,
+        "computed_at":    str(df["COMPUTED AT"].iloc[0]).strip(),
+        "totals":         {k: v for k, v in totals.items() if k != "sales_person"},
+        "by_salesperson": [r for r in rows if r["sales_person"] != ALL_ROW],
+    }
+
+
+def save_snapshot(snap: dict, to_sheet: bool = True) -> str:
+    """Write the local file and (unless `to_sheet` is False) the OPS tab."""
+    write_json(_local_path(), snap)
+    if not to_sheet:
+        return f"✅ Metrics snapshot saved locally ({snap['computed_at']})."
+    try:
+        from services.sheets import write_df
+        write_df(SNAPSHOT_SHEET, snapshot_to_df(snap))
+    except Exception as e:
+        return f"⚠️ Metrics snapshot saved locally; '{SNAPSHOT_SHEET}' not updated: {e}"
+    return (
+        f"✅ Metrics snapshot for {snap['month_label']} saved "
+        f"({len(snap['by_salesperson'])} salespeople, {snap['computed_at']})."
+    )
+
+
+def load_snapshot(ref: date | None = None) -> dict | None:
+    """
+    The newest snapshot for `ref`'s month — local file or OPS tab, whichever
+    was computed later. None when neither holds this month.
+    """
+    label = month_label(ref)
+    candidates = [read_json(_local_path())]
+    try:
+        from services.sheets import get_df
+        candidates.append(_snapshot_from_df(get_df(SNAPSHOT_SHEET)))
+    except Exception:
+        pass
+    candidates = [
+        c for c in candidates
+        if isinstance(c, dict) and c.get("month_label") == label and "totals" in c
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: str(c.get("computed_at", "")))
+
+
+def refresh_snapshot(ref: date | None = None, to_sheet: bool = True) -> tuple[dict | None, str]:
+    """
+    Recompute from fresh sheet reads, save, and (with `to_sheet`) append the
+    figures to the FORECAST HISTORY tab (services/forecast_history.py).
+    Returns (snapshot, status);
+    the snapshot is None when the computation itself failed.
+    """
+    try:
+        from services.sheets import get_df
+        get_df.clear()
+    except Exception:
+        pass
+    try:
+        snap = compute_snapshot(ref)
+    except Exception as e:
+        print(f"[METRICS] Snapshot failed: {e}")
+        return None, f"❌ Metrics snapshot failed: {e}"
+    status = save_snapshot(snap, to_sheet=to_sheet)
+    if to_sheet:
+        try:
+            from services.forecast_history import record_snapshot
+            record_snapshot(snap)
+        except Exception as e:
+            print(f"[METRICS] Forecast history not updated: {e}")
+    print(f"[METRICS] {status}")
+    return snap, status
+
+
+def age_minutes(snap: dict) -> float | None:
+    """Minutes since the snapshot was computed."""
+    try:
+        computed = datetime.fromisoformat(str(snap["computed_at"]))
+    except (KeyError, ValueError):
+        return None
+    if computed.tzinfo is None:
+        computed = computed.replace(tzinfo=fe.IST)
+    return (datetime.now(fe.IST) - computed).total_seconds() / 60
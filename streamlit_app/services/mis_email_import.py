@@ -102,6 +102,21 @@ DISPLAY_COLUMNS = [
     "Address Line 4(Ship To)",
 ]
 
+# ─── Typed columns (names after PO_COLUMNS rename) ────────────────────────────
+# The streaming parser materialises these as floats / datetimes; every other
+# column is kept as a plain string, exactly as the pandas path always did.
+NUMERIC_COLUMNS = [
+    "Sales Order Qty",
+    "Sales Order Committed Qty",
+    "Total Discount",
+    "Total Net Basic",
+    "FO Firm Commitment Qty",
+]
+DATE_COLUMNS = [
+    "Booking Date",
+    "Inventory Commitment Date",
+]
+
 
 # ═════════════════════════════════════════════════════════════════════════════
 # HELPERS
@@ -133,6 +148,222 @@ def _get_attachment_bytes(msg) -> bytes | None:
     return None
 
 
+# ═════════════════════════════════════════════════════════════════════════════
+# EXCEL PARSING — PO sheet
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _find_po_sheet(sheet_names: list[str]) -> str | None:
+    """Return the 'PO' sheet name (case-insensitive), or None."""
+    return next((s for s in sheet_names if s.strip().upper() == "PO"), None)
+
+
+def _rename_po_columns(columns: list[str]) -> list[str]:
+    """Apply PO_COLUMNS renames (e.g. REFERENCE A 1 → Customer Name) to stripped headers."""
+    renames = {orig.strip(): new for orig, new in PO_COLUMNS.items()}
+    return [renames.get(c, c) for c in columns]
+
+
+def _cell_str(v):
+    """
+    String form of a raw openpyxl cell value, matching what
+    ``pd.read_excel(dtype=str)`` produced: integral numbers without ".0",
+    datetimes as "YYYY-MM-DD HH:MM:SS", empty cells as None.
+    """
+    if v is None:
+        return None
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    if isinstance(v, str):
+        return v if v.strip() else None
+    return str(v)
+
+
+def _parse_po_streaming(
+    xlsx_bytes: bytes, columns: list[str] | None = None
+) -> tuple[pd.DataFrame, str]:
+    """
+    Stream the PO sheet with openpyxl in read-only mode.
+
+    Only the PO sheet is touched (other sheets are never inflated) and rows are
+    consumed one at a time from the XML stream. When `columns` is given, only
+    those columns (post-rename names, case-insensitive) are materialised.
+    Returns (df, error) — untyped, see `_apply_po_types`.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(xlsx_bytes), read_only=True, data_only=True)
+    try:
+        po_sheet = _find_po_sheet(wb.sheetnames)
+        if po_sheet is None:
+            return pd.DataFrame(), (
+                f"⚠️ 'PO' sheet not found. Available sheets: {', '.join(wb.sheetnames)}"
+            )
+
+        rows = wb[po_sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return pd.DataFrame(), ""
+
+        # Header names — blanks and duplicates named the way pandas names them
+        names: list[str] = []
+        seen: dict[str, int] = {}
+        for i, h in enumerate(header):
+            name = str(h).strip() if h is not None and str(h).strip() else f"Unnamed: {i}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            names.append(name)
+        names = _rename_po_columns(names)
+
+        if columns is None:
+            keep = list(enumerate(names))
+        else:
+            wanted = {c.strip().lower() for c in columns}
+            keep = [(i, n) for i, n in enumerate(names) if n.lower() in wanted]
+
+        data: dict[str, list] = {n: [] for _, n in keep}
+        for row in rows:
+            if not row or all(v is None or (isinstance(v, str) and not v.strip()) for v in row):
+                continue
+            width = len(row)
+            for i, n in keep:
+                data[n].append(row[i] if i < width else None)
+    finally:
+        wb.close()
+
+    return pd.DataFrame(data, columns=[n for _, n in keep]), ""
+
+
+def _apply_po_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    NUMERIC_COLUMNS → float, DATE_COLUMNS → datetime for real Excel date cells,
+    everything else → str/None. A text cell in a date column ("Not Committed",
+    "TBD", a date typed as text) keeps its exact text, as the pandas path does.
+    """
+    for col in df.columns:
+        if col in NUMERIC_COLUMNS:
+            df[col] = pd.to_numeric(
+                df[col].map(lambda v: str(v).replace(",", "").strip() if v is not None else None),
+                errors="coerce",
+            )
+        elif col in DATE_COLUMNS:
+            raw = df[col]
+            is_dt = raw.map(lambda v: isinstance(v, (datetime, pd.Timestamp)))
+            if raw[~is_dt].map(_cell_str).notna().any():
+                df[col] = raw.map(
+                    lambda v: pd.Timestamp(v) if isinstance(v, (datetime, pd.Timestamp)) else _cell_str(v)
+                ).astype(object)
+            else:
+                df[col] = pd.to_datetime(raw.where(is_dt), errors="coerce")
+        else:
+            df[col] = df[col].map(_cell_str)
+    return df
+
+
+def _parse_po_pandas(attachment_bytes: bytes) -> tuple[pd.DataFrame, str]:
+    """Original parser — whole workbook via pd.ExcelFile, every column as str."""
+    try:
+        xl = pd.ExcelFile(io.BytesIO(attachment_bytes))
+    except Exception as e:
+        return pd.DataFrame(), f"❌ Could not open Excel file: {e}"
+
+    po_sheet = _find_po_sheet(xl.sheet_names)
+    if po_sheet is None:
+        available = ", ".join(xl.sheet_names)
+        return pd.DataFrame(), f"⚠️ 'PO' sheet not found. Available sheets: {available}"
+
+    try:
+        df_raw = xl.parse(po_sheet, dtype=str)
+    except Exception as e:
+        return pd.DataFrame(), f"❌ Failed to parse PO sheet: {e}"
+
+    # Strip whitespace from column names, then apply known renames.
+    # All other columns are kept unchanged so the full sheet is preserved.
+    df = df_raw.copy()
+    df.columns = _rename_po_columns([str(c).strip() for c in df_raw.columns])
+    return df, ""
+
+
+def parse_mis_workbook(
+    attachment_bytes: bytes,
+    streaming: bool = True,
+    columns: list[str] | None = None,
+) -> tuple[pd.DataFrame, str]:
+    """
+    Parse the MIS attachment's PO sheet. Returns (df, error) — error is "" on success.
+
+    streaming=True (default) uses the openpyxl read-only reader on .xlsx files:
+    only the PO sheet is streamed, NUMERIC_COLUMNS come back as floats and
+    DATE_COLUMNS' date cells as datetimes (text cells stay text), and `columns` can project the read down to just
+    the columns a caller needs (e.g. forecast_engine.MIS_FETCH_COLS). Legacy
+    .xls files, or any streaming failure, fall back to the pd.ExcelFile path
+    (all columns as str, `columns` ignored).
+
+    Either way the frame gets empty rows dropped and the derived
+    "Discount Percentage" column added.
+    """
+    df, err = pd.DataFrame(), ""
+    is_xlsx = attachment_bytes[:4] == b"PK\x03\x04"   # .xlsx is a zip container
+    parsed = False
+    if streaming and is_xlsx:
+        try:
+            df, err = _parse_po_streaming(attachment_bytes, columns)
+            if not err:
+                df = _apply_po_types(df)
+            parsed = True
+        except Exception as e:
+            print(f"[MIS] Streaming parse failed, falling back to pandas: {e}")
+    if not parsed:
+        df, err = _parse_po_pandas(attachment_bytes)
+    if err:
+        return pd.DataFrame(), err
+
+    # Drop fully empty rows
+    df.dropna(how="all", inplace=True)
+    df.reset_index(drop=True, inplace=True)
+
+    # Calculate Discount Percentage = (Total Discount / Total Net Basic) * 100
+    _disc_col = next((c for c in df.columns if c.strip().lower() == "total discount"), None)
+    _nb_col   = next((c for c in df.columns if c.strip().lower() == "total net basic"), None)
+    if _disc_col and _nb_col:
+        disc_num = pd.to_numeric(
+            df[_disc_col].astype(str).str.strip().str.replace(",", "", regex=False),
+            errors="coerce"
+        )
+        nb_num = pd.to_numeric(
+            df[_nb_col].astype(str).str.strip().str.replace(",", "", regex=False),
+            errors="coerce"
+        )
+        df["Discount Percentage"] = (disc_num / nb_num.replace(0, float("nan")) * 100).round(2)
+
+    return df, ""
+
+
+def _to_sheet_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Render a parsed MIS frame as the plain strings MIS_Daily has always held,
+    so typed (streaming) and untyped (pandas) parses persist identically:
+    integral floats without ".0", datetimes as "YYYY-MM-DD HH:MM:SS", NaN/NaT as "".
+    """
+    out = df.copy()
+    for col in out.columns:
+        s = out[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            out[col] = s.dt.strftime("%Y-%m-%d %H:%M:%S").fillna("")
+        elif col in DATE_COLUMNS:
+            # Mixed date / text column — format the dates, keep the text as-is
+            out[col] = s.map(
+                lambda v: "" if v is None or pd.isna(v)
+                else v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, (datetime, pd.Timestamp))
+                else v
+            )
+        elif col in NUMERIC_COLUMNS and pd.api.types.is_numeric_dtype(s):
+            out[col] = s.map(lambda v: "" if pd.isna(v) else _cell_str(float(v)))
+    return out.fillna("").astype(str)
+
+
 # ═════════════════════════════════════════════════════════════════════════════
 # MAIN PUBLIC FUNCTION
 # ═════════════════════════════════════════════════════════════════════════════
@@ -140,8 +371,16 @@ def _get_attachment_bytes(msg) -> bytes | None:
 # Sheet name where today's MIS data is cached
 MIS_CACHE_SHEET = "MIS_Daily"
 
+# Run-ledger job name (services/run_ledger.py) for the scheduled import
+MIS_LEDGER_JOB = "MIS Daily Import"
+
 
-def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.DataFrame, str]:
+def fetch_mis_data(
+    days_back: int = 3,
+    today_only: bool = False,
+    streaming: bool = True,
+    ledger_job: str | None = None,
+) -> tuple[pd.DataFrame, str]:
     """
     Connect to Gmail IMAP, find the latest MIS email, extract the Excel
     attachment, and return a (DataFrame, status_message) tuple.
@@ -152,6 +391,15 @@ def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.Dat
         How many calendar days back to search for the email (default 3).
     today_only : bool
         If True, only fetch the email received today (used by 11 AM scheduler).
+    streaming : bool
+        Parse with the openpyxl read-only streaming reader (default). False
+        forces the original pd.ExcelFile path. See `parse_mis_workbook`.
+    ledger_job : str | None
+        When set, skip a message (right after the UID SEARCH) or attachment
+        (right after download) already recorded in the run ledger for this
+        job; the returned df is then empty and the status says
+        "already imported". On a real import the ledger keys are left in
+        df.attrs["source_keys"] for the caller to record once saved.
 
     Returns
     -------
@@ -178,14 +426,16 @@ def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.Dat
         since_date = (datetime.now() - timedelta(days=days_back)).strftime("%d-%b-%Y")
         search_query = f'(SUBJECT "{MIS_SUBJECT}" SINCE {since_date})'
 
+    from services.run_ledger import (
+        ALREADY_IMPORTED, all_seen, content_key, imap_uid_search, message_key,
+    )
+
     try:
-        status, data = mail.search(None, search_query)
+        uidvalidity, email_ids = imap_uid_search(mail, search_query)
     except Exception as e:
         mail.logout()
         return pd.DataFrame(), f"❌ IMAP search error: {e}"
 
-    email_ids = data[0].split() if data and data[0] else []
-
     if not email_ids:
         mail.logout()
         if today_only:
@@ -200,9 +450,14 @@ def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.Dat
 
     # Take the most recent match
     latest_id = email_ids[-1]
+    msg_key = message_key(IMAP_EMAIL, uidvalidity, latest_id)
+
+    if ledger_job and all_seen(ledger_job, [msg_key]):
+        mail.logout()
+        return pd.DataFrame(), f"✅ Latest MIS email {ALREADY_IMPORTED} — nothing to do."
 
     try:
-        _, msg_data = mail.fetch(latest_id, "(RFC822)")
+        _, msg_data = mail.uid("FETCH", latest_id, "(RFC822)")
         mail.logout()
     except Exception as e:
         mail.logout()
@@ -218,66 +473,14 @@ def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.Dat
     if attachment_bytes is None:
         return pd.DataFrame(), "⚠️ MIS email found but no Excel attachment detected."
 
-    # Parse Excel
-    try:
-        excel_file = io.BytesIO(attachment_bytes)
-        xl = pd.ExcelFile(excel_file)
-    except Exception as e:
-        return pd.DataFrame(), f"❌ Could not open Excel file: {e}"
-
-    # Find the PO sheet (case-insensitive)
-    po_sheet = None
-    for sheet in xl.sheet_names:
-        if sheet.strip().upper() == "PO":
-            po_sheet = sheet
-            break
-
-    if po_sheet is None:
-        available = ", ".join(xl.sheet_names)
-        return pd.DataFrame(), f"⚠️ 'PO' sheet not found. Available sheets: {available}"
-
-    try:
-        df_raw = xl.parse(po_sheet, dtype=str)
-    except Exception as e:
-        return pd.DataFrame(), f"❌ Failed to parse PO sheet: {e}"
-
-    # Strip whitespace from column names
-    df_raw.columns = [str(c).strip() for c in df_raw.columns]
-
-    # Build rename map — apply known renames (e.g. REFERENCE A 1 → Customer Name)
-    # All other columns are kept unchanged so the full sheet is preserved.
-    rename_map = {}
-    for orig, renamed in PO_COLUMNS.items():
-        if orig in df_raw.columns:
-            rename_map[orig] = renamed
-        else:
-            matched = next(
-                (c for c in df_raw.columns if c.strip() == orig.strip()),
-                None
-            )
-            if matched:
-                rename_map[matched] = renamed
-
-    # Keep ALL columns; only rename the known ones
-    df = df_raw.rename(columns=rename_map).copy()
+    att_key = content_key(attachment_bytes)
+    if ledger_job and all_seen(ledger_job, [att_key]):
+        return pd.DataFrame(), f"✅ MIS attachment {ALREADY_IMPORTED} (re-sent) — nothing to do."
 
-    # Drop fully empty rows
-    df.dropna(how="all", inplace=True)
-    df.reset_index(drop=True, inplace=True)
-
-    # Calculate Discount Percentage = (Total Discount / Total Net Basic) * 100
-    _disc_col = next((c for c in df.columns if c.strip().lower() == "total discount"), None)
-    _nb_col   = next((c for c in df.columns if c.strip().lower() == "total net basic"), None)
-    if _disc_col and _nb_col:
-        disc_num = pd.to_numeric(
-            df[_disc_col].astype(str).str.strip().str.replace(",", "", regex=False),
-            errors="coerce"
-        )
-        nb_num = pd.to_numeric(
-            df[_nb_col].astype(str).str.strip().str.replace(",", "", regex=False),
-            errors="coerce"
-        )
-        df["Discount Percentage"] = (disc_num / nb_num.replace(0, float("nan")) * 100).round(2)
+    df, err = parse_mis_workbook(attachment_bytes, streaming=streaming)
+    if err:
+        return pd.DataFrame(), err
+    df.attrs["source_keys"] = [msg_key, att_key]
 
     # Warn if any DISPLAY_COLUMNS are missing after rename
     missing_cols = [c for c in DISPLAY_COLUMNS if c not in df.columns]
@@ -296,25 +499,146 @@ def fetch_mis_data(days_back: int = 3, today_only: bool = False) -> tuple[pd.Dat
 # GOOGLE SHEET CACHE — write today's MIS, read cached MIS
 # ═════════════════════════════════════════════════════════════════════════════
 
-def save_mis_to_sheet(df: pd.DataFrame) -> str:
+# Above this share of changed rows a full rewrite is cheaper than row edits.
+_FULL_REWRITE_RATIO = 0.5
+
+
+def _sync_mis_sheet(sheet_df: pd.DataFrame) -> str:
+    """
+    Bring the MIS_Daily tab in line with `sheet_df` (all-string frame with
+    'Fetched On' first) touching only the rows that differ.
+
+    Rows are matched on (Sales Order No., Sales Order Position) — see
+    services/mis_snapshots.row_keys. Changed rows and the 'Fetched On' column
+    go in one values batch_update, closed rows are removed in one
+    deleteDimension batch, new rows are added with one append_rows.
+    Falls back to write_df (clear + rewrite) when the tab is missing/empty,
+    its header differs, or most rows changed anyway.
+
+    Returns "full" or "rows" (what was done), for the status message.
+    """
+    from gspread.utils import rowcol_to_a1
+
+    from services.mis_snapshots import VOLATILE_COLS, row_keys
+    from services.sheets import _ensure_sheet, write_df
+
+    headers = list(sheet_df.columns)
+    ws = _ensure_sheet(MIS_CACHE_SHEET)
+    values = ws.get_all_values()
+
+    if not values or [h.strip() for h in values[0]] != headers:
+        write_df(MIS_CACHE_SHEET, sheet_df)
+        return "full"
+
+    width = len(headers)
+    existing = pd.DataFrame(
+        [(r + [""] * width)[:width] for r in values[1:]], columns=headers
+    )
+    old_keys = row_keys(existing)
+    new_df = sheet_df.reset_index(drop=True)
+    new_keys = row_keys(new_df)
+
+    old_pos = pd.Series(existing.index, index=old_keys.values)
+    new_pos = pd.Series(new_df.index, index=new_keys.values)
+    common = old_pos.index.intersection(new_pos.index)
+    closed = old_pos.index.difference(new_pos.index)
+    added = new_pos.index.difference(old_pos.index)
+
+    cmp_cols = [c for c in headers if c not in VOLATILE_COLS]
+    o = existing.loc[old_pos[common].values, cmp_cols].to_numpy()
+    n = new_df.loc[new_pos[common].values, cmp_cols].to_numpy()
+    changed = common[(o != n).any(axis=1)] if len(common) else common
+
+    if len(changed) + len(closed) + len(added) > _FULL_REWRITE_RATIO * max(len(new_df), 1):
+        write_df(MIS_CACHE_SHEET, sheet_df)
+        return "full"
+
+    last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+
+    # 1. Changed rows + refreshed 'Fetched On' — row positions are still the old ones
+    updates = []
+    for key in changed:
+        r = int(old_pos[key]) + 2  # +1 header, +1 one-based
+        updates.append({
+            "range": f"A{r}:{last_col}{r}",
+            "values": [new_df.loc[int(new_pos[key])].tolist()],
+        })
+    if "Fetched On" in headers and len(existing):
+        col = rowcol_to_a1(1, headers.index("Fetched On") + 1).rstrip("0123456789")
+        stamp = new_df["Fetched On"].iloc[0] if len(new_df) else ""
+        updates.append({
+            "range": f"{col}2:{col}{len(existing) + 1}",
+            "values": [[stamp]] * len(existing),
+        })
+    if updates:
+        ws.batch_update(updates, value_input_option="RAW")
+
+    # 2. Closed rows — delete bottom-up so earlier indices stay valid
+    if len(closed):
+        rows = sorted((int(old_pos[k]) + 1 for k in closed), reverse=True)  # 0-based sheet row
+        requests, start, end = [], rows[0], rows[0] + 1
+        for r in rows[1:]:
+            if r == start - 1:
+                start = r
+                continue
+            requests.append((start, end))
+            start, end = r, r + 1
+        requests.append((start, end))
+        ws.spreadsheet.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": ws.id, "dimension": "ROWS", "startIndex": s_, "endIndex": e_,
+            }}}
+            for s_, e_ in requests
+        ]})
+
+    # 3. New rows
+    if len(added):
+        idx = sorted(int(new_pos[k]) for k in added)
+        ws.append_rows(new_df.loc[idx].values.tolist(), value_input_option="RAW")
+
+    return "rows"
+
+
+def save_mis_to_sheet(df: pd.DataFrame, record_history: bool = True) -> str:
     """
     Persist today's MIS DataFrame to the MIS_Daily Google Sheet tab.
-    Adds a 'Fetched On' column with today's date (DD-MMM-YYYY).
-    Overwrites the entire sheet on every call (single-day cache).
+    Adds a 'Fetched On' column with the fetch time (DD-MMM-YYYY HH:MM).
+
+    The rows are first recorded as today's snapshot in the MIS history
+    (services/mis_snapshots.py), then only the rows that changed since the
+    sheet was last written are applied to it (see _sync_mis_sheet).
+    record_history=False skips the snapshot — for callers whose local state
+    folder is not kept between runs, where the day-over-day delta would be
+    measured against nothing (or a stale day).
     """
     if df is None or df.empty:
         return "⚠️ Nothing to save — DataFrame is empty."
 
     out = df.copy()
     out.insert(0, "Fetched On", datetime.now().strftime("%d-%b-%Y %H:%M"))
+    sheet_df = _to_sheet_strings(out)
+
+    history_msg = ""
+    if record_history:
+        try:
+            from services.mis_snapshots import record_snapshot
+            _, history_msg = record_snapshot(sheet_df)
+        except Exception as e:
+            history_msg = f"⚠️ MIS snapshot not stored: {e}"
 
     try:
-        # Local import to avoid circular deps
-        from services.sheets import write_df
-        write_df(MIS_CACHE_SHEET, out.fillna("").astype(str))
-        return f"✅ Cached {len(out)} MIS rows to '{MIS_CACHE_SHEET}'."
+        mode = _sync_mis_sheet(sheet_df)
     except Exception as e:
-        return f"❌ Failed to cache MIS to sheet: {e}"
+        return f"❌ Failed to cache MIS to sheet: {e}\n{history_msg}"
+
+    try:
+        from services.sheets import get_df
+        get_df.clear()
+    except Exception:
+        pass
+
+    how = "rewritten" if mode == "full" else "changed rows only"
+    return f"✅ Cached {len(out)} MIS rows to '{MIS_CACHE_SHEET}' ({how}).\n{history_msg}"
 
 
 def load_cached_mis() -> tuple[pd.DataFrame, str]:
@@ -347,14 +671,28 @@ def load_cached_mis() -> tuple[pd.DataFrame, str]:
     return df, msg
 
 
-def fetch_and_cache_mis() -> tuple[pd.DataFrame, str]:
+def fetch_and_cache_mis(
+    skip_unchanged: bool = False,
+    record_history: bool = True,
+) -> tuple[pd.DataFrame, str]:
     """
     Scheduler entry-point and manual trigger.
     Fetches today's MIS email only (today_only=True).
     The scheduled job handles retrying if the email hasn't arrived yet.
+
+    skip_unchanged=True (scheduled runs) consults the run ledger: when today's
+    email was already imported, the run ends after the IMAP search with an
+    empty df and a ✅ "already imported" status. Manual triggers leave it off
+    so a forced fetch always re-imports. record_history is passed on to
+    save_mis_to_sheet.
     """
-    df, status = fetch_mis_data(days_back=1, today_only=True)
+    ledger_job = MIS_LEDGER_JOB if skip_unchanged else None
+    df, status = fetch_mis_data(days_back=1, today_only=True, ledger_job=ledger_job)
     if df is None or df.empty:
         return df, status
-    save_msg = save_mis_to_sheet(df)
+    source_keys = df.attrs.get("source_keys", [])
+    save_msg = save_mis_to_sheet(df, record_history=record_history)
+    if "✅" in save_msg:
+        from services.run_ledger import record_keys
+        record_keys(MIS_LEDGER_JOB, source_keys, records_count=len(df))
     return df, f"{status}\n{save_msg}"
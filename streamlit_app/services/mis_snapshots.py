@@ -0,0 +1,387 @@
+"""
+services/mis_snapshots.py
+
+Versioned daily history of the MIS PO data, plus the day-over-day delta.
+
+Every MIS import stores the day's PO rows as one gzip-compressed CSV under the
+local state folder (services/local_state.py):
+
+    .crm_state/mis_snapshots/2026-05-27.csv.gz      (last import of the day wins)
+
+Rows are keyed by (Sales Order No., Sales Order Position). The MIS can carry
+more than one line for the same position (split freight orders), so repeats of
+a pair are told apart by their order of appearance — see `row_keys`.
+
+The delta between two snapshots has three parts:
+    new     — lines that appeared
+    closed  — lines that disappeared (invoiced / cancelled)
+    changed — lines present in both with any value changed; the subset whose
+              "Inventory Commitment Date" or "Sales Order Committed Qty" moved
+              is reported as commitment changes.
+
+The snapshot folder only exists where the import ran (the GitHub runner keeps
+it in actions/cache), so it is a local cache: files older than RETENTION_DAYS
+are pruned on every import, and `load_history` only sees that host's files.
+
+The commitment changes of each import are also kept in the OPS tab
+"MIS COMMITMENT DRIFT" — one row per changed line per day:
+
+    Day | Since | Sales Order No. | Sales Order Position | Line | Item Code |
+    Inventory Commitment Date (old) | Inventory Commitment Date (new) |
+    Sales Order Committed Qty (old) | Sales Order Committed Qty (new)
+
+`Since` is the snapshot day the change was measured against. A later import on
+the same day replaces that day's rows, and rows older than RETENTION_DAYS are
+dropped. `commitment_drift` reads this tab, so the Streamlit app shows the
+same drift as the runner that recorded it, without re-importing old emails.
+"""
+from __future__ import annotations
+
+import glob
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+
+from services.local_state import state_dir
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+SNAPSHOT_DIR = "mis_snapshots"
+KEY_COLS = ["Sales Order No.", "Sales Order Position"]
+COMMITMENT_COLS = ["Inventory Commitment Date", "Sales Order Committed Qty"]
+# Columns that change on every import without the MIS line itself changing
+VOLATILE_COLS = ["Fetched On"]
+
+# Local snapshot files and drift tab rows older than this are dropped
+RETENTION_DAYS = 90
+
+DRIFT_SHEET = "MIS COMMITMENT DRIFT"
+DRIFT_HEADERS = [
+    "Day", "Since", *KEY_COLS, "Line", "Item Code",
+    *[f"{c} ({side})" for c in COMMITMENT_COLS for side in ("old", "new")],
+]
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# KEYS
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _norm_key_part(s: pd.Series) -> pd.Series:
+    s = s.fillna("").astype(str).str.strip()
+    # A numeric position read back from the sheet as "10.0" must match "10"
+    return s.str.replace(r"^(\d+)\.0+$", r"\1", regex=True)
+
+
+def row_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    One key per row: "<SO No>|<Position>|<n>", where n counts repeats of the
+    same (SO, Position) pair in row order. Returned with df's index.
+    """
+    if df.empty:
+        return pd.Series([], dtype=str, index=df.index)
+    so = _norm_key_part(df[KEY_COLS[0]]) if KEY_COLS[0] in df.columns else pd.Series("", index=df.index)
+    pos = _norm_key_part(df[KEY_COLS[1]]) if KEY_COLS[1] in df.columns else pd.Series("", index=df.index)
+    n = pd.DataFrame({"so": so, "pos": pos}).groupby(["so", "pos"]).cumcount()
+    return so + "|" + pos + "|" + n.astype(str)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SNAPSHOT STORE
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _snapshot_path(day: date) -> str:
+    return os.path.join(state_dir(SNAPSHOT_DIR), f"{day.isoformat()}.csv.gz")
+
+
+def list_snapshot_dates() -> list[date]:
+    """Dates that have a stored snapshot, oldest first."""
+    out = []
+    for p in glob.glob(os.path.join(state_dir(SNAPSHOT_DIR), "*.csv.gz")):
+        try:
+            out.append(date.fromisoformat(os.path.basename(p)[:10]))
+        except ValueError:
+            continue
+    return sorted(out)
+
+
+def save_snapshot(df: pd.DataFrame, day: date | None = None) -> str:
+    """Store `df` (all columns as strings) as the snapshot for `day` (default today IST)."""
+    day = day or datetime.now(IST).date()
+    path = _snapshot_path(day)
+    tmp = path + ".tmp"
+    df.drop(columns=[c for c in VOLATILE_COLS if c in df.columns]).fillna("").astype(str).to_csv(
+        tmp, index=False, compression="gzip"
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(day: date, columns: list[str] | None = None) -> pd.DataFrame:
+    """Load the snapshot for `day` (empty DataFrame if none). Every value is a string."""
+    path = _snapshot_path(day)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    usecols = (lambda c: c in columns) if columns else None
+    return pd.read_csv(path, dtype=str, keep_default_na=False, usecols=usecols, compression="gzip")
+
+
+def prune_snapshots(today: date, keep_days: int = RETENTION_DAYS) -> int:
+    """Delete snapshot files more than `keep_days` before `today`. Returns files removed."""
+    cutoff = today - timedelta(days=keep_days)
+    removed = 0
+    for d in list_snapshot_dates():
+        if d >= cutoff:
+            break
+        try:
+            os.remove(_snapshot_path(d))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def previous_snapshot_date(before: date) -> date | None:
+    """Latest snapshot date strictly earlier than `before`."""
+    earlier = [d for d in list_snapshot_dates() if d < before]
+    return earlier[-1] if earlier else None
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# DELTA
+# ═════════════════════════════════════════════════════════════════════════════
+
+def compute_delta(old: pd.DataFrame, new: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Row-level delta from `old` to `new` (both string frames with KEY_COLS).
+
+    Returns {"new", "closed", "changed", "commitment_changed"} DataFrames, each
+    indexed by row key. "commitment_changed" has the old and new values of
+    COMMITMENT_COLS side by side ("<col> (old)" / "<col> (new)").
+    """
+    empty = pd.DataFrame()
+    old = old.fillna("").astype(str) if not old.empty else old
+    new = new.fillna("").astype(str) if not new.empty else new
+    if old.empty:
+        new_keyed = new.set_axis(row_keys(new), axis=0) if not new.empty else new
+        return {"new": new_keyed, "closed": empty, "changed": empty, "commitment_changed": empty}
+
+    o = old.set_axis(row_keys(old), axis=0)
+    n = new.set_axis(row_keys(new), axis=0) if not new.empty else new
+
+    added_keys = n.index.difference(o.index) if not n.empty else pd.Index([])
+    closed_keys = o.index.difference(n.index) if not n.empty else o.index
+    common = o.index.intersection(n.index) if not n.empty else pd.Index([])
+
+    cols = [c for c in n.columns if c in o.columns and c not in VOLATILE_COLS] if not n.empty else []
+    if len(common) and cols:
+        diff = (o.loc[common, cols] != n.loc[common, cols]).any(axis=1)
+        changed_keys = diff[diff].index
+    else:
+        changed_keys = pd.Index([])
+
+    commit_cols = [c for c in COMMITMENT_COLS if c in cols]
+    if len(changed_keys) and commit_cols:
+        cdiff = (o.loc[changed_keys, commit_cols] != n.loc[changed_keys, commit_cols]).any(axis=1)
+        ck = cdiff[cdiff].index
+        commitment = n.loc[ck, [c for c in KEY_COLS + ["Item Code"] if c in n.columns]].copy()
+        for c in commit_cols:
+            commitment[f"{c} (old)"] = o.loc[ck, c]
+            commitment[f"{c} (new)"] = n.loc[ck, c]
+    else:
+        commitment = empty
+
+    return {
+        "new": n.loc[added_keys] if len(added_keys) else empty,
+        "closed": o.loc[closed_keys] if len(closed_keys) else empty,
+        "changed": n.loc[changed_keys] if len(changed_keys) else empty,
+        "commitment_changed": commitment,
+    }
+
+
+def record_snapshot(
+    df: pd.DataFrame,
+    day: date | None = None,
+    to_sheet: bool = True,
+) -> tuple[dict[str, pd.DataFrame], str]:
+    """
+    Compare `df` with the most recent snapshot from an EARLIER day, store `df`
+    as today's snapshot, and return (delta, one-line summary).
+
+    A second import on the same day overwrites that day's snapshot and is
+    compared against the same previous day, so the reported delta is always
+    day-over-day. With `to_sheet`, the day's commitment changes are written to
+    the DRIFT_SHEET tab (see `record_drift`).
+    """
+    day = day or datetime.now(IST).date()
+    prev_day = previous_snapshot_date(day)
+    prev = load_snapshot(prev_day) if prev_day else pd.DataFrame()
+    cur = df.drop(columns=[c for c in VOLATILE_COLS if c in df.columns]).fillna("").astype(str)
+
+    delta = compute_delta(prev, cur)
+    save_snapshot(cur, day)
+    prune_snapshots(day)
+
+    if prev_day is None:
+        return delta, f"🗂️ MIS history started — first snapshot stored for {day:%d-%b-%Y}."
+    msg = (
+        f"🗂️ MIS Δ vs {prev_day:%d-%b}: {len(delta['new'])} new, "
+        f"{len(delta['closed'])} closed, {len(delta['changed'])} changed "
+        f"({len(delta['commitment_changed'])} commitment change(s))."
+    )
+    if to_sheet:
+        try:
+            msg += "\n" + record_drift(delta["commitment_changed"], day, prev_day)
+        except Exception as e:
+            msg += f"\n⚠️ '{DRIFT_SHEET}' not updated: {e}"
+    return delta, msg
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SHARED DRIFT TAB
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _drift_rows(commitment: pd.DataFrame, day: date, since: date) -> pd.DataFrame:
+    """compute_delta's "commitment_changed" frame in DRIFT_HEADERS layout."""
+    if commitment is None or commitment.empty:
+        return pd.DataFrame(columns=DRIFT_HEADERS)
+    out = commitment.reindex(columns=DRIFT_HEADERS).fillna("").astype(str)
+    out["Day"] = day.isoformat()
+    out["Since"] = since.isoformat()
+    # Row key "<SO>|<Position>|<n>" → n, so split-freight repeats stay apart
+    out["Line"] = [str(k).rsplit("|", 1)[-1] for k in commitment.index]
+    return out.reset_index(drop=True)
+
+
+def _read_drift_sheet() -> pd.DataFrame:
+    """The DRIFT_SHEET tab as strings; an empty DRIFT_HEADERS frame when missing."""
+    from services.sheets import get_df
+
+    df = get_df(DRIFT_SHEET)
+    if df is None or df.empty or not set(DRIFT_HEADERS) <= set(df.columns):
+        return pd.DataFrame(columns=DRIFT_HEADERS)
+    return df[DRIFT_HEADERS].fillna("").astype(str).apply(lambda s: s.str.strip())
+
+
+def record_drift(commitment: pd.DataFrame, day: date, since: date) -> str:
+    """
+    Replace `day`'s rows in DRIFT_SHEET with `commitment` (measured against the
+    `since` snapshot) and drop rows older than RETENTION_DAYS.
+
+    Skipped when the tab already holds a day between `since` and `day`: this
+    host's previous snapshot is older than what another host recorded, so its
+    delta would count those changes a second time. Raises on sheet errors.
+    """
+    from services.sheets import get_df, write_df
+
+    get_df.clear()
+    existing = _read_drift_sheet()
+    days = existing["Day"]
+    if ((days > since.isoformat()) & (days < day.isoformat())).any():
+        return (
+            f"⚠️ '{DRIFT_SHEET}' not updated — it already has changes after "
+            f"{since:%d-%b}, this host's last MIS snapshot."
+        )
+
+    rows = _drift_rows(commitment, day, since)
+    cutoff = (day - timedelta(days=RETENTION_DAYS)).isoformat()
+    keep = existing[(days != day.isoformat()) & (days >= cutoff)]
+    if rows.empty and len(keep) == len(existing):
+        return f"✅ No commitment changes to record in '{DRIFT_SHEET}'."
+    write_df(DRIFT_SHEET, pd.concat([keep, rows], ignore_index=True))
+    get_df.clear()
+    return f"✅ {len(rows)} commitment change(s) recorded in '{DRIFT_SHEET}'."
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# HISTORY QUERIES
+# ═════════════════════════════════════════════════════════════════════════════
+
+def load_history(
+    start: date | None = None,
+    end: date | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Long-format history: every snapshot stored on this host between `start`
+    and `end` (inclusive) stacked with a "Snapshot Date" column and a "Row Key"
+    column.
+    `columns` limits what is read from each snapshot (key columns are always read).
+    """
+    want = None
+    if columns:
+        want = list(dict.fromkeys(KEY_COLS + list(columns)))
+    frames = []
+    for d in list_snapshot_dates():
+        if (start and d < start) or (end and d > end):
+            continue
+        snap = load_snapshot(d, want)
+        if snap.empty:
+            continue
+        snap.insert(0, "Row Key", row_keys(snap).values)
+        snap.insert(0, "Snapshot Date", d)
+        frames.append(snap)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def commitment_drift(
+    start: date | None = None,
+    end: date | None = None,
+    so_numbers: set[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Per MIS line: how its Inventory Commitment Date moved across the days in
+    [start, end] recorded in the DRIFT_SHEET tab.
+
+    Columns: Sales Order No. | Sales Order Position | Item Code |
+             First Change | Last Change | First Commitment | Latest Commitment |
+             Drift (days) | Changes
+    Only lines whose commitment date changed at least once are returned,
+    largest drift first. `so_numbers` restricts the result to those SOs.
+    """
+    from services.delivery_readiness import _parse_date_series
+
+    hist = _read_drift_sheet()
+    if start:
+        hist = hist[hist["Day"] >= start.isoformat()]
+    if end:
+        hist = hist[hist["Day"] <= end.isoformat()]
+    if so_numbers:
+        hist = hist[hist["Sales Order No."].isin(so_numbers)]
+    if hist.empty:
+        return pd.DataFrame()
+
+    date_col = COMMITMENT_COLS[0]
+    hist = hist.assign(
+        __old__=_parse_date_series(hist[f"{date_col} (old)"]),
+        __new__=_parse_date_series(hist[f"{date_col} (new)"]),
+        __key__=hist["Sales Order No."] + "|" + hist["Sales Order Position"] + "|" + hist["Line"],
+        __day__=pd.to_datetime(hist["Day"], errors="coerce").dt.date,
+    )
+    # Only a dated → differently-dated move counts (not a qty-only change)
+    moved = hist.dropna(subset=["__old__", "__new__", "__day__"])
+    moved = moved[moved["__old__"] != moved["__new__"]]
+    if moved.empty:
+        return pd.DataFrame()
+
+    g = moved.sort_values(["__key__", "__day__"]).groupby("__key__", sort=False)
+    out = pd.DataFrame({
+        "Sales Order No.":      g["Sales Order No."].last(),
+        "Sales Order Position": g["Sales Order Position"].last(),
+        "Item Code":            g["Item Code"].last(),
+        "First Change":         g["__day__"].min(),
+        "Last Change":          g["__day__"].max(),
+        "First Commitment":     g["__old__"].first().dt.date,
+        "Latest Commitment":    g["__new__"].last().dt.date,
+        "Changes":              g.size().astype(int),
+    })
+    out["Drift (days)"] = (
+        pd.to_datetime(out["Latest Commitment"]) - pd.to_datetime(out["First Commitment"])
+    ).dt.days
+    cols = [
+        "Sales Order No.", "Sales Order Position", "Item Code", "First Change", "Last Change",
+        "First Commitment", "Latest Commitment", "Drift (days)", "Changes",
+    ]
+    return out.sort_values("Drift (days)", ascending=False)[cols].reset_index(drop=True)
@@ -0,0 +1,140 @@
+"""
+services/pdf_text.py
+
+Shared plain-text extraction for the Godrej invoice / delivery-challan PDFs.
+
+Two engines are available:
+
+  * "pymupdf"    — PyMuPDF (fitz). Typically an order of magnitude faster than
+                   pdfplumber for plain text. Words are re-assembled into
+                   visual lines (clustered on their top edge, like pdfplumber
+                   does) so the existing line-oriented regexes keep working.
+  * "pdfplumber" — the original engine, kept as the slow-but-proven fallback.
+
+`extract_pdf_text` runs the engines in order (PyMuPDF first by default) and
+stops at the first whose output the caller's `accept(text)` check is happy
+with — e.g. "every invoice field regex matched". If no engine is accepted, the
+text that scored best is returned so the caller still gets a partial parse.
+
+Usage:
+    from services.pdf_text import extract_pdf_text
+    text, engine = extract_pdf_text(pdf_bytes, accept=_has_all_fields)
+
+The benchmark in tools/benchmark_pdf_extraction.py compares the engines on a
+folder of sample PDFs (time per file + field-hit rate).
+"""
+from __future__ import annotations
+
+import io
+from typing import Callable
+
+# Default engine order — fast first, proven fallback second.
+DEFAULT_ENGINES: tuple[str, ...] = ("pymupdf", "pdfplumber")
+
+# Same tolerances parse_invoice_pdf has always used with pdfplumber.
+_X_TOLERANCE = 3
+_Y_TOLERANCE = 3
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ENGINES
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _pymupdf_page_lines(page, y_tolerance: float = _Y_TOLERANCE) -> list[str]:
+    """
+    Rebuild the visual text lines of one PyMuPDF page from its words.
+
+    PyMuPDF's default text output is ordered by content block, which puts table
+    cells of the same row on separate lines. Clustering words on their top edge
+    (within `y_tolerance` points) and sorting each cluster left-to-right gives
+    the same row-per-line layout pdfplumber produces.
+    """
+    words = page.get_text("words")  # (x0, y0, x1, y1, word, block, line, word_no)
+    if not words:
+        return []
+    words.sort(key=lambda w: (w[1], w[0]))
+
+    lines: list[list] = []
+    current: list = []
+    current_top = None
+    for w in words:
+        if current_top is None or abs(w[1] - current_top) <= y_tolerance:
+            current.append(w)
+            if current_top is None:
+                current_top = w[1]
+        else:
+            lines.append(current)
+            current, current_top = [w], w[1]
+    if current:
+        lines.append(current)
+
+    return [" ".join(w[4] for w in sorted(line, key=lambda w: w[0])) for line in lines]
+
+
+def extract_text_pymupdf(pdf_bytes: bytes) -> str:
+    """Full-document text via PyMuPDF, one visual line per row, pages joined by newlines."""
+    import fitz
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return "\n".join("\n".join(_pymupdf_page_lines(page)) for page in doc)
+
+
+def extract_text_pdfplumber(pdf_bytes: bytes) -> str:
+    """Full-document text via pdfplumber (x/y tolerance 3), pages joined by newlines."""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        return "\n".join(
+            page.extract_text(x_tolerance=_X_TOLERANCE, y_tolerance=_Y_TOLERANCE) or ""
+            for page in pdf.pages
+        )
+
+
+ENGINES: dict[str, Callable[[bytes], str]] = {
+    "pymupdf":    extract_text_pymupdf,
+    "pdfplumber": extract_text_pdfplumber,
+}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# PUBLIC API
+# ═════════════════════════════════════════════════════════════════════════════
+
+def extract_pdf_text(
+    pdf_bytes: bytes,
+    accept: Callable[[str], bool] | None = None,
+    score: Callable[[str], int] | None = None,
+    engines: tuple[str, ...] = DEFAULT_ENGINES,
+) -> tuple[str, str]:
+    """
+    Extract text from `pdf_bytes`, trying each engine in `engines` in order.
+
+    accept : called with each engine's text; the first engine whose text is
+             accepted wins. Without it, the first non-blank text wins.
+    score  : used only when no engine is accepted, to pick the best of the
+             rejected texts (e.g. number of fields found). Defaults to length.
+
+    Returns (text, engine_name). Both are "" when every engine failed or the
+    PDF has no extractable text. An engine that is not installed is skipped.
+    """
+    if score is None:
+        score = len
+
+    best_text, best_engine, best_score = "", "", -1
+    for name in engines:
+        extractor = ENGINES.get(name)
+        if extractor is None:
+            continue
+        try:
+            text = extractor(pdf_bytes) or ""
+        except Exception:
+            continue
+        if not text.strip():
+            continue
+        if accept is None or accept(text):
+            return text, name
+        s = score(text)
+        if s > best_score:
+            best_text, best_engine, best_score = text, name, s
+
+    return best_text, best_engine
@@ -39,6 +39,20 @@ The canonical Excel collapses the two-level visual hierarchy into one
 CATEGORY column:
     CATEGORY = current_sub_heading if current_sub_heading else current_top_heading
 
+INCREMENTAL REFRESH:
+Each Drive file's md5Checksum and parsed rows are kept under the local state
+folder (services/local_state.py). A refresh only downloads and parses PDFs that
+are new or whose checksum changed; the rows of the other PDFs come from that
+cache. In the sheets, each PDF's rows form one contiguous block, and only the
+blocks of changed / new / removed PDFs are rewritten
+(services.sheets.replace_row_blocks). Price_List_Meta is rewritten only when the
+set of effective dates changes. Without the cache (or when a sheet was edited
+by hand) the refresh falls back to a full rewrite.
+
+Page scanning (pdfplumber table extraction + per-line font sizes) runs across
+pages in a process pool; the heading / item state machine that stitches the
+pages together stays sequential.
+
 Required secret:
   PRICE_LIST_FOLDER_ID  -> Google Drive folder ID for the PRICE_LIST directory
     - .streamlit/secrets.toml  ->  [drive] PRICE_LIST_FOLDER_ID = "..."
@@ -49,6 +63,7 @@ import io
 import os
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
 from utils.helpers import to_indian_number_string
@@ -95,6 +110,13 @@ _EFFECTIVE_DATE_RE = re.compile(
 # Sentinel-row patterns observed in reference Excel (e.g. trailing "TAB9" marker)
 _SENTINEL_CATEGORY_RE = re.compile(r"^TAB\d+$", re.IGNORECASE)
 
+# Page-scan process pool size; PDFs shorter than _POOL_MIN_PAGES are scanned inline.
+_PARSE_WORKERS  = max(1, min(4, (os.cpu_count() or 2) - 1))
+_POOL_MIN_PAGES = 6
+
+# Bump when the parser's output for the same PDF changes, so cached parses are redone.
+_PARSER_VERSION = 1
+
 
 # CREDENTIAL + DRIVE HELPERS ------------------------------------------------
 
@@ -156,10 +178,16 @@ def _list_pdfs_in_folder(folder_id: str) -> list:
         "and mimeType='application/pdf' "
         "and trashed=false"
     )
-    results = service.files().list(
-        q=query, fields="files(id, name)", orderBy="name", pageSize=100,
-    ).execute()
-    return results.get("files", [])
+    files, token = [], None
+    while True:
+        results = service.files().list(
+            q=query, fields="nextPageToken, files(id, name, md5Checksum, modifiedTime)",
+            orderBy="name", pageSize=100, pageToken=token,
+        ).execute()
+        files.extend(results.get("files", []))
+        token = results.get("nextPageToken")
+        if not token:
+            return files
 
 
 def _download_pdf_bytes(file_id: str) -> bytes:
@@ -390,6 +418,70 @@ def _looks_like_heading(text: str) -> bool:
 
 # CORE PARSER ---------------------------------------------------------------
 
+def _scan_pages(pdf_bytes: bytes, start: int, end: int) -> list:
+    """
+    Page-local work for pages [start, end): detect the price tables and read
+    every line's font size. Runs in a worker process (pdfplumber pages cannot
+    be pickled, so each worker opens its own copy of the PDF).
+
+    Returns one dict per page: {"tables": [(type, rows)], "header_set", "lines"}.
+    """
+    import pdfplumber
+
+    out = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages[start:end]:
+            tables_on_page = []
+            try:
+                tables_on_page = page.extract_tables() or []
+            except Exception:
+                pass
+
+            table_header_set = set()
+            processed_tables = []
+
+            for raw_table in tables_on_page:
+                if not raw_table or len(raw_table) < 2:
+                    continue
+
+                for ri, row in enumerate(raw_table[:4]):
+                    cells = [str(c or "").strip() for c in row]
+                    ttype = _detect_table_type(cells)
+                    if ttype != _TYPE_UNKNOWN:
+                        table_header_set.add(_normalise(" ".join(cells)))
+                        processed_tables.append((ttype, raw_table[ri:]))
+                        break
+
+            out.append({
+                "tables": processed_tables,
+                "header_set": table_header_set,
+                "lines": _get_line_font_sizes(page),
+            })
+    return out
+
+
+def _scan_all_pages(pdf_bytes: bytes) -> list:
+    """`_scan_pages` over the whole PDF, split into page ranges across a process pool."""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        n_pages = len(pdf.pages)
+    workers = min(_PARSE_WORKERS, n_pages)
+    if workers < 2 or n_pages < _POOL_MIN_PAGES:
+        return _scan_pages(pdf_bytes, 0, n_pages)
+
+    step = -(-n_pages // workers)
+    ranges = [(i, min(i + step, n_pages)) for i in range(0, n_pages, step)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_scan_pages, [pdf_bytes] * len(ranges),
+                             [r[0] for r in ranges], [r[1] for r in ranges])
+            return [page for part in parts for page in part]
+    except Exception as exc:
+        print(f"[PRICE LIST] Process pool unavailable ({exc}) - scanning pages inline.")
+        return _scan_pages(pdf_bytes, 0, n_pages)
+
+
 def _parse_godrej_price_list(pdf_bytes: bytes):
     """
     Two-pass parser for Godrej price list PDFs.
@@ -401,10 +493,12 @@ def _parse_godrej_price_list(pdf_bytes: bytes):
       For furniture rows, CATEGORY = sub if present else top  (hierarchy flatten).
       For mattress tables, every body row is a data row; Model column = ITEM.
 
+    The page-local work for both passes (tables + line font sizes) is done
+    once per page, in parallel (`_scan_all_pages`); the passes then run over
+    those results in page order.
+
     Returns (furniture_df, mattress_df, effective_date_str, sanity_warnings).
     """
-    import pdfplumber
-
     furniture_rows = []
     mattress_rows  = []
     effective_date_str   = ""
@@ -412,11 +506,12 @@ def _parse_godrej_price_list(pdf_bytes: bytes):
     current_sub_heading  = ""
     current_item         = ""
 
+    pages = _scan_all_pages(pdf_bytes)
+
     # Pass 1: font-size calibration
     all_size_text = []
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-            all_size_text.extend(_get_line_font_sizes(page))
+    for page in pages:
+        all_size_text.extend(page["lines"])
 
     thresholds = _classify_font_sizes(all_size_text)
     cat_min    = thresholds["category_min"]
@@ -427,60 +522,39 @@ def _parse_godrej_price_list(pdf_bytes: bytes):
         return current_sub_heading.strip() or current_top_heading.strip()
 
     # Pass 2: page-by-page extraction
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
-
-            tables_on_page = []
-            try:
-                tables_on_page = page.extract_tables() or []
-            except Exception:
-                pass
-
-            table_header_set = set()
-            processed_tables = []
-
-            for raw_table in tables_on_page:
-                if not raw_table or len(raw_table) < 2:
-                    continue
-
-                for ri, row in enumerate(raw_table[:4]):
-                    cells = [str(c or "").strip() for c in row]
-                    ttype = _detect_table_type(cells)
-                    if ttype != _TYPE_UNKNOWN:
-                        table_header_set.add(_normalise(" ".join(cells)))
-                        processed_tables.append((ttype, raw_table[ri:]))
-                        break
-
-            for ttype, t_rows in processed_tables:
-                cat_for_row = _effective_category()
-                if ttype == _TYPE_FURNITURE:
-                    new_rows, current_item = _process_furniture_table(
-                        t_rows, cat_for_row, current_item
-                    )
-                    furniture_rows.extend(new_rows)
-                elif ttype == _TYPE_MATTRESS:
-                    new_rows = _process_mattress_table(t_rows, cat_for_row)
-                    mattress_rows.extend(new_rows)
-
-            for font_size, line_text in _get_line_font_sizes(page):
-                clean = line_text.strip()
-                if not clean:
-                    continue
-                if _normalise(clean) in table_header_set:
-                    continue
-                if _EFFECTIVE_DATE_RE.search(clean):
-                    if not effective_date_str:
-                        effective_date_str = clean
-                    continue
-                if font_size >= cat_min and _looks_like_heading(clean):
-                    current_top_heading = clean
-                    current_sub_heading = ""
-                    current_item        = ""
-                    continue
-                if font_size >= subcat_min and _looks_like_heading(clean):
-                    current_sub_heading = clean
-                    current_item        = ""
-                    continue
+    for page in pages:
+        table_header_set = page["header_set"]
+
+        for ttype, t_rows in page["tables"]:
+            cat_for_row = _effective_category()
+            if ttype == _TYPE_FURNITURE:
+                new_rows, current_item = _process_furniture_table(
+                    t_rows, cat_for_row, current_item
+                )
+                furniture_rows.extend(new_rows)
+            elif ttype == _TYPE_MATTRESS:
+                new_rows = _process_mattress_table(t_rows, cat_for_row)
+                mattress_rows.extend(new_rows)
+
+        for font_size, line_text in page["lines"]:
+            clean = line_text.strip()
+            if not clean:
+                continue
+            if _normalise(clean) in table_header_set:
+                continue
+            if _EFFECTIVE_DATE_RE.search(clean):
+                if not effective_date_str:
+                    effective_date_str = clean
+                continue
+            if font_size >= cat_min and _looks_like_heading(clean):
+                current_top_heading = clean
+                current_sub_heading = ""
+                current_item        = ""
+                continue
+            if font_size >= subcat_min and _looks_like_heading(clean):
+                current_sub_heading = clean
+                current_item        = ""
+                continue
 
     furniture_df = pd.DataFrame(furniture_rows, columns=FURNITURE_COLUMNS) if furniture_rows \
                    else pd.DataFrame(columns=FURNITURE_COLUMNS)
@@ -524,12 +598,92 @@ def _filename_to_category(filename: str) -> str:
     return name.strip()
 
 
+# INCREMENTAL STATE ---------------------------------------------------------
+# .crm_state/price_list/<folder id>.json:
+#   files   - Drive file id -> {md5, name, parser, furniture, mattress,
+#             effective_date, warnings}   (parsed rows as lists of cells)
+#   layout  - {"furniture": [[file id, n rows], ...], "mattress": [...]}
+#             = the per-PDF row blocks as last written to each sheet
+#   meta    - effective dates as last written to Price_List_Meta
+
+def _state_file(folder_id: str) -> str:
+    from services.local_state import state_path
+    return state_path("price_list", f"{folder_id}.json")
+
+
+def _load_state(folder_id: str) -> dict:
+    from services.local_state import read_json
+    state = read_json(_state_file(folder_id), default={}) or {}
+    state.setdefault("files", {})
+    state.setdefault("layout", {})
+    state.setdefault("meta", None)
+    return state
+
+
+def _save_state(folder_id: str, state: dict) -> None:
+    from services.local_state import write_json
+    try:
+        write_json(_state_file(folder_id), state)
+    except Exception as exc:
+        print(f"[PRICE LIST] Warning - parse cache not saved: {exc}")
+
+
+def _parse_file(file_info: dict) -> dict:
+    """Download + parse one PDF into a cache entry (raises on download/parse errors)."""
+    f_df, m_df, eff_date, warnings = _parse_godrej_price_list(_download_pdf_bytes(file_info["id"]))
+
+    # Fall back to filename as CATEGORY where parser couldn't detect any heading
+    file_cat = _filename_to_category(file_info["name"])
+    for df in (f_df, m_df):
+        if not df.empty:
+            df["CATEGORY"] = df["CATEGORY"].replace("", pd.NA).fillna(file_cat)
+
+    from services.sheets import _serialize_for_sheets
+    return {
+        "md5":            file_info.get("md5Checksum", ""),
+        "name":           file_info["name"],
+        "parser":         _PARSER_VERSION,
+        "furniture":      _serialize_for_sheets(f_df[FURNITURE_COLUMNS])[1:] if not f_df.empty else [],
+        "mattress":       _serialize_for_sheets(m_df[MATTRESS_COLUMNS])[1:] if not m_df.empty else [],
+        "effective_date": eff_date,
+        "warnings":       warnings,
+    }
+
+
+def _write_sheet_blocks(sheet_name, columns, old_layout, blocks, changed):
+    """
+    Rewrite only the changed PDFs' row blocks of one price sheet; full rewrite
+    when the sheet no longer matches the cached layout. Returns a log note.
+    """
+    from services.sheets import get_sheet, replace_row_blocks, write_df
+
+    if old_layout is not None:
+        try:
+            ws = get_sheet(sheet_name)
+            res = replace_row_blocks(ws, columns, old_layout, blocks, changed)
+        except Exception as exc:
+            print(f"[PRICE LIST] Block update of {sheet_name} failed ({exc}) - full rewrite.")
+            res = None
+        if res is not None:
+            return (f"{sheet_name}: {res['updated']} row(s) rewritten, "
+                    f"{res['inserted']} inserted, {res['deleted']} deleted")
+
+    rows = [r for _, block in blocks for r in block]
+    write_df(sheet_name, pd.DataFrame(rows, columns=columns))
+    return f"{sheet_name}: full rewrite ({len(rows)} rows)"
+
+
 # PUBLIC API ----------------------------------------------------------------
 
-def fetch_price_list_from_drive():
+def fetch_price_list_from_drive(full_refresh: bool = False):
     """
-    Scan the PRICE_LIST Drive folder, parse every PDF (furniture + mattress),
-    merge by type into two DataFrames, and write each to its own Google Sheet.
+    Scan the PRICE_LIST Drive folder, parse every new or changed PDF
+    (furniture + mattress), merge by type into two DataFrames, and bring each
+    Google Sheet up to date by replacing only the changed PDFs' rows.
+
+    Unchanged PDFs (same md5Checksum as the cached parse) are neither
+    downloaded nor parsed. ``full_refresh=True`` ignores the cache, reparses
+    everything and rewrites every sheet.
 
     Returns (furniture_df, mattress_df, status_message).
     """
@@ -552,92 +706,128 @@ def fetch_price_list_from_drive():
             "Check the folder ID and service-account Viewer access."
         )
 
-    furniture_dfs   = []
-    mattress_dfs    = []
-    effective_dates = []
-    parse_log       = []
+    state = {"files": {}, "layout": {}, "meta": None} if full_refresh else _load_state(folder_id)
+    cached_files = state["files"]
+    files_now = {}      # file id -> cache entry used this run
+    changed   = set()   # file ids whose rows differ from what the sheets hold
+    parse_log = []
+    n_parsed  = 0
 
     for file_info in pdf_files:
         file_id   = file_info["id"]
         file_name = file_info["name"]
+        cached    = cached_files.get(file_id)
+        md5       = file_info.get("md5Checksum", "")
 
-        try:
-            pdf_bytes = _download_pdf_bytes(file_id)
-        except Exception as exc:
-            parse_log.append(f"  ⚠️ {file_name} - download failed: {exc}")
-            continue
-
-        try:
-            f_df, m_df, eff_date, warnings = _parse_godrej_price_list(pdf_bytes)
-        except Exception as exc:
-            parse_log.append(f"  ⚠️ {file_name} - parse failed: {exc}")
-            continue
+        if cached and md5 and cached.get("md5") == md5 and cached.get("parser") == _PARSER_VERSION:
+            entry = cached
+        else:
+            try:
+                entry = _parse_file(file_info)
+                n_parsed += 1
+            except Exception as exc:
+                if cached:
+                    # Keep serving the last good parse rather than dropping the PDF's rows.
+                    parse_log.append(f"  ⚠️ {file_name} - refresh failed ({exc}); keeping previous parse.")
+                    files_now[file_id] = cached
+                else:
+                    parse_log.append(f"  ⚠️ {file_name} - download/parse failed: {exc}")
+                continue
+            changed.add(file_id)
 
-        if f_df.empty and m_df.empty:
+        files_now[file_id] = entry
+        f_n, m_n = len(entry["furniture"]), len(entry["mattress"])
+        if not f_n and not m_n:
             parse_log.append(f"  ⚠️ {file_name} - no data extracted.")
             continue
 
-        # Fall back to filename as CATEGORY where parser couldn't detect any heading
-        file_cat = _filename_to_category(file_name)
-        for df in (f_df, m_df):
-            if not df.empty:
-                df["CATEGORY"] = df["CATEGORY"].replace("", pd.NA).fillna(file_cat)
-
-        if eff_date and eff_date not in effective_dates:
-            effective_dates.append(eff_date)
-
-        if not f_df.empty:
-            furniture_dfs.append(f_df)
-        if not m_df.empty:
-            mattress_dfs.append(m_df)
-
         parts = []
-        if not f_df.empty:
-            parts.append(f"{to_indian_number_string(len(f_df), 0)} furniture")
-        if not m_df.empty:
-            parts.append(f"{to_indian_number_string(len(m_df), 0)} mattress")
+        if f_n:
+            parts.append(f"{to_indian_number_string(f_n, 0)} furniture")
+        if m_n:
+            parts.append(f"{to_indian_number_string(m_n, 0)} mattress")
+        eff_date  = entry.get("effective_date", "")
         eff_note  = f" · \U0001f4c5 {eff_date}" if eff_date else ""
+        warnings  = entry.get("warnings") or []
         warn_note = ("  ⚠️ " + "; ".join(warnings)) if warnings else ""
+        icon      = "✅" if file_id in changed else "♻️"
         parse_log.append(
-            f"  ✅ {file_name} - {' + '.join(parts) or 'no rows'} rows{eff_note}{warn_note}"
+            f"  {icon} {file_name} - {' + '.join(parts) or 'no rows'} rows{eff_note}{warn_note}"
         )
 
-    if not furniture_dfs and not mattress_dfs:
+    # PDFs removed from the folder count as changed (their rows must go)
+    changed |= set(cached_files) - set(files_now)
+
+    ordered = [(fid, files_now[fid]) for fid in (f["id"] for f in pdf_files) if fid in files_now]
+    f_blocks = [(fid, e["furniture"]) for fid, e in ordered if e["furniture"]]
+    m_blocks = [(fid, e["mattress"])  for fid, e in ordered if e["mattress"]]
+
+    if not f_blocks and not m_blocks:
         return empty_f, empty_m, "❌ All PDFs failed to parse.\n" + "\n".join(parse_log)
 
-    furniture_merged = pd.concat(furniture_dfs, ignore_index=True) if furniture_dfs else empty_f
-    mattress_merged  = pd.concat(mattress_dfs,  ignore_index=True) if mattress_dfs  else empty_m
+    furniture_merged = pd.DataFrame([r for _, b in f_blocks for r in b], columns=FURNITURE_COLUMNS)
+    mattress_merged  = pd.DataFrame([r for _, b in m_blocks for r in b], columns=MATTRESS_COLUMNS)
+
+    effective_dates = []
+    for _, e in ordered:
+        d = e.get("effective_date", "")
+        if d and d not in effective_dates:
+            effective_dates.append(d)
 
     write_errors = []
-    try:
-        from services.sheets import write_df
-        if not furniture_merged.empty:
-            write_df(PRICE_LIST_SHEET, furniture_merged[FURNITURE_COLUMNS])
-        if not mattress_merged.empty:
-            write_df(PRICE_LIST_MATTRESS_SHEET, mattress_merged[MATTRESS_COLUMNS])
-    except Exception as exc:
-        write_errors.append(f"sheet write failed: {exc}")
+    write_notes  = []
+    new_layout   = dict(state["layout"])
+    for key, sheet_name, columns, blocks in (
+        ("furniture", PRICE_LIST_SHEET,          FURNITURE_COLUMNS, f_blocks),
+        ("mattress",  PRICE_LIST_MATTRESS_SHEET, MATTRESS_COLUMNS,  m_blocks),
+    ):
+        old_layout = state["layout"].get(key)
+        old_ids    = {fid for fid, _ in (old_layout or [])}
+        touched    = any(fid in changed for fid, _ in blocks) or bool(old_ids & changed)
+        if not blocks or (old_layout is not None and not touched):
+            continue
+        try:
+            write_notes.append(_write_sheet_blocks(sheet_name, columns, old_layout, blocks, changed))
+            new_layout[key] = [[fid, len(b)] for fid, b in blocks]
+        except Exception as exc:
+            write_errors.append(f"sheet write failed: {exc}")
+            new_layout.pop(key, None)   # sheet state unknown - full rewrite next time
 
     # Persist effective-date notices so the page can show them from cache
-    if effective_dates:
+    meta_written = state.get("meta")
+    if effective_dates and effective_dates != meta_written:
         try:
             from services.sheets import write_df
             write_df(PRICE_LIST_META_SHEET, pd.DataFrame({"EFFECTIVE_DATE": effective_dates}))
+            meta_written = effective_dates
+        except Exception:
+            pass
+
+    _save_state(folder_id, {"files": files_now, "layout": new_layout, "meta": meta_written})
+
+    if write_notes:
+        try:
+            from services.sheets import get_df
+            get_df.clear()
         except Exception:
             pass
 
+    n_reused = len(files_now) - n_parsed
     status_head = (
         f"✅ Price list refreshed - "
         f"{to_indian_number_string(len(furniture_merged), 0)} furniture + {to_indian_number_string(len(mattress_merged), 0)} mattress rows "
-        f"from {len(pdf_files)} PDF(s)."
+        f"from {len(pdf_files)} PDF(s) ({n_parsed} parsed, {n_reused} unchanged)."
     )
+    if not write_notes and not write_errors:
+        status_head += " Sheets already up to date."
     if write_errors:
         status_head = (
             f"⚠️ Parsed {to_indian_number_string(len(furniture_merged) + len(mattress_merged), 0)} rows "
             f"but {'; '.join(write_errors)}."
         )
 
-    return furniture_merged, mattress_merged, status_head + "\n" + "\n".join(parse_log)
+    log = parse_log + [f"  💾 {n}" for n in write_notes]
+    return furniture_merged, mattress_merged, status_head + "\n" + "\n".join(log)
 
 
 def load_price_list_meta():
@@ -670,6 +860,9 @@ def load_price_list_from_sheet():
             if col not in df.columns:
                 df[col] = ""
         df = df[FURNITURE_COLUMNS]
+        # Build (or reuse) the search index now, with the load, not per keystroke
+        from services.search_index import PRICE_LIST_FIELDS, index_for
+        index_for(df, PRICE_LIST_FIELDS, PRICE_LIST_SHEET)
         cats  = df["CATEGORY"].nunique() if "CATEGORY" in df.columns else "-"
         items = df["ITEM"].nunique()     if "ITEM"     in df.columns else "-"
         return df, (
@@ -695,6 +888,8 @@ def load_mattress_list_from_sheet():
             if col not in df.columns:
                 df[col] = ""
         df = df[MATTRESS_COLUMNS]
+        from services.search_index import PRICE_LIST_FIELDS, index_for
+        index_for(df, PRICE_LIST_FIELDS, PRICE_LIST_MATTRESS_SHEET)
         cats  = df["CATEGORY"].nunique() if "CATEGORY" in df.columns else "-"
         items = df["ITEM"].nunique()     if "ITEM"     in df.columns else "-"
         return df, (
@@ -0,0 +1,162 @@
+"""
+services/run_ledger.py
+
+Run ledger for the email-import jobs that are deliberately triggered twice
+(11:00 + 11:15 MIS / discontinued circular, 20:00 + 20:15 invoices, plus the
+GitHub Actions drift-backup crons).
+
+Every successfully imported source is recorded as (job, source key):
+
+    uid:<account>/<UIDVALIDITY>/<UID>   — one IMAP message
+    sha256:<hex>                        — one attachment's bytes
+
+A repeat run does the IMAP UID SEARCH, builds the keys of the matching
+messages and, when all of them are already in the ledger, stops there —
+no RFC822 download, no Excel/PDF parse, no sheet write. The attachment hash
+additionally catches the same file re-sent in a new message.
+
+Storage:
+  * JOB_RUN_LEDGER tab in the OPS spreadsheet — shared by every runner
+    (GitHub Actions, scheduler.py, Streamlit Cloud), same idea as EMAIL_LOG.
+  * run_ledger.json under the local state folder — a fast path so a
+    long-running scheduler.py does not re-read the tab on every trigger.
+
+The ledger is advisory: any error reading it means "not seen", so a broken
+ledger costs a redundant import, never a missed one.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from services.local_state import read_json, state_path, write_json
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+LEDGER_SHEET = "JOB_RUN_LEDGER"
+LEDGER_HEADERS = ["TIMESTAMP (IST)", "JOB NAME", "SOURCE KEY", "RECORDS COUNT", "NOTE"]
+_LOCAL_FILE = "run_ledger.json"
+_LOCAL_KEEP_DAYS = 60
+
+# Phrase put in the status text of a skipped run (callers/tests can match on it)
+ALREADY_IMPORTED = "already imported"
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SOURCE KEYS
+# ═════════════════════════════════════════════════════════════════════════════
+
+def message_key(account: str, uidvalidity: str, uid) -> str:
+    """Ledger key for one IMAP message (UIDs are only unique per UIDVALIDITY)."""
+    if isinstance(uid, bytes):
+        uid = uid.decode()
+    return f"uid:{account.strip().lower()}/{uidvalidity}/{uid}"
+
+
+def content_key(data: bytes) -> str:
+    """Ledger key for an attachment's content."""
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def imap_uid_search(mail, query: str) -> tuple[str, list[bytes]]:
+    """
+    UID SEARCH on the selected mailbox. Returns (uidvalidity, [uid, …]) in
+    ascending order; the UIDs are for `mail.uid("FETCH", …)`.
+    Raises on IMAP errors, like `mail.search`.
+    """
+    uidvalidity = ""
+    try:
+        _, resp = mail.response("UIDVALIDITY")
+        if resp and resp[0]:
+            uidvalidity = resp[0].decode() if isinstance(resp[0], bytes) else str(resp[0])
+    except Exception:
+        pass
+    _, data = mail.uid("SEARCH", None, query)
+    uids = data[0].split() if data and data[0] else []
+    return uidvalidity, uids
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# LOOKUP / RECORD
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _load_local() -> dict:
+    return read_json(state_path(_LOCAL_FILE), default={}) or {}
+
+
+def _save_local(ledger: dict) -> None:
+    cutoff = (datetime.now(IST) - timedelta(days=_LOCAL_KEEP_DAYS)).strftime("%Y-%m-%d")
+    pruned = {
+        job: {k: ts for k, ts in keys.items() if ts[:10] >= cutoff}
+        for job, keys in ledger.items()
+    }
+    write_json(state_path(_LOCAL_FILE), pruned)
+
+
+def _sheet_keys(job: str) -> set[str]:
+    from services.sheets import _get_sh
+
+    ws = _get_sh(LEDGER_SHEET).worksheet(LEDGER_SHEET)
+    rows = ws.get_all_values()
+    return {
+        (r[2] or "").strip()
+        for r in rows[1:]
+        if len(r) >= 3 and (r[1] or "").strip() == job
+    }
+
+
+def seen_keys(job: str, keys: list[str]) -> set[str]:
+    """Subset of `keys` already recorded for `job`. Empty set on any error."""
+    keys = [k for k in keys if k]
+    if not keys:
+        return set()
+    local = _load_local().get(job, {})
+    seen = {k for k in keys if k in local}
+    if len(seen) == len(keys):
+        return seen
+    try:
+        seen |= _sheet_keys(job) & set(keys)
+    except Exception as exc:
+        print(f"[RUN_LEDGER] lookup failed for {job} (will not skip): {exc}")
+    return seen
+
+
+def all_seen(job: str, keys: list[str]) -> bool:
+    """True when `keys` is non-empty and every key is already recorded for `job`."""
+    keys = [k for k in keys if k]
+    return bool(keys) and len(seen_keys(job, keys)) == len(set(keys))
+
+
+def record_keys(job: str, keys: list[str], records_count: int = 0, note: str = "") -> None:
+    """
+    Record `keys` as imported for `job` — locally and in JOB_RUN_LEDGER (one
+    append_rows). Call only after the import's sheet write succeeded.
+    Never raises.
+    """
+    keys = list(dict.fromkeys(k for k in keys if k))
+    if not keys:
+        return
+    now_ist = datetime.now(IST).strftime("%Y-%m-%d %H:%M IST")
+
+    try:
+        ledger = _load_local()
+        ledger.setdefault(job, {}).update({k: now_ist for k in keys})
+        _save_local(ledger)
+    except Exception as exc:
+        print(f"[RUN_LEDGER] Warning — local ledger not updated: {exc}")
+
+    try:
+        from services.sheets import _get_sh
+
+        sh = _get_sh(LEDGER_SHEET)
+        try:
+            ws = sh.worksheet(LEDGER_SHEET)
+        except Exception:
+            ws = sh.add_worksheet(title=LEDGER_SHEET, rows=2000, cols=len(LEDGER_HEADERS))
+            ws.append_row(LEDGER_HEADERS)
+        ws.append_rows(
+            [[now_ist, job, k, records_count, note] for k in keys],
+            value_input_option="RAW",
+        )
+    except Exception as exc:
+        print(f"[RUN_LEDGER] Warning — could not write ledger rows: {exc}")
@@ -0,0 +1,253 @@
+"""
+services/search_index.py
+
+In-memory inverted index for the price-list and product-catalogue searches.
+
+The pages used to filter their DataFrames with a substring scan of every
+column on every keystroke, and the catalogue resolved the "discontinued" flag
+by comparing each product against every discontinued entry. Instead, the
+loaders build an index once, when the data is loaded (and cached with it):
+
+    idx = build_index(df, {"ITEM CODE": 5, "ITEM": 3, "ITEM DESCRIPTION": 2})
+    labels = search(idx, "esx ward")     # ranked df index labels
+
+`index_for` memoises one index per source (e.g. sheet name) on a cheap
+content fingerprint of the frame, so the loader that reads a sheet builds the
+index and every later page rerun on the same data gets it for free.
+
+Tokens are lower-cased alphanumeric runs; a mixed run such as "ESX12345" is
+indexed whole and as its letter / digit parts ("esx12345", "esx", "12345"),
+so part of an item code finds the row. Every query token must match (AND);
+a token matches an indexed token exactly or as its prefix ("wardr" →
+"wardrobe"). Score = Σ field weight per query token, prefix hits counting
+half; ties keep the DataFrame order.
+
+`search_many` ranks hits from several indexes together (price list +
+catalogue), and `build_name_index` / `match_name` replace the linear
+discontinued-products scan.
+"""
+from __future__ import annotations
+
+import bisect
+import re
+
+import pandas as pd
+
+_memo: dict[str, tuple] = {}   # source -> (fingerprint, index)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PART_RE = re.compile(r"[a-z]+|\d+")
+_PREFIX_WEIGHT = 0.5
+
+# Field weights for the two catalogues (columns missing from a frame are skipped)
+PRICE_LIST_FIELDS = {
+    "ITEM CODE": 5.0,
+    "ITEM": 3.0,
+    "ITEM DESCRIPTION": 2.0,
+    "HSN CODE": 2.0,
+    "CATEGORY": 1.5,
+    "PRICE": 0.5,
+    "CPL": 0.5,
+    "THICKNESS (IN)": 0.5,
+    "THICKNESS (CM)": 0.5,
+}
+CATALOG_FIELDS = {
+    "Product Name": 5.0,
+    "Sub Category": 2.0,
+    "Main Category": 1.5,
+    "Colour & Material": 0.5,
+}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# TOKENS
+# ═════════════════════════════════════════════════════════════════════════════
+
+def normalise(text) -> str:
+    """Lower-case, whitespace-collapsed text (the key form used for names)."""
+    return " ".join(str(text or "").strip().lower().split())
+
+
+def tokens(text) -> list[str]:
+    """Index tokens of `text` (see module docstring), de-duplicated, in order."""
+    out: list[str] = []
+    for tok in _TOKEN_RE.findall(str(text or "").lower()):
+        out.append(tok)
+        parts = _PART_RE.findall(tok)
+        if len(parts) > 1:
+            out.extend(parts)
+    return list(dict.fromkeys(out))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# BUILD / SEARCH
+# ═════════════════════════════════════════════════════════════════════════════
+
+def build_index(df: pd.DataFrame, fields: dict[str, float], source: str = "") -> dict:
+    """
+    Inverted index over `fields` (column -> weight) of `df`, keyed by df index
+    label. `source` tags the index for `search_many`.
+    """
+    postings: dict[str, dict] = {}
+    cols = [c for c in fields if c in df.columns]
+    if not df.empty and cols:
+        values = df[cols].fillna("").astype(str)
+        for col in cols:
+            w = float(fields[col])
+            for label, text in zip(values.index, values[col]):
+                for tok in tokens(text):
+                    row = postings.setdefault(tok, {})
+                    if row.get(label, 0.0) < w:
+                        row[label] = w
+    return {
+        "source": source,
+        "postings": postings,
+        "vocab": sorted(postings),
+        "order": {label: i for i, label in enumerate(df.index)},
+    }
+
+
+def _fingerprint(df: pd.DataFrame, cols: list[str]):
+    if df.empty or not cols:
+        return (len(df), tuple(cols))
+    h = pd.util.hash_pandas_object(df[cols].fillna("").astype(str), index=True)
+    return (len(df), tuple(cols), int(h.sum()))
+
+
+def index_for(df: pd.DataFrame, fields: dict[str, float], source: str) -> dict:
+    """`build_index` memoised per `source` until the frame's content changes."""
+    cols = [c for c in fields if c in df.columns]
+    fp = _fingerprint(df, cols)
+    hit = _memo.get(source)
+    if hit and hit[0] == fp:
+        return hit[1]
+    index = build_index(df, fields, source)
+    _memo[source] = (fp, index)
+    return index
+
+
+def _token_hits(index: dict, qt: str) -> dict:
+    """label -> best weight for one query token (exact or prefix match)."""
+    hits = dict(index["postings"].get(qt, {}))
+    vocab = index["vocab"]
+    i = bisect.bisect_left(vocab, qt)
+    while i < len(vocab) and vocab[i].startswith(qt):
+        tok = vocab[i]
+        i += 1
+        if tok == qt:
+            continue
+        for label, w in index["postings"][tok].items():
+            w *= _PREFIX_WEIGHT
+            if hits.get(label, 0.0) < w:
+                hits[label] = w
+    return hits
+
+
+def score(index: dict, query: str) -> dict:
+    """label -> score for rows matching every token of `query` ({} if none / empty query)."""
+    q_tokens = _TOKEN_RE.findall(str(query or "").lower())
+    if not q_tokens:
+        return {}
+    scores: dict | None = None
+    for qt in dict.fromkeys(q_tokens):
+        hits = _token_hits(index, qt)
+        if scores is None:
+            scores = hits
+        else:
+            scores = {label: s + hits[label] for label, s in scores.items() if label in hits}
+        if not scores:
+            return {}
+    return scores or {}
+
+
+def search(index: dict, query: str, limit: int | None = None) -> list:
+    """df index labels matching `query`, best first (ties in DataFrame order)."""
+    scores = score(index, query)
+    order = index["order"]
+    ranked = sorted(scores, key=lambda label: (-scores[label], order.get(label, 0)))
+    return ranked[:limit] if limit else ranked
+
+
+def search_many(indexes: list[dict], query: str, limit: int | None = None) -> list[tuple]:
+    """
+    Rank hits across several indexes together.
+    Returns [(source, label, score), …], best first.
+    """
+    hits = []
+    for n, index in enumerate(indexes):
+        order = index["order"]
+        for label, s in score(index, query).items():
+            hits.append((-s, n, order.get(label, 0), index["source"], label))
+    hits.sort()
+    out = [(src, label, -neg) for neg, _, _, src, label in hits]
+    return out[:limit] if limit else out
+
+
+def filter_df(df: pd.DataFrame, index: dict | None, query: str, fields: dict[str, float]) -> pd.DataFrame:
+    """
+    Rows of `df` matching `query`, ranked. `df` may be a filtered view of the
+    frame `index` was built on; without an index one is built on the spot.
+    """
+    if not str(query or "").strip():
+        return df
+    if index is None:
+        index = build_index(df, fields)
+    labels = [label for label in search(index, query) if label in df.index]
+    return df.loc[labels]
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# NAME MATCHING (discontinued products)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def build_name_index(entries: list[tuple[str, str]]) -> dict:
+    """
+    Index (name, value) pairs — e.g. (discontinued item description, date) —
+    for `match_name`. Names are normalised; the first value per name wins.
+    """
+    exact: dict[str, str] = {}
+    names: list[tuple[str, str]] = []
+    postings: dict[str, set] = {}
+    for name, value in entries:
+        key = normalise(name)
+        if not key:
+            continue
+        exact.setdefault(key, value)
+        pos = len(names)
+        names.append((key, value))
+        for tok in _TOKEN_RE.findall(key):
+            postings.setdefault(tok, set()).add(pos)
+    return {"exact": exact, "names": names, "postings": postings, "vocab": sorted(postings)}
+
+
+def match_name(name_index: dict, name: str, min_len: int = 4):
+    """
+    Value for `name`: exact (normalised) match first, else the first entry
+    where one name contains the other (only for names of at least `min_len`
+    characters). Candidates come from the token index — entries sharing a
+    token, or a token prefix, with `name` — and are then checked exactly.
+    """
+    key = normalise(name)
+    if not key:
+        return None
+    if key in name_index["exact"]:
+        return name_index["exact"][key]
+    if len(key) < min_len:
+        return None
+
+    vocab, postings = name_index["vocab"], name_index["postings"]
+    candidates: set = set()
+    for qt in set(_TOKEN_RE.findall(key)):
+        candidates |= postings.get(qt, set())
+        i = bisect.bisect_left(vocab, qt)
+        while i < len(vocab) and vocab[i].startswith(qt):
+            candidates |= postings[vocab[i]]
+            i += 1
+        # Entry tokens that are a prefix of this token ("nebu" ⊂ "nebula")
+        for j in range(1, len(qt)):
+            candidates |= postings.get(qt[:j], set())
+    for pos in sorted(candidates):
+        entry, value = name_index["names"][pos]
+        if key in entry or entry in key:
+            return value
+    return None
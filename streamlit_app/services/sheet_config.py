@@ -39,6 +39,7 @@ _OPS_SHEETS: frozenset[str] = frozenset({
     "History Log",
     "FOLLOWUP_LOG",
     "EMAIL_LOG",
+    "JOB_RUN_LEDGER",
     "4sContacts",
     "MIS_Daily",
     "34S PHYSICAL DELIVERY CHALLAN",
@@ -76,6 +77,12 @@ _OPS_SHEETS: frozenset[str] = frozenset({
     "SALES SUPPORT SYSTEM",
     # Franchise Pending Orders page snapshot (CRM pending orders + MIS presence)
     "Franchise pending orders",
+    # Sales Reports page metrics snapshot (services/metrics_snapshot.py)
+    "MONTHLY METRICS SNAPSHOT",
+    # Append-only forecast / pending / invoice history (services/forecast_history.py)
+    "FORECAST HISTORY",
+    # Day-over-day MIS commitment changes (services/mis_snapshots.py)
+    "MIS COMMITMENT DRIFT",
 })
 
 # Sheet name prefixes that always belong to the OPS spreadsheet
@@ -493,6 +493,168 @@ def write_rows(sheet_name, rows):
     if clean_rows:
         worksheet.update("A1", clean_rows)
 
+
+def sync_rows_in_scope(worksheet, rows: list[list], key_cols: list[int], in_scope,
+                       value_input_option: str = "RAW") -> dict[str, int]:
+    """
+    Upsert `rows` into `worksheet` without touching anything outside a scope.
+
+    Existing data rows for which `in_scope(row)` is true are matched against
+    `rows` on the cell positions in `key_cols`:
+      * same key, different cells → rewritten in place   (one batch_update)
+      * key no longer in `rows`   → row deleted            (one deleteDimension batch)
+      * key not in the sheet yet  → appended               (one append_rows)
+    Rows outside the scope and identical rows are left alone. `rows` must be
+    aligned to the sheet's header (row 1), which must already exist.
+
+    Returns {"updated": n, "deleted": n, "added": n}.
+    """
+    from gspread.utils import rowcol_to_a1
+
+    values = worksheet.get_all_values()
+    width = max([len(values[0]) if values else 0] + [len(r) for r in rows])
+    rows = [[str(c) for c in (list(r) + [""] * width)[:width]] for r in rows]
+
+    def _key(r):
+        return tuple(str(r[i]).strip() if i < len(r) else "" for i in key_cols)
+
+    wanted = {}
+    for r in rows:
+        wanted[_key(r)] = r  # last one wins on duplicate keys
+
+    existing: dict[tuple, int] = {}   # key → 1-based sheet row
+    extra_rows: list[int] = []        # duplicate in-scope rows → delete
+    for i, r in enumerate(values[1:], start=2):
+        padded = (list(r) + [""] * width)[:width]
+        if not in_scope(padded):
+            continue
+        k = _key(padded)
+        if k in existing:
+            extra_rows.append(i)
+        else:
+            existing[k] = i
+
+    last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+    updates, to_delete = [], list(extra_rows)
+    for k, sheet_row in existing.items():
+        if k not in wanted:
+            to_delete.append(sheet_row)
+            continue
+        current = (list(values[sheet_row - 1]) + [""] * width)[:width]
+        if current != wanted[k]:
+            updates.append({"range": f"A{sheet_row}:{last_col}{sheet_row}", "values": [wanted[k]]})
+    to_add = [r for k, r in wanted.items() if k not in existing]
+
+    if updates:
+        worksheet.batch_update(updates, value_input_option=value_input_option)
+    if to_delete:
+        # Bottom-up so earlier indices stay valid within the batch
+        worksheet.spreadsheet.batch_update({"requests": [
+            {"deleteDimension": {"range": {
+                "sheetId": worksheet.id, "dimension": "ROWS",
+                "startIndex": r - 1, "endIndex": r,
+            }}}
+            for r in sorted(to_delete, reverse=True)
+        ]})
+    if to_add:
+        worksheet.append_rows(to_add, value_input_option=value_input_option)
+
+    return {"updated": len(updates), "deleted": len(to_delete), "added": len(to_add)}
+
+
+def replace_row_blocks(worksheet, header: list, old_blocks: list, new_blocks: list,
+                       changed: set, value_input_option: str = "RAW"):
+    """
+    Replace only some contiguous blocks of data rows in `worksheet`.
+
+    The data rows (below `header`) are the concatenation of blocks, one per
+    source (e.g. one per PDF):
+      * `old_blocks` — [(block_id, n_rows), …] as last written, in sheet order
+      * `new_blocks` — [(block_id, rows), …] as they should be now
+      * `changed`    — ids whose rows must be rewritten; other blocks present
+                       in both lists are assumed identical and left untouched.
+    Blocks missing from `new_blocks` are deleted, new ones inserted in place,
+    changed ones resized (insert/deleteDimension, one batch) and rewritten
+    (one values batch_update). The result is what a full rewrite would give.
+
+    Returns {"updated", "inserted", "deleted"} row counts, or None — without
+    touching the sheet — when the sheet does not match `old_blocks` (other
+    header, other row count, reordered blocks); the caller should then fall
+    back to a full rewrite.
+    """
+    from gspread.utils import rowcol_to_a1
+
+    values = worksheet.get_all_values()
+    header = [str(h) for h in header]
+    if not values or [c.strip() for c in values[0][: len(header)]] != header:
+        return None
+    while len(values) > 1 and not any(str(c).strip() for c in values[-1]):
+        values.pop()
+    if len(values) - 1 != sum(n for _, n in old_blocks):
+        return None
+
+    old_ids = [k for k, _ in old_blocks]
+    new_ids = [k for k, _ in new_blocks]
+    if [k for k in old_ids if k in set(new_ids)] != [k for k in new_ids if k in set(old_ids)]:
+        return None
+
+    # Merge both layouts into one top-to-bottom walk: (id, old_n, new rows | None)
+    old_n = dict(old_blocks)
+    walk, i = [], 0
+    for k, rows in new_blocks:
+        if k in old_n:
+            while old_ids[i] != k:
+                walk.append((old_ids[i], old_n[old_ids[i]], None))
+                i += 1
+            i += 1
+        walk.append((k, old_n.get(k, 0), rows))
+    walk.extend((k, old_n[k], None) for k in old_ids[i:])
+
+    width = len(header)
+    last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+    structure, updates = [], []
+    inserted = deleted = rewritten = 0
+    r = 2  # first sheet row of the current block, after earlier edits
+    for k, n_old, rows in walk:
+        if rows is None:
+            if n_old:
+                structure.append(("delete", r - 1, r - 1 + n_old))
+                deleted += n_old
+            continue
+        n_new = len(rows)
+        if k not in changed and n_old == n_new:
+            r += n_old
+            continue
+        if n_new > n_old:
+            structure.append(("insert", r - 1 + n_old, r - 1 + n_new))
+            inserted += n_new - n_old
+        elif n_new < n_old:
+            structure.append(("delete", r - 1 + n_new, r - 1 + n_old))
+            deleted += n_old - n_new
+        if n_new:
+            updates.append({
+                "range": f"A{r}:{last_col}{r + n_new - 1}",
+                "values": [[str(c) for c in (list(row) + [""] * width)[:width]] for row in rows],
+            })
+            rewritten += n_new
+        r += n_new
+
+    if structure:
+        if inserted and worksheet.row_count < len(values) + inserted:
+            worksheet.add_rows(len(values) + inserted - worksheet.row_count)
+        worksheet.spreadsheet.batch_update({"requests": [
+            {("insertDimension" if op == "insert" else "deleteDimension"): {
+                "range": {"sheetId": worksheet.id, "dimension": "ROWS",
+                          "startIndex": start, "endIndex": end},
+                **({"inheritFromBefore": False} if op == "insert" else {}),
+            }}
+            for op, start, end in structure
+        ]})
+    if updates:
+        worksheet.batch_update(updates, value_input_option=value_input_option)
+
+    return {"updated": rewritten, "inserted": inserted, "deleted": deleted}
+
 # ==============================
 # EMAIL LOG
 # ==============================
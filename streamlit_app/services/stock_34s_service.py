@@ -19,15 +19,18 @@ Layout (grows RIGHT by 5 columns each day):
 
 DAILY JOB (8 PM IST):
   1. Ensure month tab exists (auto-copies item list from previous month if new)
-  2. _get_prev_cl_stock()  →  most recent previous day's Cl Stock (crosses months)
+  2. _get_prev_cl_stock()  →  most recent previous day's Cl Stock (crosses months),
+                              read from the closing-stock snapshot
   3. Fetch In Ward  (email "Delivery Challan Information" + Drive PDFs, ZBF34S only)
   4. Fetch Out Ward (34S PHYSICAL DELIVERY CHALLAN + 34S RETURN RPL sheets)
   5. Build 5 new columns, drop existing ones for that date (idempotent)
-  6. Write the combined DataFrame back to the tab
+  6. Write the combined DataFrame back to the tab and record the day's
+     Cl Stock per item in the closing-stock snapshot (local state)
 
 CATCH-UP:
-  run_update_range(start, end) updates every missing date in sequence,
-  clearing the gspread cache between days so each day reads fresh data.
+  run_update_range(start, end) fetches the whole span's movements in one pass
+  (one IMAP search, one Drive folder listing, one outward-sheet read), builds
+  every missing date in memory in sequence and writes each month tab once.
 """
 
 from __future__ import annotations
@@ -40,6 +43,7 @@ import gspread
 from calendar import monthrange
 from datetime import date, datetime, timedelta, timezone
 
+import numpy as np
 import pandas as pd
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -432,27 +436,11 @@ def get_last_updated_date(year: int, month: int) -> date | None:
     Dates that only have column *headers* (added by Setup Sheet / seed_days)
     but no data values are NOT counted.  This prevents an empty seeded sheet
     from appearing to be "up to date".
-    """
-    df, _ = load_month_df(year, month)
-    if df.empty:
-        return None
-    available = dates_in_df(df, year, month)
-    if not available:
-        return None
-
-    dates_with_data: list[date] = []
-    for d in available:
-        cl_col = _col(d, "Cl Stock")
-        if cl_col not in df.columns:
-            continue
-        # A cell is considered "written" if it is non-empty, non-NaN, and not
-        # literally the string "nan" / "None" that pandas may leave behind.
-        col_vals = df[cl_col].astype(str).str.strip()
-        has_data = col_vals[~col_vals.isin(["", "nan", "None"])].any()
-        if has_data:
-            dates_with_data.append(d)
 
-    return max(dates_with_data) if dates_with_data else None
+    Read from the closing-stock snapshot (rebuilt from the tab when missing).
+    """
+    days = _snapshot_days(year, month)
+    return max(days) if days else None
 
 
 # ─── Flat register: read/write engine ─────────────────────────────────────────
@@ -702,6 +690,7 @@ def run_flat_update(target_date: date | None = None) -> tuple[pd.DataFrame, str]
         return row[i] if (i is not None and i < len(row)) else ""
 
     op_out, in_out, out_out, cl_out = [], [], [], []
+    closing: dict[str, float] = {}
     n_items = 0
     matched_in = matched_out = 0
 
@@ -733,6 +722,7 @@ def run_flat_update(target_date: date | None = None) -> tuple[pd.DataFrame, str]
         if code in outward:
             matched_out += 1
         cl = op + iw - ow
+        closing[code] = cl
 
         op_out.append(_fmt_int(op))
         in_out.append(_fmt_int(iw) if in_i is not None else "")
@@ -769,6 +759,7 @@ def run_flat_update(target_date: date | None = None) -> tuple[pd.DataFrame, str]
         ws.batch_update(updates, value_input_option="USER_ENTERED")
     except Exception as e:
         return pd.DataFrame(), f"❌ Write failed: {e}"
+    save_closing_snapshot({target_date: closing})
 
     mode = "carried forward from previous Cl Stock" if new_day else "kept as entered"
     status = (
@@ -788,6 +779,9 @@ def recalc_flat_cl(target_date: date | None = None) -> tuple[pd.DataFrame, str]:
     Pure arithmetic — no email/Drive/delivery-sheet fetch, so it needs no extra
     credentials and never changes Op/In/Out or the sheet structure. Use this to
     fix stale/mis-typed closing-stock cells.
+
+    The corrected values are recorded in the closing-stock snapshot under the
+    tab's banner date (falling back to `target_date`), as run_flat_update does.
     """
     if target_date is None:
         target_date = datetime.now(IST).date()
@@ -817,6 +811,7 @@ def recalc_flat_cl(target_date: date | None = None) -> tuple[pd.DataFrame, str]:
         return row[i] if (i is not None and i < len(row)) else ""
 
     cl_out, changed, n_items = [], 0, 0
+    closing: dict[str, float] = {}
     for r in range(h + 1, len(values)):
         row = values[r]
         code = str(cell(row, code_col)).strip().upper()
@@ -826,6 +821,8 @@ def recalc_flat_cl(target_date: date | None = None) -> tuple[pd.DataFrame, str]:
             continue
         n_items += 1
         cl = _num(cell(row, op_i)) + _num(cell(row, in_i)) - _num(cell(row, out_i))
+        if code_col >= 0:
+            closing[code] = cl
         new_val = _fmt_int(cl)
         if str(new_val) != str(cell(row, cl_i)).strip():
             changed += 1
@@ -845,6 +842,8 @@ def recalc_flat_cl(target_date: date | None = None) -> tuple[pd.DataFrame, str]:
         )
     except Exception as e:
         return pd.DataFrame(), f"❌ Write failed: {e}"
+    as_of, _ = _parse_title_date(values[h - 1]) if h >= 1 else (None, None)
+    save_closing_snapshot({as_of or target_date: closing})
 
     status = (
         f"✅ Cl Stock recalculated in '{name}' — {n_items} items checked, "
@@ -926,6 +925,127 @@ def ensure_month_sheet(year: int, month: int, seed_days: int = 0) -> str:
     return f"✅ Sheet '{name}' created{col_note}{item_note}"
 
 
+# ─── Closing-stock snapshot ───────────────────────────────────────────────────
+# Every register update also records each day's Cl Stock per item in the local
+# state folder (services/local_state.py), one small JSON file per month:
+#
+#   stock_34s_closing/2026-07.json
+#     {"version": 1, "updated": "<iso time>",
+#      "days": {"2026-07-01": {"<ITEM CODE>": 12.0, …}, …}}
+#
+# Carry-forward, the "last updated" date and the forecast page's stock check
+# read this instead of a 159-column month tab.  Like all local state it is a
+# cache: when a month has no snapshot the tab is read and the snapshot rebuilt
+# from it (sync_closing_snapshot).
+
+_SNAPSHOT_VERSION = 1
+
+
+def _snapshot_path(year: int, month: int) -> str:
+    from services.local_state import state_path
+    return state_path("stock_34s_closing", f"{year}-{month:02d}.json")
+
+
+def _load_snapshot(year: int, month: int) -> dict:
+    from services.local_state import read_json
+    data = read_json(_snapshot_path(year, month), None)
+    if not isinstance(data, dict) or data.get("version") != _SNAPSHOT_VERSION:
+        return {"version": _SNAPSHOT_VERSION, "updated": "", "days": {}}
+    return data
+
+
+def save_closing_snapshot(by_day: dict[date, dict[str, float]], replace_month: bool = False) -> None:
+    """
+    Record {date: {item_code: Cl Stock}} in the snapshot.  replace_month=True
+    drops the other days already stored for the months written (used when the
+    whole month was just re-read from its tab).  Never raises.
+    """
+    from services.local_state import write_json
+    by_month: dict[tuple[int, int], dict[date, dict[str, float]]] = {}
+    for d, closing in by_day.items():
+        by_month.setdefault((d.year, d.month), {})[d] = closing
+    for (year, month), days in by_month.items():
+        try:
+            snap = _load_snapshot(year, month)
+            if replace_month:
+                snap["days"] = {}
+            for d, closing in days.items():
+                snap["days"][d.isoformat()] = {
+                    str(code).strip().upper(): round(float(qty), 3)
+                    for code, qty in closing.items() if str(code).strip()
+                }
+            snap["updated"] = datetime.now(IST).isoformat(timespec="seconds")
+            write_json(_snapshot_path(year, month), snap)
+        except Exception as e:
+            print(f"[STOCK 34S] Closing snapshot write failed for {year}-{month:02d}: {e}")
+
+
+def _closing_from_tab(df: pd.DataFrame, year: int, month: int) -> dict[date, dict[str, float]]:
+    """{date: {item_code: Cl Stock}} for every date of a month tab whose Cl Stock column has data."""
+    codes = _item_codes(df).to_numpy()
+    mask  = codes != ""
+    out: dict[date, dict[str, float]] = {}
+    for d in dates_in_df(df, year, month):
+        col = _col(d, "Cl Stock")
+        if col not in df.columns:
+            continue
+        raw = df[col].astype(str).str.strip()
+        if not (~raw.isin(["", "nan", "None"]))[mask].any():
+            continue
+        out[d] = _extract_closing(df, d)
+    return out
+
+
+def sync_closing_snapshot(df: pd.DataFrame, year: int, month: int) -> int:
+    """Rebuild a month's snapshot from its (already loaded) tab. Returns the number of days stored."""
+    if df is None or df.empty:
+        return 0
+    by_day = _closing_from_tab(df, year, month)
+    if by_day:
+        save_closing_snapshot(by_day, replace_month=True)
+    return len(by_day)
+
+
+def _snapshot_days(year: int, month: int, backfill: bool = True) -> dict[date, dict[str, float]]:
+    """A month's snapshot as {date: {code: qty}}; rebuilt from the tab when missing (backfill)."""
+    snap = _load_snapshot(year, month)
+    days: dict[date, dict[str, float]] = {}
+    for iso, closing in snap["days"].items():
+        try:
+            days[date.fromisoformat(iso)] = closing
+        except ValueError:
+            continue
+    if days or not backfill:
+        return days
+    df, _ = load_month_df(year, month)
+    if df.empty:
+        return {}
+    days = _closing_from_tab(df, year, month)
+    if days:
+        save_closing_snapshot(days, replace_month=True)
+    return days
+
+
+def latest_closing(
+    year: int, month: int, before: date | None = None, backfill: bool = True,
+) -> tuple[date | None, dict[str, float]]:
+    """
+    (date, {item_code: Cl Stock}) for the latest recorded day of a month
+    (strictly before `before` when given), or (None, {}).
+    """
+    days = _snapshot_days(year, month, backfill=backfill)
+    eligible = [d for d in days if before is None or d < before]
+    if not eligible:
+        return None, {}
+    d = max(eligible)
+    return d, days[d]
+
+
+def snapshot_version(year: int, month: int) -> str:
+    """Last-written time of a month's snapshot ('' if none) — a cheap memo key."""
+    return _load_snapshot(year, month).get("updated", "")
+
+
 # ─── Previous Cl Stock look-up ────────────────────────────────────────────────
 
 def _get_prev_cl_stock(
@@ -937,44 +1057,37 @@ def _get_prev_cl_stock(
     STRICTLY BEFORE target_date that has Cl Stock data.
 
     Searches the current month first; if target_date is the 1st of the month
-    (or current month has no earlier dates), falls back to the previous month tab.
+    (or current month has no earlier dates), falls back to the previous month.
+    The current month is read from the closing-stock snapshot (its tab only
+    when the snapshot has nothing); the previous month from its tab, with the
+    snapshot as a fallback.
 
     df_override: pass an already-loaded month DataFrame to skip a sheet read
                  (used inside catch-up loops for performance).
     """
 
-    def _extract(df: pd.DataFrame, d: date) -> dict[str, float]:
-        col = _col(d, "Cl Stock")
-        if col not in df.columns:
-            return {}
-        result: dict[str, float] = {}
-        for _, row in df.iterrows():
-            code = str(row.get("Item Code", "")).strip().upper()
-            if not code:
-                continue
-            try:
-                result[code] = float(str(row.get(col, 0)).replace(",", "") or 0)
-            except (ValueError, TypeError):
-                result[code] = 0.0
-        return result
-
-    # 1. Current month
+    # 1. Current month — the in-memory tab when given, else its snapshot
     if df_override is not None:
         df = df_override
+        if not df.empty:
+            available = dates_in_df(df, target_date.year, target_date.month)
+            past = [d for d in available if d < target_date]
+            if past:
+                prev = max(past)
+                cl = _extract_closing(df, prev)
+                if cl:
+                    print(f"[STOCK 34S] Prev Cl from {prev} (current month)")
+                    return cl
     else:
-        df, _ = load_month_df(target_date.year, target_date.month)
-
-    if not df.empty:
-        available = dates_in_df(df, target_date.year, target_date.month)
-        past = [d for d in available if d < target_date]
-        if past:
-            prev = max(past)
-            cl = _extract(df, prev)
-            if cl:
-                print(f"[STOCK 34S] Prev Cl from {prev} (current month)")
-                return cl
-
-    # 2. Previous month fallback (handles 1st of month or empty current month)
+        prev, cl = latest_closing(target_date.year, target_date.month, before=target_date)
+        if cl:
+            print(f"[STOCK 34S] Prev Cl from {prev} (current month snapshot)")
+            return cl
+
+    # 2. Previous month fallback (handles 1st of month or empty current month).
+    #    The tab comes first: a hand correction to last month's final Cl must
+    #    carry forward, and only the viewed month is re-synced into the
+    #    snapshot. The snapshot covers a tab that is gone or unreadable.
     first      = target_date.replace(day=1)
     prev_last  = first - timedelta(days=1)
     df2, _     = load_month_df(prev_last.year, prev_last.month)
@@ -982,10 +1095,15 @@ def _get_prev_cl_stock(
         available2 = dates_in_df(df2, prev_last.year, prev_last.month)
         if available2:
             prev2 = max(available2)
-            cl2 = _extract(df2, prev2)
+            cl2 = _extract_closing(df2, prev2)
             if cl2:
                 print(f"[STOCK 34S] Prev Cl from {prev2} (previous month tab)")
+                sync_closing_snapshot(df2, prev_last.year, prev_last.month)
                 return cl2
+    prev2, cl2 = latest_closing(prev_last.year, prev_last.month, backfill=False)
+    if cl2:
+        print(f"[STOCK 34S] Prev Cl from {prev2} (previous month snapshot)")
+        return cl2
 
     print("[STOCK 34S] No previous Cl Stock found — Op Stock = 0 (first run).")
     return {}
@@ -1015,40 +1133,66 @@ def _get_master_items(year: int, month: int, df: pd.DataFrame | None = None) ->
     return items.reset_index(drop=True)
 
 
+def _item_codes(df: pd.DataFrame) -> pd.Series:
+    """Stripped, upper-cased Item Code per sheet row ('' where missing)."""
+    if df.empty or "Item Code" not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df["Item Code"].fillna("").astype(str).str.strip().str.upper()
+
+
+def _num_array(col: pd.Series) -> np.ndarray:
+    """Sheet cells → float array ('1,234' → 1234.0; blanks / junk → 0)."""
+    return (
+        pd.to_numeric(col.astype(str).str.replace(",", "").str.strip(), errors="coerce")
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+
+
 def _count_items(df: pd.DataFrame) -> int:
     """Count rows in df that have a non-empty Item Code."""
-    if df.empty or "Item Code" not in df.columns:
-        return 0
-    return int(df["Item Code"].astype(str).str.strip().ne("").sum())
+    return int(_item_codes(df).ne("").sum())
 
 
 # ─── PDF parsing (Delivery Challan) ───────────────────────────────────────────
 
+_CHALLAN_WH_RE = re.compile(r"Warehouse\s*Code\s*[:\-]?\s*(ZB\w+)", re.IGNORECASE)
+_CHALLAN_NO_RE = re.compile(r"Delivery\s+Challan\s+No\s*[:\-]?\s*([A-Z0-9]+)", re.IGNORECASE)
+
+
+def _challan_text_ok(text: str) -> bool:
+    """Fast-engine acceptance check: warehouse code, challan no and ≥1 item line found."""
+    return bool(
+        _CHALLAN_WH_RE.search(text)
+        and _CHALLAN_NO_RE.search(text)
+        and _ITEM_CODE_RE.search(text)
+    )
+
+
 def _parse_challan_pdf(pdf_bytes: bytes) -> dict:
     """
     Parse a Delivery Challan PDF.
     Returns {"warehouse_code": str, "challan_no": str,
              "items": {item_code: {"qty": float, "description": str}}}
+
+    Text comes from services.pdf_text — PyMuPDF first, pdfplumber only when the
+    fast output is missing the warehouse code, challan no or item lines.
     """
+    from services.pdf_text import extract_pdf_text
+
     result: dict = {"warehouse_code": "", "challan_no": "", "items": {}}
-    text = ""
     try:
-        import pdfplumber
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            text = "\n".join(p.extract_text() or "" for p in pdf.pages)
+        text, _engine = extract_pdf_text(pdf_bytes, accept=_challan_text_ok)
     except Exception:
-        try:
-            import fitz
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            text = "\n".join(page.get_text() for page in doc)
-        except Exception:
-            return result
+        return result
+    if not text:
+        return result
 
-    wc = re.search(r"Warehouse\s*Code\s*[:\-]?\s*(ZB\w+)", text, re.IGNORECASE)
+    wc = _CHALLAN_WH_RE.search(text)
     if wc:
         result["warehouse_code"] = wc.group(1).strip()
 
-    dc = re.search(r"Delivery\s+Challan\s+No\s*[:\-]?\s*([A-Z0-9]+)", text, re.IGNORECASE)
+    dc = _CHALLAN_NO_RE.search(text)
     if dc:
         result["challan_no"] = dc.group(1).strip()
 
@@ -1068,12 +1212,50 @@ def _parse_challan_pdf(pdf_bytes: bytes) -> dict:
     return result
 
 
+# ─── Movement helpers ─────────────────────────────────────────────────────────
+
+def _days(start_date: date, end_date: date) -> list[date]:
+    """Every date from start_date to end_date inclusive."""
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+def _add_challan(combined: dict[str, dict], parsed: dict) -> None:
+    """Fold one parsed ZBF34S challan into a {item_code: {qty, description, challan_no}} map."""
+    for code, info in parsed["items"].items():
+        if code in combined:
+            combined[code]["qty"] += info["qty"]
+        else:
+            combined[code] = {
+                "qty": info["qty"],
+                "description": info["description"],
+                "challan_no": parsed["challan_no"],
+            }
+
+
+def _merge_inward(email_in: dict[str, dict], drive_in: dict[str, dict]) -> dict[str, dict]:
+    """Combine email + Drive inward for one day, keyed by upper-cased item code."""
+    inward: dict[str, dict] = {}
+    for code, info in {**email_in, **drive_in}.items():
+        code = code.upper()
+        if code in inward:
+            inward[code]["qty"] += info.get("qty", 0.0)
+        else:
+            inward[code] = dict(info)
+    return inward
+
+
 # ─── Inward — email ───────────────────────────────────────────────────────────
 
-def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
-    """Search for 'Delivery Challan Information' emails on target_date and parse PDFs."""
+def _fetch_inward_email_range(start_date: date, end_date: date) -> dict[date, dict[str, dict]]:
+    """
+    One IMAP login + one SEARCH for 'Delivery Challan Information' emails over
+    the whole span; PDFs are parsed once and bucketed by the email's Date
+    header (IST), clamped into [start_date, end_date].
+    Returns {date: {item_code: {qty, description, challan_no}}}.
+    """
     import imaplib
     import email as _email_lib
+    from email.utils import parsedate_to_datetime
 
     email_addr, password = _imap_creds()
     if not email_addr or not password:
@@ -1087,8 +1269,8 @@ def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
         print(f"[STOCK 34S] IMAP login failed: {e}")
         return {}
 
-    since = target_date.strftime("%d-%b-%Y")
-    until = (target_date + timedelta(days=1)).strftime("%d-%b-%Y")
+    since = start_date.strftime("%d-%b-%Y")
+    until = (end_date + timedelta(days=1)).strftime("%d-%b-%Y")
     query = f'(SUBJECT "{CHALLAN_SUBJECT}" SINCE {since} BEFORE {until})'
     try:
         _, data = mail.search(None, query)
@@ -1098,7 +1280,7 @@ def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
         return {}
 
     ids = data[0].split() if data and data[0] else []
-    combined: dict[str, dict] = {}
+    by_date: dict[date, dict[str, dict]] = {}
 
     for eid in ids:
         try:
@@ -1106,6 +1288,14 @@ def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
             msg = _email_lib.message_from_bytes(msg_data[0][1])
         except Exception:
             continue
+        try:
+            sent = parsedate_to_datetime(msg.get("Date"))
+            if sent.tzinfo is None:
+                sent = sent.replace(tzinfo=IST)
+            day = sent.astimezone(IST).date()
+        except Exception:
+            day = start_date
+        day = min(max(day, start_date), end_date)
         for part in msg.walk():
             if part.get_content_type() != "application/pdf":
                 continue
@@ -1115,33 +1305,32 @@ def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
             parsed = _parse_challan_pdf(pdf_bytes)
             if WAREHOUSE_CODE not in parsed["warehouse_code"].upper():
                 continue
-            for code, info in parsed["items"].items():
-                if code in combined:
-                    combined[code]["qty"] += info["qty"]
-                else:
-                    combined[code] = {
-                        "qty": info["qty"],
-                        "description": info["description"],
-                        "challan_no": parsed["challan_no"],
-                    }
+            _add_challan(by_date.setdefault(day, {}), parsed)
     mail.logout()
-    print(f"[STOCK 34S] Email inward: {len(combined)} items for {target_date}")
-    return combined
+    n_items = sum(len(v) for v in by_date.values())
+    print(f"[STOCK 34S] Email inward: {n_items} item-day(s) from {len(ids)} email(s), {start_date} → {end_date}")
+    return by_date
+
+
+def _fetch_inward_from_email(target_date: date) -> dict[str, dict]:
+    """Search for 'Delivery Challan Information' emails on target_date and parse PDFs."""
+    return _fetch_inward_email_range(target_date, target_date).get(target_date, {})
 
 
 # ─── Inward — Google Drive ────────────────────────────────────────────────────
 
-def _fetch_inward_from_drive(target_date: date) -> dict[str, dict]:
+def _fetch_inward_drive_range(start_date: date, end_date: date) -> dict[date, dict[str, dict]]:
     """
-    Read invoice PDFs from Google Drive for target_date.
+    Read invoice PDFs from Google Drive for every date in the span with one
+    Drive service and one listing per month folder.
     Reuses GOOGLE_DRIVE_INVOICES_FOLDER_ID and helpers from
     email_sender_delivery_schedule.py.
     Folder structure: <root> / "{N} {Month}-{YYYY}" / "for {DD}.{MM}.{YYYY}" / *.pdf
+    Returns {date: {item_code: {qty, description, challan_no}}}.
     """
     try:
         from services.email_sender_delivery_schedule import (
-            _get_drive_folder_id, _get_drive_service,
-            _list_drive_folders, _list_drive_pdfs, _download_drive_file,
+            _get_drive_folder_id, _get_drive_service, _download_drive_file,
         )
     except Exception as e:
         print(f"[STOCK 34S] Drive import error: {e}")
@@ -1157,91 +1346,278 @@ def _fetch_inward_from_drive(target_date: date) -> dict[str, dict]:
         print(f"[STOCK 34S] Drive service error: {e}")
         return {}
 
-    fin_month = (target_date.month - 4) % 12 + 1
-    mf_name   = f"{fin_month} {target_date.strftime('%B')}-{target_date.year}"
-    df_name   = f"for {target_date.day:02d}.{target_date.month:02d}.{target_date.year}"
+    # Month/day folders are resolved from the cached Drive tree index
+    from services.drive_index import tree_listers
+    list_folders, list_pdfs = tree_listers(svc, root_id)
+    month_ids = {f.get("name"): f["id"] for f in list_folders(root_id)}
+    day_folders: dict[str, dict[str, str]] = {}   # month folder name -> {day folder name: id}
+
+    by_date: dict[date, dict[str, dict]] = {}
+    for d in _days(start_date, end_date):
+        fin_month = (d.month - 4) % 12 + 1
+        mf_name   = f"{fin_month} {d.strftime('%B')}-{d.year}"
+        df_name   = f"for {d.day:02d}.{d.month:02d}.{d.year}"
+
+        mf_id = month_ids.get(mf_name)
+        if not mf_id:
+            print(f"[STOCK 34S] Drive: '{mf_name}' not found.")
+            continue
+        if mf_name not in day_folders:
+            day_folders[mf_name] = {f.get("name"): f["id"] for f in list_folders(mf_id)}
+        df_id = day_folders[mf_name].get(df_name)
+        if not df_id:
+            print(f"[STOCK 34S] Drive: '{df_name}' not found.")
+            continue
+
+        combined: dict[str, dict] = {}
+        for f in list_pdfs(df_id):
+            content = _download_drive_file(svc, f["id"])
+            if not content:
+                continue
+            try:
+                parsed = _parse_challan_pdf(content)
+            except Exception as e:
+                print(f"[STOCK 34S] Drive parse error '{f['name']}': {e}")
+                continue
+            if WAREHOUSE_CODE not in parsed["warehouse_code"].upper():
+                continue
+            _add_challan(combined, parsed)
+        if combined:
+            by_date[d] = combined
+        print(f"[STOCK 34S] Drive inward: {len(combined)} items for {d}")
+    return by_date
+
+
+def _fetch_inward_from_drive(target_date: date) -> dict[str, dict]:
+    """Read invoice PDFs from Google Drive for target_date (see _fetch_inward_drive_range)."""
+    return _fetch_inward_drive_range(target_date, target_date).get(target_date, {})
+
+
+# ─── Outward from sheets ───────────────────────────────────────────────────────
+
+# The two outward tabs are aggregated once into {date: {item_code: qty}} and
+# memoised per tab on a content fingerprint of the source columns, so a day or
+# a whole range is answered with dict look-ups; a tab is only re-aggregated
+# when its rows change (the read itself still goes through get_df's cache).
+
+_OUTWARD_COLS = ["DATE", "ITEM CODE", "QUANTITY"]
+_outward_memo: dict[str, tuple] = {}   # tab -> (fingerprint, {date: {code: qty}})
+
+
+def _aggregate_outward(df: pd.DataFrame) -> dict[date, dict[str, float]]:
+    """{date: {item_code_upper: total_qty}} for one outward tab (DATE as DD/MM/YYYY, with or without leading zeros)."""
+    days = pd.to_datetime(df["DATE"].str.strip(), format="%d/%m/%Y", errors="coerce")
+    codes = df["ITEM CODE"].str.strip().str.upper()
+    qty = pd.to_numeric(df["QUANTITY"].str.replace(",", "").str.strip(), errors="coerce").fillna(0.0)
+    mask = days.notna() & (codes != "")
+    if not mask.any():
+        return {}
+    sums = (
+        pd.DataFrame({"day": days[mask].dt.date, "code": codes[mask], "qty": qty[mask]})
+        .groupby(["day", "code"], sort=False)["qty"].sum()
+    )
+    index: dict[date, dict[str, float]] = {}
+    for (day, code), total in sums.items():
+        index.setdefault(day, {})[code] = float(total)
+    return index
 
-    def _find_folder(parent_id, name):
-        for f in _list_drive_folders(svc, parent_id):
-            if f.get("name") == name:
-                return f["id"]
-        return None
 
-    mf_id = _find_folder(root_id, mf_name)
-    if not mf_id:
-        print(f"[STOCK 34S] Drive: '{mf_name}' not found.")
+def _outward_index(sheet_name: str) -> dict[date, dict[str, float]]:
+    """The aggregated outward index for one tab, rebuilt only when the tab's rows change."""
+    from services.sheets import get_df
+    try:
+        df = get_df(sheet_name)
+    except Exception:
+        return {}
+    if df is None or df.empty:
+        _outward_memo.pop(sheet_name, None)
         return {}
-    df_id = _find_folder(mf_id, df_name)
-    if not df_id:
-        print(f"[STOCK 34S] Drive: '{df_name}' not found.")
+    df = df.set_axis([str(c).strip().upper() for c in df.columns], axis=1)
+    if "DATE" not in df.columns:
         return {}
+    df = df.reindex(columns=_OUTWARD_COLS, fill_value="").fillna("").astype(str)
 
-    pdfs = _list_drive_pdfs(svc, df_id)
-    combined: dict[str, dict] = {}
-    for f in pdfs:
-        content = _download_drive_file(svc, f["id"])
-        if not content:
-            continue
-        try:
-            parsed = _parse_challan_pdf(content)
-        except Exception as e:
-            print(f"[STOCK 34S] Drive parse error '{f['name']}': {e}")
-            continue
-        if WAREHOUSE_CODE not in parsed["warehouse_code"].upper():
-            continue
-        for code, info in parsed["items"].items():
-            if code in combined:
-                combined[code]["qty"] += info["qty"]
-            else:
-                combined[code] = {
-                    "qty": info["qty"],
-                    "description": info["description"],
-                    "challan_no": parsed["challan_no"],
-                }
-    print(f"[STOCK 34S] Drive inward: {len(combined)} items for {target_date}")
-    return combined
+    fp = (len(df), int(pd.util.hash_pandas_object(df, index=False).sum()))
+    hit = _outward_memo.get(sheet_name)
+    if hit and hit[0] == fp:
+        return hit[1]
+    index = _aggregate_outward(df)
+    _outward_memo[sheet_name] = (fp, index)
+    print(f"[STOCK 34S] Outward index rebuilt for '{sheet_name}': {len(index)} day(s).")
+    return index
 
 
-# ─── Outward from sheets ───────────────────────────────────────────────────────
+def _fetch_outward_range(start_date: date, end_date: date) -> dict[date, dict[str, float]]:
+    """
+    Sum outward quantities from DELIVERY_SHEET + RETURN_SHEET for every date in
+    the span, from the per-tab outward indexes.
+    Returns {date: {item_code_upper: total_qty}}.
+    """
+    indexes = [_outward_index(name) for name in (DELIVERY_SHEET, RETURN_SHEET)]
+    by_date: dict[date, dict[str, float]] = {}
+    for d in _days(start_date, end_date):
+        for index in indexes:
+            for code, qty in index.get(d, {}).items():
+                bucket = by_date.setdefault(d, {})
+                bucket[code] = bucket.get(code, 0.0) + qty
+
+    n_items = sum(len(v) for v in by_date.values())
+    print(f"[STOCK 34S] Outward: {n_items} item-day(s), {start_date} → {end_date}")
+    return by_date
+
 
 def _fetch_outward(target_date: date) -> dict[str, float]:
     """
     Sum outward quantities from DELIVERY_SHEET + RETURN_SHEET for target_date.
     Returns {item_code_upper: total_qty}.
     """
-    from services.sheets import get_df
-    combined: dict[str, float] = {}
-    target_str = target_date.strftime("%d/%m/%Y")
-    # Also try without leading zeros in case the sheet uses that format
-    alt_str    = f"{target_date.day}/{target_date.month}/{target_date.year}"
+    return _fetch_outward_range(target_date, target_date).get(target_date, {})
 
-    for sheet_name in [DELIVERY_SHEET, RETURN_SHEET]:
-        try:
-            df = get_df(sheet_name)
-        except Exception:
-            continue
-        if df is None or df.empty:
-            continue
-        df.columns = [str(c).strip().upper() for c in df.columns]
-        if "DATE" not in df.columns:
-            continue
-        date_col = df["DATE"].astype(str).str.strip()
-        mask = date_col.isin([target_str, alt_str])
-        for _, row in df[mask].iterrows():
-            code = str(row.get("ITEM CODE", "")).strip().upper()
-            if not code:
-                continue
-            try:
-                qty = float(str(row.get("QUANTITY", 0)).replace(",", "") or 0)
-            except (ValueError, TypeError):
-                qty = 0.0
-            combined[code] = combined.get(code, 0.0) + qty
 
-    print(f"[STOCK 34S] Outward: {len(combined)} items for {target_date}")
-    return combined
+# ─── Register engine — long-format movements ─────────────────────────────────
+# Internally the register is a long table with one row per (sheet row, date):
+#
+#   row │ item │ date │ inward │ outward │ dc_no
+#
+# `row` is the item's 0-based position in the month tab, so duplicate item
+# codes and blank spacer rows keep their place.  Op/Cl Stock are derived, never
+# stored: Cl is the per-row cumulative sum of (inward − outward) on top of the
+# opening stock — one grouped cumsum in NumPy for every date at once — and
+# Op = Cl − inward + outward.  The horizontal "DD/MM Op Stock …" pivot is only
+# rendered from it when a tab is written.
 
+MOVEMENT_COLS = ["row", "item", "date", "inward", "outward", "dc_no"]
+
+
+def _movements_frame(
+    df: pd.DataFrame,
+    days: list[date],
+    inward_by_day: dict[date, dict[str, dict]],
+    outward_by_day: dict[date, dict[str, float]],
+) -> pd.DataFrame:
+    """Long movement table for every item row of df × days, from fetched movements."""
+    codes = _item_codes(df).to_numpy()
+    rows  = np.flatnonzero(codes != "")
+    items = pd.Series(codes[rows])
+    parts = []
+    for d in days:
+        inward = inward_by_day.get(d, {})
+        parts.append(pd.DataFrame({
+            "row":     rows,
+            "item":    items.to_numpy(),
+            "date":    d,
+            "inward":  items.map({c: i.get("qty", 0.0) for c, i in inward.items()}).fillna(0.0).to_numpy(float),
+            "outward": items.map(outward_by_day.get(d, {})).fillna(0.0).to_numpy(float),
+            "dc_no":   items.map({c: i.get("challan_no", "") for c, i in inward.items()}).fillna("").to_numpy(object),
+        }))
+    if not parts:
+        return pd.DataFrame(columns=MOVEMENT_COLS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _movements_from_pivot(df: pd.DataFrame, year: int, month: int) -> tuple[pd.DataFrame, dict[int, float]]:
+    """
+    Read a month tab's recorded In/Out/DC No back into the long table.
+    Returns (movements, opening) where opening is {row: Op Stock of the first
+    recorded date} — the carry-forward the tab was started from.
+    """
+    days = dates_in_df(df, year, month)
+    codes = _item_codes(df).to_numpy()
+    rows  = np.flatnonzero(codes != "")
+    empty = pd.Series("", index=df.index)
+    parts = []
+    for d in days:
+        parts.append(pd.DataFrame({
+            "row":     rows,
+            "item":    codes[rows],
+            "date":    d,
+            "inward":  _num_array(df.get(_col(d, "In Ward"), empty))[rows],
+            "outward": _num_array(df.get(_col(d, "Out Ward"), empty))[rows],
+            "dc_no":   df.get(_col(d, "DC No"), empty).fillna("").astype(str).to_numpy(object)[rows],
+        }))
+    opening: dict[int, float] = {}
+    if days:
+        first_op = _num_array(df.get(_col(days[0], "Op Stock"), empty))
+        opening = dict(zip(rows.tolist(), first_op[rows].tolist()))
+    if not parts:
+        return pd.DataFrame(columns=MOVEMENT_COLS), opening
+    return pd.concat(parts, ignore_index=True), opening
+
+
+def _opening_by_row(df: pd.DataFrame, prev_cl: dict[str, float]) -> dict[int, float]:
+    """Carry-forward {item_code: Cl} → {row: opening stock} for every item row of df."""
+    codes = _item_codes(df).to_numpy()
+    rows  = np.flatnonzero(codes != "")
+    return {int(r): float(prev_cl.get(codes[r], 0.0)) for r in rows}
+
+
+def _grouped_cumsum(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Running sum of values restarting at every change of key (keys must be grouped)."""
+    if len(values) == 0:
+        return values.astype(float)
+    cs     = np.cumsum(values, dtype=float)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    before = cs[starts] - values[starts]
+    return cs - np.repeat(before, np.diff(np.r_[starts, len(values)]))
+
+
+def _compute_register(movements: pd.DataFrame, opening: dict[int, float]) -> pd.DataFrame:
+    """Add Op/Cl Stock ("op", "cl") to the long table for every row and date in one pass."""
+    reg  = movements.sort_values(["row", "date"], kind="stable").reset_index(drop=True)
+    net  = reg["inward"].to_numpy(float) - reg["outward"].to_numpy(float)
+    base = reg["row"].map(opening).fillna(0.0).to_numpy(float)
+    reg["cl"] = base + _grouped_cumsum(reg["row"].to_numpy(), net)
+    reg["op"] = reg["cl"] - net
+    return reg
+
+
+def _closing_by_item(reg: pd.DataFrame, d: date) -> dict[str, float]:
+    """{item_code: Cl Stock} on date d (the carry-forward for the next day)."""
+    day = reg[reg["date"] == d]
+    return dict(zip(day["item"], day["cl"].astype(float)))
+
+
+def _extract_closing(df: pd.DataFrame, d: date) -> dict[str, float]:
+    """{item_code: Cl Stock} read from a month tab's "DD/MM Cl Stock" column."""
+    col = _col(d, "Cl Stock")
+    if col not in df.columns:
+        return {}
+    codes = _item_codes(df).to_numpy()
+    mask  = codes != ""
+    return dict(zip(codes[mask], _num_array(df[col])[mask]))
+
+
+_PIVOT_FIELDS = [
+    ("Op Stock", "op"), ("In Ward", "inward"), ("Out Ward", "outward"),
+    ("Cl Stock", "cl"), ("DC No", "dc_no"),
+]
+
+
+def _render_pivot(n_rows: int, reg: pd.DataFrame) -> dict[str, list]:
+    """
+    Horizontal "DD/MM <sub>" columns for every date in reg, aligned row-for-row
+    with the month tab; rows without an item stay blank.
+    """
+    out: dict[str, list] = {}
+    for d, day in reg.groupby("date", sort=True):
+        pos = day["row"].to_numpy()
+        for sub, field in _PIVOT_FIELDS:
+            vals = day[field].to_numpy()
+            if field != "dc_no":
+                vals = np.rint(vals.astype(float)).astype(int)
+            col = np.full(n_rows, "", dtype=object)
+            col[pos] = vals
+            out[_col(d, sub)] = col.tolist()
+    return out
+
+
+def _replace_date_columns(df: pd.DataFrame, new_cols: dict[str, list]) -> pd.DataFrame:
+    """Drop any existing columns for the dates in new_cols, then append them (idempotent)."""
+    tags = {name.split(" ", 1)[0] for name in new_cols}
+    keep = [c for c in df.columns if not (_parse_col(c) and c.split(" ", 1)[0] in tags)]
+    added = pd.DataFrame(new_cols, index=df.index)
+    return pd.concat([df[keep], added], axis=1)
 
-# ─── Core: build columns for one date ─────────────────────────────────────────
 
 def _build_date_columns(
     df: pd.DataFrame,
@@ -1265,38 +1641,12 @@ def _build_date_columns(
       Cl Stock  = Op Stock + In Ward − Out Ward
       DC No     = Delivery Challan number if inward exists, else ""
     """
-    op_vals, in_vals, out_vals, cl_vals, dc_vals = [], [], [], [], []
-
-    for _, row in df.iterrows():
-        code = str(row.get("Item Code", "")).strip().upper()
-        if not code:
-            # Blank / header / subtotal row — leave all 5 cells empty
-            op_vals.append("")
-            in_vals.append("")
-            out_vals.append("")
-            cl_vals.append("")
-            dc_vals.append("")
-            continue
-
-        op = prev_cl.get(code, 0.0)
-        iw = inward.get(code, {}).get("qty", 0.0)
-        ow = outward.get(code, 0.0)
-        cl = op + iw - ow
-        dc = inward.get(code, {}).get("challan_no", "")
-
-        op_vals.append(int(round(op)))
-        in_vals.append(int(round(iw)) if iw else 0)
-        out_vals.append(int(round(ow)) if ow else 0)
-        cl_vals.append(int(round(cl)))
-        dc_vals.append(dc)
-
-    return {
-        _col(target_date, "Op Stock"):  op_vals,
-        _col(target_date, "In Ward"):   in_vals,
-        _col(target_date, "Out Ward"):  out_vals,
-        _col(target_date, "Cl Stock"):  cl_vals,
-        _col(target_date, "DC No"):     dc_vals,
-    }
+    movements = _movements_frame(df, [target_date], {target_date: inward}, {target_date: outward})
+    reg = _compute_register(movements, _opening_by_row(df, prev_cl))
+    cols = _render_pivot(len(df), reg)
+    if not cols:
+        cols = {_col(target_date, sub): [""] * len(df) for sub, _ in _PIVOT_FIELDS}
+    return cols
 
 
 # ─── Daily update (single date) ───────────────────────────────────────────────
@@ -1367,13 +1717,7 @@ def run_daily_update(
     # 5. Inward — email challan PDFs + Google Drive invoice PDFs
     email_in = _fetch_inward_from_email(target_date)
     drive_in = _fetch_inward_from_drive(target_date)
-    inward: dict[str, dict] = {}
-    for code, info in {**email_in, **drive_in}.items():
-        code = code.upper()
-        if code in inward:
-            inward[code]["qty"] += info.get("qty", 0.0)
-        else:
-            inward[code] = dict(info)
+    inward   = _merge_inward(email_in, drive_in)
 
     # 6. Outward — 34S PHYSICAL DELIVERY CHALLAN + 34S RETURN RPL sheets
     outward = {k.upper(): v for k, v in _fetch_outward(target_date).items()}
@@ -1381,25 +1725,21 @@ def run_daily_update(
     print(f"[STOCK 34S] Inward items found : {len(inward)}  (email:{len(email_in)} + drive:{len(drive_in)})")
     print(f"[STOCK 34S] Outward items found: {len(outward)}")
 
-    # 7. Build 5 new columns — iterates over ALL rows in df (no filtering/dedup)
+    # 7. Build 5 new columns — aligned with ALL rows in df (no filtering/dedup)
     new_cols = _build_date_columns(df, target_date, prev_cl, inward, outward)
 
-    # 8. Remove existing columns for target_date (idempotent)
-    tag  = _col_tag(target_date)
-    drop = [c for c in df.columns if c.startswith(tag + " ")]
-    df   = df.drop(columns=drop, errors="ignore")
+    # 8. Replace any existing columns for target_date (idempotent) — lengths
+    #    are guaranteed to match len(df)
+    df = _replace_date_columns(df, new_cols)
 
-    # 9. Assign new columns — lengths are guaranteed to match len(df)
-    for col_name, values in new_cols.items():
-        df[col_name] = values
-
-    # 10. Write back
+    # 9. Write back
     try:
         if direct:
             _write_sheet_direct(name, df)
         else:
             from services.sheets import write_df
             write_df(name, df.fillna("").astype(str))
+        save_closing_snapshot({target_date: _extract_closing(df, target_date)})
         status = (
             f"✅ '{name}' updated for {target_date} — {item_count} items.  "
             f"Inward: {len(inward)} item(s) | Outward: {len(outward)} item(s)."
@@ -1417,8 +1757,12 @@ def run_daily_update(
 def run_update_range(start_date: date, end_date: date) -> tuple[list[str], str]:
     """
     Update every date from start_date to end_date inclusive.
-    Maintains the DataFrame in memory between days (no cache issue) and writes
-    to the sheet after each day.  Handles month crossings automatically.
+
+    Movements are fetched once for the whole span — one IMAP search, one Drive
+    listing of the month/day folders, one read of the outward sheets — and
+    bucketed by date.  Each month's days are then computed together by the
+    long-format register engine (Cl Stock carried forward across month
+    boundaries too), and every month tab touched is written once at the end.
 
     Returns (list_of_per_day_status_lines, summary_message).
     """
@@ -1429,74 +1773,69 @@ def run_update_range(start_date: date, end_date: date) -> tuple[list[str], str]:
         line = f"{end_date.strftime('%d/%m/%Y')}: {status}"
         return [line], status
 
-    results: list[str] = []
-    d       = start_date
-    # Cache the current month DataFrame across days for performance
-    cur_year  = d.year
-    cur_month = d.month
-    df_cache, _ = load_month_df(cur_year, cur_month, direct=True)
-    name_cache  = sheet_name_for(date(cur_year, cur_month, 1))
-
-    while d <= end_date:
-        # Switch to new month if we've crossed a boundary
-        if d.year != cur_year or d.month != cur_month:
-            # Write current month before switching
-            if not df_cache.empty:
-                try:
-                    _write_sheet_direct(name_cache, df_cache)
-                except Exception as we:
-                    results.append(f"  ⚠️ Write error for {cur_year}/{cur_month}: {we}")
-            cur_year, cur_month = d.year, d.month
-            ensure_month_sheet(cur_year, cur_month, seed_days=0)
-            df_cache, _ = load_month_df(cur_year, cur_month, direct=True)
-            name_cache  = sheet_name_for(date(cur_year, cur_month, 1))
-
-        year, month = d.year, d.month
-        name = sheet_name_for(d)
-
-        item_count = _count_items(df_cache)
+    # 1. All movements for the span, bucketed by date
+    email_by_day   = _fetch_inward_email_range(start_date, end_date)
+    drive_by_day   = _fetch_inward_drive_range(start_date, end_date)
+    outward_by_day = _fetch_outward_range(start_date, end_date)
+
+    # 2. Build each month's days in one pass of the register engine, carrying
+    #    the last day's Cl Stock into the next month
+    months: dict[tuple[int, int], pd.DataFrame] = {}
+    closing: dict[tuple[int, int], dict[date, dict[str, float]]] = {}
+    day_status: list[tuple[date, str]] = []
+    prev_cl: dict[str, float] | None = None
+
+    span = _days(start_date, end_date)
+    for key in dict.fromkeys((d.year, d.month) for d in span):
+        days = [d for d in span if (d.year, d.month) == key]
+        if months:
+            ensure_month_sheet(key[0], key[1], seed_days=0)
+        df_month, _ = load_month_df(key[0], key[1], direct=True)
+        months[key] = df_month
+
+        item_count = _count_items(df_month)
         if item_count == 0:
-            cols_seen = ", ".join(str(c) for c in df_cache.columns[:8]) or "(none)"
-            results.append(
-                f"{d.strftime('%d/%m/%Y')}: ❌ No items with 'Item Code' found in sheet. "
-                f"Columns detected: [{cols_seen}]."
-            )
-            d += timedelta(days=1)
+            cols_seen = ", ".join(str(c) for c in df_month.columns[:8]) or "(none)"
+            for d in days:
+                day_status.append((d, (
+                    "❌ No items with 'Item Code' found in sheet. "
+                    f"Columns detected: [{cols_seen}]."
+                )))
             continue
 
-        prev_cl  = _get_prev_cl_stock(d, df_override=df_cache)
-        email_in = _fetch_inward_from_email(d)
-        drive_in = _fetch_inward_from_drive(d)
-        inward: dict[str, dict] = {}
-        for code, info in {**email_in, **drive_in}.items():
-            code = code.upper()
-            if code in inward:
-                inward[code]["qty"] += info.get("qty", 0.0)
-            else:
-                inward[code] = dict(info)
-        outward = {k.upper(): v for k, v in _fetch_outward(d).items()}
-
-        # Build columns over full df — no item filtering, no positional mismatch
-        new_cols = _build_date_columns(df_cache, d, prev_cl, inward, outward)
-
-        tag  = _col_tag(d)
-        drop = [c for c in df_cache.columns if c.startswith(tag + " ")]
-        df_cache = df_cache.drop(columns=drop, errors="ignore")
-        for col_name, values in new_cols.items():
-            df_cache[col_name] = values   # lengths guaranteed equal
+        if prev_cl is None:
+            prev_cl = _get_prev_cl_stock(days[0], df_override=df_month)
+        inward_by_day = {
+            d: _merge_inward(email_by_day.get(d, {}), drive_by_day.get(d, {})) for d in days
+        }
+        movements = _movements_frame(df_month, days, inward_by_day, outward_by_day)
+        reg       = _compute_register(movements, _opening_by_row(df_month, prev_cl))
+        months[key] = _replace_date_columns(df_month, _render_pivot(len(df_month), reg))
+        closing[key] = {d: _closing_by_item(reg, d) for d in days}
+        prev_cl   = closing[key][days[-1]]
+
+        for d in days:
+            day_status.append((d, (
+                f"✅ {item_count} items | "
+                f"Inward: {len(inward_by_day[d])} | Outward: {len(outward_by_day.get(d, {}))}"
+            )))
 
-        # Write after each day so the sheet is always up-to-date
+    # 3. One write per month tab
+    write_errors: dict[tuple[int, int], str] = {}
+    for (year, month), df_month in months.items():
+        if _count_items(df_month) == 0:
+            continue
         try:
-            _write_sheet_direct(name, df_cache)
-            status = (
-                f"✅ {item_count} items | "
-                f"Inward: {len(inward)} | Outward: {len(outward)}"
-            )
+            _write_sheet_direct(sheet_name_for(date(year, month, 1)), df_month)
+            save_closing_snapshot(closing.get((year, month), {}))
         except Exception as e:
-            status = f"❌ Write failed: {e}"
+            write_errors[(year, month)] = f"❌ Write failed: {e}"
 
+    results: list[str] = []
+    for d, status in day_status:
+        if "✅" in status and (d.year, d.month) in write_errors:
+            status = write_errors[(d.year, d.month)]
         results.append(f"{d.strftime('%d/%m/%Y')}: {status}")
-        d += timedelta(days=1)
 
     total_ok  = sum(1 for r in results if "✅" in r)
     total_err = sum(1 for r in results if "❌" in r)
@@ -1504,63 +1843,171 @@ def run_update_range(start_date: date, end_date: date) -> tuple[list[str], str]:
     return results, summary
 
 
-# ─── Monthly email helpers ────────────────────────────────────────────────────
+# ─── Recalculate a month after corrections ────────────────────────────────────
 
-def _build_monthly_excel(year: int, month: int) -> bytes:
-    """
-    Export the full horizontal sheet for a month as a styled Excel file.
-    Returns the raw .xlsx bytes.
+def recalc_month_register(year: int, month: int) -> tuple[pd.DataFrame, str]:
     """
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
+    Recompute Op/Cl Stock for every recorded date of a month tab from the tab's
+    OWN In Ward / Out Ward values, starting from the first recorded date's
+    Op Stock, and write the tab back once.
 
-    df, _ = load_month_df(year, month)
-    wb    = openpyxl.Workbook()
-    ws    = wb.active
-    ws.title = sheet_name_for(date(year, month, 1))[len(SHEET_PREFIX):]
+    Pure arithmetic (no email/Drive/outward fetch): use it after correcting an
+    In/Out cell by hand so every later day picks up the change.  Flat
+    single-day registers are routed to recalc_flat_cl.
+    """
+    name = sheet_name_for(date(year, month, 1))
+    if is_flat_sheet(name):
+        return recalc_flat_cl(date(year, month, 1))
 
+    df = _read_sheet_direct(name)
     if df.empty:
-        ws.append(["No data found."])
-        buf = io.BytesIO()
-        wb.save(buf)
-        return buf.getvalue()
-
-    # Header
-    header_fill = PatternFill("solid", fgColor="1F4E79")
-    header_font = Font(color="FFFFFF", bold=True, size=10)
-    date_fills  = [PatternFill("solid", fgColor=c) for c in
-                   ["2E75B6", "2F5496", "1F3864", "203864", "17375E"]]
-
-    headers = list(df.columns)
-    ws.append(headers)
-    for ci, h in enumerate(headers, 1):
-        cell = ws.cell(1, ci)
-        cell.font      = header_font
-        cell.alignment = Alignment(horizontal="center", wrap_text=True)
-        parsed = _parse_col(h)
-        if parsed:
-            sub_idx = DATE_SUB_COLS.index(parsed[2]) if parsed[2] in DATE_SUB_COLS else 0
-            cell.fill = date_fills[sub_idx % len(date_fills)]
+        return pd.DataFrame(), f"⚠️ Sheet '{name}' is empty or does not exist."
+    days = dates_in_df(df, year, month)
+    if not days or _count_items(df) == 0:
+        return df, f"⚠️ Nothing to recalculate in '{name}' (no items or no dated columns)."
+
+    movements, opening = _movements_from_pivot(df, year, month)
+    reg      = _compute_register(movements, opening)
+    new_cols = _render_pivot(len(df), reg)
+
+    changed = 0
+    for d in days:
+        col = _col(d, "Cl Stock")
+        old = df[col].astype(str).str.strip().tolist() if col in df.columns else []
+        changed += sum(1 for a, b in zip(old, new_cols[col]) if a != str(b))
+
+    df = _replace_date_columns(df, new_cols)
+    try:
+        _write_sheet_direct(name, df)
+    except Exception as e:
+        return df, f"❌ Write failed: {e}"
+    save_closing_snapshot({d: _closing_by_item(reg, d) for d in days}, replace_month=True)
+
+    status = (
+        f"✅ '{name}' recalculated — {len(days)} day(s) × {_count_items(df)} items, "
+        f"{changed} Cl Stock cell(s) corrected."
+    )
+    print(f"[STOCK 34S] {status}")
+    return df, status
+
+
+# ─── Monthly email helpers ────────────────────────────────────────────────────
+
+# Exports are streamed with xlsxwriter in constant_memory mode: every row is
+# flushed to a temp file once the next one starts, and widths / number formats
+# are set once per column.  A register export writes exactly what the tab holds
+# — every column in sheet order, hand-corrected and blank cells as they are —
+# so the monthly email attachment always agrees with the register; a
+# multi-month workbook only ever holds one month's tab in memory.
+
+_XL_SUB_FILLS = ["#2E75B6", "#2F5496", "#1F3864", "#203864", "#17375E"]
+
+
+def _xl_formats(wb) -> dict:
+    """Cell formats shared by every sheet of a stock export workbook."""
+    head = {"bold": True, "font_color": "#FFFFFF", "font_size": 10,
+            "align": "center", "valign": "vcenter", "text_wrap": True}
+    return {
+        "header": wb.add_format({**head, "bg_color": "#1F4E79"}),
+        "sub":    [wb.add_format({**head, "bg_color": c}) for c in _XL_SUB_FILLS],
+        "int":    wb.add_format({"num_format": "0"}),
+    }
+
+
+def _write_register_sheet(wb, fmt: dict, title: str, df: pd.DataFrame) -> None:
+    """Stream one month tab's own cells (all columns, sheet order) into a new worksheet of wb."""
+    ws = wb.add_worksheet(title[:31])
+    headers = [str(c) for c in df.columns]
+    parsed  = [_parse_col(h) for h in headers]
+    n_lead  = next((i for i, p in enumerate(parsed) if p), len(headers))
+
+    for ci, p in enumerate(parsed):
+        if p:
+            ws.set_column(ci, ci, 12, fmt["int"])
         else:
-            cell.fill = header_fill
+            ws.set_column(ci, ci, 22)
+    ws.set_row(0, 30)
+    ws.freeze_panes(1, n_lead)
+
+    for ci, (h, p) in enumerate(zip(headers, parsed)):
+        if p:
+            si = DATE_SUB_COLS.index(p[2]) if p[2] in DATE_SUB_COLS else 0
+            ws.write_string(0, ci, h, fmt["sub"][si % len(fmt["sub"])])
+        else:
+            ws.write_string(0, ci, h, fmt["header"])
+
+    # Numeric cells of the date columns go in as numbers; everything else
+    # (item codes, DC numbers, notes, blanks) exactly as text.
+    cells = df.fillna("").astype(str).to_numpy(dtype=object)
+    for ci, p in enumerate(parsed):
+        if not p:
+            continue
+        text = cells[:, ci]
+        nums = pd.to_numeric(
+            pd.Series(text).str.replace(",", "", regex=False).str.strip(), errors="coerce"
+        ).to_numpy()
+        hit = ~np.isnan(nums) & (pd.Series(text).str.strip() != "").to_numpy()
+        cells[hit, ci] = nums[hit]
 
-    # Data rows
-    for _, row in df.iterrows():
-        ws.append(row.tolist())
+    for r, row in enumerate(cells.tolist(), 1):
+        ws.write_row(r, 0, row)
 
-    # Column widths
-    for ci, h in enumerate(headers, 1):
-        ws.column_dimensions[openpyxl.utils.get_column_letter(ci)].width = (
-            22 if h in FIXED_COLS else 12
-        )
-    ws.row_dimensions[1].height = 30
-    ws.freeze_panes = "E2"
+
+def _load_month_for_export(year: int, month: int) -> pd.DataFrame:
+    """A month tab for export — live tab first, then its archived copy."""
+    df, _ = load_month_df(year, month)
+    if df.empty:
+        df = _read_sheet_direct(f"ARCHIVED 34S Stock {date(year, month, 1).strftime('%B %Y')}")
+    return df
+
+
+def _build_register_excel(months: list[tuple[int, int]]) -> bytes:
+    """
+    Export one or more month tabs as a styled .xlsx, one worksheet per month
+    ("May 2026", …), loading and streaming one month at a time.
+    Returns the raw .xlsx bytes.
+    """
+    import xlsxwriter
 
     buf = io.BytesIO()
-    wb.save(buf)
+    wb  = xlsxwriter.Workbook(buf, {"constant_memory": True})
+    fmt = _xl_formats(wb)
+    written = 0
+    for year, month in months:
+        df = _load_month_for_export(year, month)
+        if df.empty:
+            continue
+        _write_register_sheet(wb, fmt, date(year, month, 1).strftime("%B %Y"), df)
+        written += 1
+        del df
+    if not written:
+        wb.add_worksheet("Stock").write_string(0, 0, "No data found.")
+    wb.close()
     return buf.getvalue()
 
 
+def _build_monthly_excel(year: int, month: int) -> bytes:
+    """
+    Export the full horizontal sheet for a month as a styled Excel file.
+    Returns the raw .xlsx bytes.
+    """
+    return _build_register_excel([(year, month)])
+
+
+def build_ytd_excel(year: int, month: int) -> bytes:
+    """
+    Financial-year-to-date workbook (April … month), one worksheet per month
+    tab that exists (live or archived).  Returns the raw .xlsx bytes.
+    """
+    fy_start = date(year if month >= 4 else year - 1, 4, 1)
+    months: list[tuple[int, int]] = []
+    d = fy_start
+    while (d.year, d.month) <= (year, month):
+        months.append((d.year, d.month))
+        d = (d + timedelta(days=32)).replace(day=1)
+    return _build_register_excel(months)
+
+
 def _build_stock_html_table(flat: pd.DataFrame) -> str:
     """
     Build a styled HTML table from a flat daily stock DataFrame
@@ -1620,31 +2067,23 @@ def _build_generic_html_table(df: pd.DataFrame, cl_col: str | None = None) -> st
 
 
 def _build_flat_excel(name: str, df: pd.DataFrame) -> bytes:
-    """Export the flat register snapshot as a simple styled .xlsx."""
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment
+    """Export the flat register snapshot as a simple styled .xlsx (streamed, see above)."""
+    import xlsxwriter
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = name[len(SHEET_PREFIX):] if name.startswith(SHEET_PREFIX) else "Stock"
+    buf = io.BytesIO()
+    wb  = xlsxwriter.Workbook(buf, {"constant_memory": True})
+    fmt = _xl_formats(wb)
+    ws  = wb.add_worksheet(name[len(SHEET_PREFIX):][:31] if name.startswith(SHEET_PREFIX) else "Stock")
     if df.empty:
-        ws.append(["No data found."])
+        ws.write_string(0, 0, "No data found.")
     else:
-        ws.append(list(df.columns))
-        fill = PatternFill("solid", fgColor="1F4E79")
-        font = Font(color="FFFFFF", bold=True, size=10)
-        for ci, _ in enumerate(df.columns, 1):
-            c = ws.cell(1, ci)
-            c.fill, c.font = fill, font
-            c.alignment = Alignment(horizontal="center", wrap_text=True)
-        for _, row in df.iterrows():
-            ws.append(row.tolist())
-        for ci, h in enumerate(df.columns, 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(ci)].width = 16
-        ws.row_dimensions[1].height = 28
-        ws.freeze_panes = "A2"
-    buf = io.BytesIO()
-    wb.save(buf)
+        ws.set_column(0, len(df.columns) - 1, 16)
+        ws.set_row(0, 28)
+        ws.freeze_panes(1, 0)
+        ws.write_row(0, 0, [str(c) for c in df.columns], fmt["header"])
+        for r, row in enumerate(df.fillna("").astype(str).to_numpy().tolist(), 1):
+            ws.write_row(r, 0, row)
+    wb.close()
     return buf.getvalue()
 
 
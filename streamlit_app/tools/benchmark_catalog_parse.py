@@ -0,0 +1,143 @@
+"""
+benchmark_catalog_parse.py
+
+Measures the catalogue page pipeline in services/catalog_pdf_service.py
+(`_extract_products_from_pdf`) without calling the Anthropic API.
+
+A local stub client stands in for `anthropic.Anthropic`: every
+`messages.create` call sleeps for --latency seconds (jittered) and returns one
+fake product per page; with --rate-limit-every N, every Nth call first raises a
+429-style error so the backoff path is exercised too.
+
+For each worker count it reports wall time, pages/sec and the number of
+products returned, and checks that the products come back in page order.
+
+RUN IT
+------
+    python streamlit_app/tools/benchmark_catalog_parse.py path/to/catalogue.pdf
+    python streamlit_app/tools/benchmark_catalog_parse.py cat.pdf --workers 1 4 8 --latency 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import services.catalog_pdf_service as cps  # noqa: E402
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# STUB CLIENT
+# ═════════════════════════════════════════════════════════════════════════════
+
+class _Block:
+    type = "text"
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Resp:
+    stop_reason = "end_turn"
+
+    def __init__(self, text: str):
+        self.content = [_Block(text)]
+
+
+class _Headers(dict):
+    pass
+
+
+class _FakeRateLimit(Exception):
+    status_code = 429
+
+    def __init__(self):
+        super().__init__("429 rate_limit_error (stub)")
+        self.response = type("R", (), {"status_code": 429, "headers": _Headers({"retry-after": "0"})})()
+
+
+class _Messages:
+    def __init__(self, latency: float, rate_limit_every: int):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        if self.rate_limit_every and n % self.rate_limit_every == 0:
+            raise _FakeRateLimit()
+        time.sleep(self.latency * random.uniform(0.7, 1.3))
+        # The page number is not sent to the model; the image size is a
+        # cheap stand-in that lets the order check below work.
+        size = len(kwargs["messages"][0]["content"][0]["source"]["data"])
+        return _Resp(json.dumps({
+            "main_category": "Stub",
+            "products": [{
+                "product_name": f"stub-{size}",
+                "region": {"x0": 0.1, "y0": 0.1, "x1": 0.5, "y1": 0.5},
+                "photo_region": {"x0": 0.1, "y0": 0.1, "x1": 0.4, "y1": 0.4},
+            }],
+        }))
+
+
+class StubClient:
+    def __init__(self, latency: float = 1.0, rate_limit_every: int = 0):
+        self.messages = _Messages(latency, rate_limit_every)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ═════════════════════════════════════════════════════════════════════════════
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark concurrent catalogue page parsing with a stub client.")
+    ap.add_argument("path", help="catalogue PDF")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--latency", type=float, default=1.0, help="stub seconds per vision call")
+    ap.add_argument("--rate-limit-every", type=int, default=0, help="raise a 429 on every Nth call")
+    ap.add_argument("--pages", type=int, default=0, help="only the first N pages")
+    args = ap.parse_args()
+
+    with open(args.path, "rb") as fh:
+        data = fh.read()
+    cps._PARSE_RETRIES = 3
+
+    print("=" * 72)
+    print(f"  Catalogue parse benchmark — {os.path.basename(args.path)}  ·  "
+          f"stub latency {args.latency:.1f}s")
+    print("=" * 72)
+    print(f"  {'workers':<10}{'seconds':>10}{'pages/s':>10}{'products':>10}{'calls':>8}{'speed-up':>11}")
+    baseline = None
+    reference = None
+    for w in args.workers:
+        client = StubClient(args.latency, args.rate_limit_every)
+        lines: list[str] = []
+        t0 = time.perf_counter()
+        products = cps._extract_products_from_pdf(
+            client, "stub-model", data, "Stub", lines.append,
+            page_end=args.pages or None, workers=w,
+        )
+        secs = time.perf_counter() - t0
+        n_pages = sum(1 for ln in lines if "product(s)," in ln) or 1
+        names = [p.get("product_name") for p in products]
+        reference = reference or names
+        order = "" if names == reference else "  ⚠️ order differs from first run"
+        baseline = baseline or secs
+        print(f"  {w:<10}{secs:>10.2f}{n_pages / secs:>10.2f}{len(products):>10}"
+              f"{client.messages.calls:>8}{baseline / secs:>10.1f}x{order}")
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+benchmark_forecast_predicates.py
+
+Checks and measures the column-form forecast rules in services/forecast_engine.py
+against the row-by-row implementation they replaced:
+
+  * commitment predicates — mis_committed_mask / manual_committed_mask /
+    committed_mask vs df.apply(_is_mis_committed / ..., axis=1)
+  * saved-state overlay   — merge_state (hash join) vs the iterrows overlay
+  * forecast breakdown    — compute_forecast_breakdown vs the groupby/iterrows loop
+  * MIS committed value   — compute_mis_committed_value vs apply
+
+The row-wise versions are kept below as the reference. On a synthetic forecast
+frame (random quantities, delivery decisions, scopes and manual flags, plus a
+saved state with repeated and unmatched keys) every result must match — masks
+and frames exactly, values to 1e-6 — before anything is timed. Timings are
+reported at the base MIS size and at --scale × that size.
+
+RUN IT
+------
+    python streamlit_app/tools/benchmark_forecast_predicates.py
+    python streamlit_app/tools/benchmark_forecast_predicates.py --rows 5000 --scale 10
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import services.forecast_engine as fe  # noqa: E402
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ROW-WISE REFERENCE (the implementation the column forms replaced)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def rowwise_merge_state(fresh: pd.DataFrame, saved: pd.DataFrame) -> pd.DataFrame:
+    if fresh.empty:
+        return fresh
+    if saved is None or saved.empty or "SO_NO" not in saved.columns:
+        return fresh
+
+    saved = saved.copy()
+    saved["SO_NO"] = saved["SO_NO"].astype(str).str.strip()
+    saved["SO_POSITION"] = saved["SO_POSITION"].astype(str).str.strip()
+
+    saved_map = {}
+    for _, r in saved.iterrows():
+        key = (str(r.get("SO_NO", "")).strip(), str(r.get("SO_POSITION", "")).strip())
+        saved_map[key] = r
+
+    fresh = fresh.copy()
+    fresh["SO_NO"] = fresh["SO_NO"].astype(str).str.strip()
+    fresh["SO_POSITION"] = fresh["SO_POSITION"].astype(str).str.strip()
+    # Object columns so .at can take the saved values whatever their type
+    for sc in fe.STATE_DEFAULTS:
+        fresh[sc] = fresh[sc].astype(object)
+
+    for idx, row in fresh.iterrows():
+        key = (row["SO_NO"], row["SO_POSITION"])
+        if key in saved_map:
+            for sc in fe.STATE_DEFAULTS:
+                if sc in saved_map[key].index:
+                    fresh.at[idx, sc] = saved_map[key][sc]
+    return fresh
+
+
+def rowwise_breakdown(df: pd.DataFrame) -> dict[str, float]:
+    counted_idx: set = set()
+    out = dict.fromkeys(
+        ("agree", "godown", "partial", "manual", "committed_ns", "denied", "not_committed", "cancelled"), 0.0
+    )
+    num = fe._to_num
+
+    def total(s: pd.Series) -> float:
+        # Series.apply(...).sum() of an empty str-dtype selection is "", not 0
+        return float(sum(num(v) for v in s))
+
+    for _, grp in df.groupby("SO_NO"):
+        status = fe._delivery_status(grp.iloc[0])
+        if status == "Order Cancelled":
+            if fe._cancel_scope(grp) == fe.CANCEL_SCOPE_ITEMS:
+                for idx, row in grp.iterrows():
+                    if fe._cancel_selected(row):
+                        out["cancelled"] += num(row.get("TOTAL_NET_BASIC", 0))
+                        counted_idx.add(idx)
+                    elif fe._is_manual_committed(row):
+                        continue
+                    elif fe._is_mis_committed(row):
+                        out["committed_ns"] += num(row.get("TOTAL_NET_BASIC", 0))
+                    else:
+                        out["not_committed"] += num(row.get("TOTAL_NET_BASIC", 0))
+            else:
+                out["cancelled"] += total(grp["TOTAL_NET_BASIC"])
+                counted_idx.update(grp.index.tolist())
+        elif status in ("Agree for Delivery", "Delivery to Godown"):
+            key = "agree" if status == "Agree for Delivery" else "godown"
+            if fe._deliver_scope(grp) == fe.DELIVER_SCOPE_COMMITTED:
+                mask = grp.apply(fe._is_committed, axis=1)
+                out[key] += total(grp.loc[mask, "TOTAL_NET_BASIC"])
+                out["not_committed"] += total(grp.loc[~mask, "TOTAL_NET_BASIC"])
+            else:
+                out[key] += total(grp["TOTAL_NET_BASIC"])
+            counted_idx.update(grp.index.tolist())
+        elif status == "Partial Delivery":
+            for idx, row in grp.iterrows():
+                if fe._partial_selected(row):
+                    out["partial"] += num(row.get("TOTAL_NET_BASIC", 0))
+                    counted_idx.add(idx)
+        elif status == "Denied Delivery":
+            out["denied"] += total(grp["TOTAL_NET_BASIC"])
+        else:
+            for _, row in grp.iterrows():
+                if fe._is_manual_committed(row):
+                    continue
+                if fe._is_mis_committed(row):
+                    out["committed_ns"] += num(row.get("TOTAL_NET_BASIC", 0))
+                else:
+                    out["not_committed"] += num(row.get("TOTAL_NET_BASIC", 0))
+
+    for idx, row in df.iterrows():
+        if idx in counted_idx or fe._delivery_status(row) == "Denied Delivery":
+            continue
+        if fe._is_manual_committed(row):
+            out["manual"] += num(row.get("TOTAL_NET_BASIC", 0))
+
+    out["total"] = out["agree"] + out["godown"] + out["partial"] + out["manual"]
+    return out
+
+
+def rowwise_mis_committed_value(mis_df: pd.DataFrame) -> float:
+    df = mis_df[["Sales Order Qty", "Sales Order Committed Qty", "Total Net Basic"]].copy()
+    df.columns = ["SO_QTY", "SO_COMMITTED_QTY", "TOTAL_NET_BASIC"]
+    mask = df.apply(fe._is_mis_committed, axis=1)
+    return float(df.loc[mask, "TOTAL_NET_BASIC"].apply(fe._to_num).sum())
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SYNTHETIC DATA
+# ═════════════════════════════════════════════════════════════════════════════
+
+_STATUSES = ["", "", "", "Agree for Delivery", "Delivery to Godown", "Partial Delivery",
+             "Denied Delivery", "Order Cancelled"]
+_FLAGS = ["TRUE", "FALSE", "", "1", "yes", "NO"]
+
+
+def _synth(rows: int, seed: int = 7) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """(raw MIS, fresh forecast frame, saved state) with `rows` MIS line items."""
+    rnd = random.Random(seed)
+    so = [f"WON{40000 + i // 3:06d}" for i in range(rows)]
+    pos = [str(i % 3 + 1) for i in range(rows)]
+    qty = [str(rnd.randint(0, 4)) for _ in range(rows)]
+    com = [str(min(int(q), rnd.randint(0, 4))) for q in qty]
+    val = [f"{rnd.uniform(-2000, 90000):,.2f}" if rnd.random() > 0.01 else "" for _ in range(rows)]
+    mis = pd.DataFrame({
+        "Sales Order No.": so, "Sales Order Position": pos, "Item Code": [f"IC{i % 900}" for i in range(rows)],
+        "Item Description": "item", "Sales Order Qty": qty, "Sales Order Warehouse": "W",
+        "Total Net Basic": val, "Sales Order Committed Qty": com, "Address Line 4(Ship To)": "",
+        "City": "city", "Customer Name": "customer", "Inventory Commitment Date": "",
+    })
+    fresh = fe.build_forecast(mis, pd.DataFrame())
+
+    orders = sorted(set(so))
+    picked = rnd.sample(orders, len(orders) // 2)
+    status = {o: rnd.choice(_STATUSES) for o in picked}
+    state_rows = []
+    for s, p in zip(so, pos):
+        if s not in status:
+            continue
+        state_rows.append({
+            "SO_NO": f" {s} " if rnd.random() < 0.05 else s,
+            "SO_POSITION": p,
+            "DELIVERY_STATUS": status[s],
+            "PARTIAL_SELECTED": rnd.random() < 0.5,
+            "CAN_COMMIT_MANUALLY": rnd.choice(_FLAGS),
+            "APPROVED_BY": rnd.choice(["", "Manager", "nan", "None", " "]),
+            "COMMITTED_VIA": rnd.choice(["", "RPL", "34S Stock"]),
+            "DELIVER_SCOPE": rnd.choice([fe.DELIVER_SCOPE_FULL, fe.DELIVER_SCOPE_COMMITTED, "committed_only"]),
+            "CANCEL_SCOPE": rnd.choice([fe.CANCEL_SCOPE_ENTIRE, fe.CANCEL_SCOPE_ITEMS]),
+            "CANCEL_SELECTED": rnd.random() < 0.5,
+            "STOCK_34S_MESSAGE": "",
+        })
+    saved = pd.DataFrame(state_rows)
+    # A key saved twice (last row wins) and keys no longer in the MIS
+    saved = pd.concat([saved, saved.head(20).assign(APPROVED_BY="Second"), saved.head(5).assign(SO_NO="GONE")],
+                      ignore_index=True)
+    return mis, fresh, saved
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# PARITY / TIMING
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _check_parity(mis: pd.DataFrame, fresh: pd.DataFrame, saved: pd.DataFrame) -> None:
+    merged = fe.merge_state(fresh, saved)
+    reference = rowwise_merge_state(fresh, saved)
+    pd.testing.assert_frame_equal(
+        merged.astype(object).reset_index(drop=True),
+        reference.astype(object).reset_index(drop=True),
+    )
+
+    for row_fn, col_fn in ((fe._is_mis_committed, fe.mis_committed_mask),
+                           (fe._is_manual_committed, fe.manual_committed_mask),
+                           (fe._is_committed, fe.committed_mask)):
+        expected = merged.apply(row_fn, axis=1).astype(bool)
+        got = col_fn(merged)
+        bad = int((expected != got).sum())
+        if bad:
+            raise AssertionError(f"{col_fn.__name__}: {bad} rows differ from {row_fn.__name__}")
+
+    got, expected = fe.compute_forecast_breakdown(merged), rowwise_breakdown(merged)
+    for key, value in expected.items():
+        if not math.isclose(got[key], value, rel_tol=1e-9, abs_tol=1e-6):
+            raise AssertionError(f"breakdown[{key}]: {got[key]} != {value}")
+
+    got, expected = fe.compute_mis_committed_value(mis), rowwise_mis_committed_value(mis)
+    if not math.isclose(got, expected, rel_tol=1e-9, abs_tol=1e-6):
+        raise AssertionError(f"MIS committed value: {got} != {expected}")
+
+
+def _time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Parity check + benchmark of the column-form forecast rules.")
+    ap.add_argument("--rows", type=int, default=3000, help="base MIS size (line items)")
+    ap.add_argument("--scale", type=int, default=10, help="second run at rows × scale")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print("=" * 78)
+    print(f"  Forecast rules — row-wise vs column form  ·  median of {args.repeat}")
+    print("=" * 78)
+    for rows in (args.rows, args.rows * args.scale):
+        mis, fresh, saved = _synth(rows)
+        _check_parity(mis, fresh, saved)
+        merged = fe.merge_state(fresh, saved)
+        runs = [
+            ("predicates", lambda: merged.apply(fe._is_committed, axis=1),
+                           lambda: fe.committed_mask(merged)),
+            ("merge_state", lambda: rowwise_merge_state(fresh, saved),
+                            lambda: fe.merge_state(fresh, saved)),
+            ("breakdown", lambda: rowwise_breakdown(merged),
+                          lambda: fe.compute_forecast_breakdown(merged)),
+            ("mis committed", lambda: rowwise_mis_committed_value(mis),
+                              lambda: fe.compute_mis_committed_value(mis)),
+        ]
+        print(f"  {rows} MIS rows, {len(saved)} saved-state rows — parity ✅")
+        print(f"  {'stage':<16}{'row-wise s':>12}{'column s':>12}{'speed-up':>11}")
+        for name, old, new in runs:
+            t_old, t_new = _time(old, args.repeat), _time(new, args.repeat)
+            print(f"  {name:<16}{t_old:>12.3f}{t_new:>12.4f}{t_old / max(t_new, 1e-9):>10.0f}x")
+        print("-" * 78)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+benchmark_mis_parse.py
+
+Measures the MIS attachment parsers in services/mis_email_import.py:
+
+  * pandas      — the original pd.ExcelFile + parse(dtype=str) path
+  * streaming   — openpyxl read-only stream of the PO sheet, typed columns
+  * projected   — streaming, limited to forecast_engine.MIS_FETCH_COLS
+
+For each it reports wall time (median of --repeat runs) and peak Python heap
+(tracemalloc) while parsing.
+
+RUN IT
+------
+On a real attachment (save it from the "BR_MIS - Interio MIS (4S INTERIO)" email):
+
+    python streamlit_app/tools/benchmark_mis_parse.py path/to/BR_MIS.xlsx
+
+Or on a generated workbook shaped like the MIS (PO sheet with the real column
+names plus a large STOCK sheet), when no attachment is at hand:
+
+    python streamlit_app/tools/benchmark_mis_parse.py --synth 50000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.forecast_engine import MIS_FETCH_COLS as _PROJECTION  # noqa: E402
+from services.mis_email_import import DISPLAY_COLUMNS, PO_COLUMNS, parse_mis_workbook  # noqa: E402
+
+
+def _synth_workbook(rows: int, extra_cols: int = 40) -> bytes:
+    """An .xlsx shaped like the MIS attachment: PO sheet + a STOCK sheet of similar size."""
+    from openpyxl import Workbook
+
+    inverse = {v: k for k, v in PO_COLUMNS.items()}
+    headers = [inverse.get(c, c) for c in DISPLAY_COLUMNS if c != "Discount Percentage"]
+    headers += ["City"] + [f"Extra Column {i}" for i in range(extra_cols)]
+
+    rnd = random.Random(7)
+    base = datetime(2026, 5, 1)
+    wb = Workbook(write_only=True)
+    po = wb.create_sheet("PO")
+    po.append(headers)
+    for i in range(rows):
+        row = []
+        for h in headers:
+            if h in ("Order Line Booking DateTime", "Inventory Commitment Date"):
+                row.append(base + timedelta(days=rnd.randint(0, 60), hours=rnd.randint(0, 23)))
+            elif h in ("Sales Order Qty", "Sales Order Committed Qty", "FO Firm Commitment Qty"):
+                row.append(rnd.randint(0, 4))
+            elif h in ("Total Discount", "Total Net Basic"):
+                row.append(round(rnd.uniform(500, 90000), 2))
+            elif h == "Sales Order No.":
+                row.append(f"WON{40000 + i // 3:06d}")
+            elif h == "Sales Order Position":
+                row.append(i % 3 + 1)
+            else:
+                row.append(f"{h[:6]} value {rnd.randint(0, 99999)}")
+        po.append(row)
+    stock = wb.create_sheet("STOCK")
+    stock.append([f"Stock Col {i}" for i in range(30)])
+    for i in range(rows):
+        stock.append([f"S{i}-{j}" for j in range(30)])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _measure(fn, repeat: int) -> tuple[float, float, int, int]:
+    """(median seconds, peak MiB, rows, cols) for fn()."""
+    times = []
+    peak = 0
+    shape = (0, 0)
+    for _ in range(max(1, repeat)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        df, err = fn()
+        times.append(time.perf_counter() - t0)
+        _, p = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if err:
+            raise RuntimeError(err)
+        peak = max(peak, p)
+        shape = df.shape
+    return statistics.median(times), peak / (1024 * 1024), shape[0], shape[1]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark MIS PO-sheet parsers.")
+    ap.add_argument("path", nargs="?", help="MIS .xlsx attachment")
+    ap.add_argument("--synth", type=int, default=0, help="generate a workbook with this many PO rows instead")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.synth:
+        print(f"Generating synthetic MIS workbook with {args.synth} PO rows…")
+        data = _synth_workbook(args.synth)
+        label = f"synthetic ({args.synth} rows)"
+    elif args.path:
+        with open(args.path, "rb") as fh:
+            data = fh.read()
+        label = os.path.basename(args.path)
+    else:
+        ap.print_help()
+        return 2
+
+    runs = [
+        ("pandas",    lambda: parse_mis_workbook(data, streaming=False)),
+        ("streaming", lambda: parse_mis_workbook(data, streaming=True)),
+        ("projected", lambda: parse_mis_workbook(data, streaming=True, columns=_PROJECTION)),
+    ]
+
+    print("=" * 72)
+    print(f"  MIS parse benchmark — {label}  ·  {len(data) / 1024:.0f} KiB  ·  median of {args.repeat}")
+    print("=" * 72)
+    print(f"  {'parser':<12}{'seconds':>10}{'peak MiB':>12}{'rows':>10}{'cols':>8}{'speed-up':>11}")
+    baseline = None
+    for name, fn in runs:
+        secs, mib, nrows, ncols = _measure(fn, args.repeat)
+        baseline = baseline or secs
+        print(f"  {name:<12}{secs:>10.2f}{mib:>12.1f}{nrows:>10}{ncols:>8}{baseline / secs:>10.1f}x")
+    print("=" * 72)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
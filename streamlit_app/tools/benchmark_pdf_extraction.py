@@ -0,0 +1,149 @@
+"""
+benchmark_pdf_extraction.py
+
+Compares the PDF text engines in services/pdf_text.py on a corpus of sample
+Godrej invoices and delivery challans, so the engine order can be chosen from
+measurements rather than guesswork.
+
+For every PDF in the corpus folder and every engine (plus "auto", the
+PyMuPDF-first-with-fallback path the app actually uses) it records:
+
+  * extraction time (ms)
+  * field-hit rate — invoices: the `_PDF_PATTERNS` fields of
+    invoice_email_import; challans: warehouse code / challan no / item lines
+    as used by stock_34s_service._parse_challan_pdf
+
+A PDF is treated as a challan when its text mentions "Delivery Challan",
+otherwise as an invoice.
+
+THE CORPUS
+----------
+Real invoices carry customer names and phone numbers, so the sample PDFs are
+NOT committed. Drop a handful of invoices and challans (e.g. downloaded from the
+Drive invoices folder) into ``streamlit_app/tools/fixtures/pdf_corpus/`` — that
+folder is git-ignored — or point ``--corpus`` at any folder of PDFs.
+
+RUN IT
+------
+    python streamlit_app/tools/benchmark_pdf_extraction.py
+    python streamlit_app/tools/benchmark_pdf_extraction.py --corpus path/to/pdfs --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.pdf_text import DEFAULT_ENGINES, ENGINES, extract_pdf_text  # noqa: E402
+from services.invoice_email_import import (  # noqa: E402
+    _PDF_PATTERNS, _count_pdf_fields, _has_all_pdf_fields,
+)
+from services.stock_34s_service import (  # noqa: E402
+    _CHALLAN_NO_RE, _CHALLAN_WH_RE, _ITEM_CODE_RE, _challan_text_ok,
+)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pdf_corpus")
+
+_CHALLAN_CHECKS = (_CHALLAN_WH_RE, _CHALLAN_NO_RE, _ITEM_CODE_RE)
+
+
+def _is_challan(text: str) -> bool:
+    return "delivery challan" in text.lower()
+
+
+def _challan_hits(text: str) -> int:
+    return sum(1 for rx in _CHALLAN_CHECKS if rx.search(text))
+
+
+def _hits(kind: str, text: str) -> tuple[int, int]:
+    """(fields found, fields expected) for a document of the given kind."""
+    if kind == "challan":
+        return _challan_hits(text), len(_CHALLAN_CHECKS)
+    return _count_pdf_fields(text), len(_PDF_PATTERNS)
+
+
+def _auto(kind: str, pdf_bytes: bytes) -> str:
+    if kind == "challan":
+        text, _ = extract_pdf_text(pdf_bytes, accept=_challan_text_ok, score=_challan_hits)
+    else:
+        text, _ = extract_pdf_text(pdf_bytes, accept=_has_all_pdf_fields, score=_count_pdf_fields)
+    return text
+
+
+def _classify(pdf_bytes: bytes) -> str:
+    """Classify with whichever engine works first; challan vs invoice doesn't depend on layout."""
+    text, _ = extract_pdf_text(pdf_bytes)
+    return "challan" if _is_challan(text) else "invoice"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark PDF text engines on sample invoices/challans.")
+    ap.add_argument("--corpus", default=DEFAULT_CORPUS, help="folder of sample PDFs")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per file per engine (median is reported)")
+    args = ap.parse_args()
+
+    if not os.path.isdir(args.corpus):
+        print(f"❌ Corpus folder not found: {args.corpus}")
+        return 2
+    paths = sorted(
+        os.path.join(args.corpus, f) for f in os.listdir(args.corpus) if f.lower().endswith(".pdf")
+    )
+    if not paths:
+        print(f"❌ No PDFs in {args.corpus}")
+        return 2
+
+    docs = []
+    for p in paths:
+        with open(p, "rb") as fh:
+            data = fh.read()
+        docs.append((os.path.basename(p), data, _classify(data)))
+
+    engines = list(DEFAULT_ENGINES) + ["auto"]
+    # engine -> kind -> {"ms": [...], "hit": int, "total": int, "full": int, "n": int}
+    stats: dict[str, dict[str, dict]] = {e: {} for e in engines}
+
+    for name, data, kind in docs:
+        for eng in engines:
+            times: list[float] = []
+            text = ""
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                try:
+                    text = _auto(kind, data) if eng == "auto" else (ENGINES[eng](data) or "")
+                except Exception as e:
+                    print(f"  ⚠️ {eng} failed on {name}: {e}")
+                    text = ""
+                times.append((time.perf_counter() - t0) * 1000.0)
+            found, expected = _hits(kind, text)
+            s = stats[eng].setdefault(kind, {"ms": [], "hit": 0, "total": 0, "full": 0, "n": 0})
+            s["ms"].append(statistics.median(times))
+            s["hit"] += found
+            s["total"] += expected
+            s["full"] += int(found == expected)
+            s["n"] += 1
+
+    n_inv = sum(1 for d in docs if d[2] == "invoice")
+    n_ch = len(docs) - n_inv
+    print("=" * 78)
+    print(f"  PDF text-engine benchmark — {len(docs)} file(s): {n_inv} invoice(s), {n_ch} challan(s)")
+    print(f"  Corpus: {args.corpus}   ·   median of {args.repeat} run(s) per file")
+    print("=" * 78)
+    print(f"  {'engine':<12}{'kind':<10}{'files':>6}{'mean ms':>10}{'total ms':>11}"
+          f"{'field hits':>13}{'all fields':>12}")
+    for eng in engines:
+        for kind, s in sorted(stats[eng].items()):
+            hit_pct = 100.0 * s["hit"] / s["total"] if s["total"] else 0.0
+            full_pct = 100.0 * s["full"] / s["n"] if s["n"] else 0.0
+            print(f"  {eng:<12}{kind:<10}{s['n']:>6}{statistics.mean(s['ms']):>10.1f}"
+                  f"{sum(s['ms']):>11.1f}{hit_pct:>12.1f}%{full_pct:>11.1f}%")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())